@@ -0,0 +1,148 @@
+"""benchmark_bracket_stats.py — Compare the old per-bracket loops with the vectorised bracket statistics.
+
+Builds a synthetic live snapshot (default 2,000 brackets x 30 players, with
+plenty of wave ties, a few short brackets and some missing waves) and times:
+
+- ``calculate_quantiles_for_cache`` (placement cache generator) against the
+  old filter-and-sort per bracket per rank loop;
+- the promotion/relegation cutoffs behind ``get_bracket_stats`` against the
+  old ``groupby().apply`` with ``value_counts`` loops.
+
+Outputs are checked for equality before the timings are printed.
+
+Usage (from repo root, venv activated, DJANGO_DATA and CSV_DATA set):
+
+    python scripts/benchmark_bracket_stats.py
+    python scripts/benchmark_bracket_stats.py --brackets 5000 --players 30 --repeat 5
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+django.setup()
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from thetower.backend.tourney_results.bracket_stats import promotion_cutoff_waves, relegation_cutoff_waves  # noqa: E402
+
+# "import" is a keyword, so the generator module can only be loaded by name.
+generate_placement_cache = importlib.import_module("thetower.backend.tourney_results.import.generate_placement_cache")
+
+
+def calculate_quantiles_loop(df: pd.DataFrame) -> dict:
+    """The previous ``calculate_quantiles_for_cache`` body, kept here as the baseline."""
+    ranks = [1, 2, 4, 6, 8, 10, 12, 15, 24]
+    quantiles = [0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95]
+    results = {}
+    for rank in ranks:
+        waves_at_rank = []
+        for bracket in df["bracket"].unique():
+            bracket_df = df[df["bracket"] == bracket]
+            sorted_bracket = bracket_df.sort_values("wave", ascending=False)
+            if len(sorted_bracket) >= rank:
+                wave_at_rank = sorted_bracket.iloc[rank - 1]["wave"]
+                if pd.notna(wave_at_rank):
+                    waves_at_rank.append(float(wave_at_rank))
+        if waves_at_rank:
+            wave_series = pd.Series(waves_at_rank)
+            results[str(rank)] = {str(q): float(wave_series.quantile(q)) for q in quantiles}
+        else:
+            results[str(rank)] = {str(q): None for q in quantiles}
+    return {"ranks": ranks, "quantiles": quantiles, "data": results}
+
+
+def cutoffs_apply(df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    """The previous ``get_bracket_stats`` cutoff computation, kept here as the baseline."""
+
+    def _promotion_cutoff_wave(group, n):
+        sorted_counts = group.value_counts().sort_index(ascending=False)
+        cumulative = 0
+        result = None
+        for wave, cnt in sorted_counts.items():
+            if cumulative + cnt <= n:
+                cumulative += cnt
+                result = wave
+            else:
+                break
+        return result
+
+    def _relegation_cutoff_wave(group, n):
+        sorted_counts = group.value_counts().sort_index(ascending=False)
+        cumulative = 0
+        for wave, cnt in sorted_counts.items():
+            cumulative += cnt
+            if cumulative >= n:
+                return wave
+        return None
+
+    group_by_bracket = df.groupby("bracket").wave
+    fourth_place = group_by_bracket.apply(lambda x: _promotion_cutoff_wave(x, 4)).dropna()
+    twenty_fifth_place = group_by_bracket.apply(lambda x: _relegation_cutoff_wave(x, 25)).dropna()
+    return fourth_place, twenty_fifth_place
+
+
+def cutoffs_vectorised(df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    return promotion_cutoff_waves(df, 4), relegation_cutoff_waves(df, 25)
+
+
+def make_snapshot(brackets: int, players: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sizes = np.where(rng.random(brackets) < 0.05, rng.integers(1, players, brackets), players)
+    bracket_ids = np.repeat([f"{i:08X}" for i in range(brackets)], sizes)
+    # Narrow wave range per bracket so ties (including ties across the cutoffs) are common.
+    base = np.repeat(rng.integers(100, 4000, brackets), sizes)
+    waves = (base + rng.integers(0, 40, len(base))).astype(float)
+    waves[rng.random(len(waves)) < 0.002] = np.nan
+    df = pd.DataFrame({"bracket": bracket_ids, "player_id": [f"P{i:015d}" for i in range(len(waves))], "wave": waves})
+    # Snapshots are not sorted by bracket.
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _best(func, df: pd.DataFrame, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = perf_counter()
+        result = func(df)
+        best = min(best, perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorised bracket statistics against the old loops")
+    parser.add_argument("--brackets", type=int, default=2000, help="Number of brackets")
+    parser.add_argument("--players", type=int, default=30, help="Players per full bracket")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    df = make_snapshot(args.brackets, args.players)
+    print(f"Synthetic snapshot: {args.brackets:,} brackets, {len(df):,} rows")
+
+    # The old quantile loop takes tens of seconds at the default size, so it runs once.
+    old_q_s, old_q = _best(calculate_quantiles_loop, df, 1)
+    new_q_s, new_q = _best(generate_placement_cache.calculate_quantiles_for_cache, df, args.repeat)
+    assert old_q == new_q, "quantile data differs"
+
+    old_c_s, (old_promo, old_releg) = _best(cutoffs_apply, df, args.repeat)
+    new_c_s, (new_promo, new_releg) = _best(cutoffs_vectorised, df, args.repeat)
+    pd.testing.assert_series_equal(old_promo.astype(float), new_promo.astype(float), check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(old_releg.astype(float), new_releg.astype(float), check_names=False, check_index_type=False)
+    for old, new in ((old_promo, new_promo), (old_releg, new_releg)):
+        assert (old.idxmax(), old.idxmin()) == (new.idxmax(), new.idxmin())
+    print("Outputs identical")
+
+    print(f"  quantiles  loop: {old_q_s * 1000:8.0f} ms   vectorised: {new_q_s * 1000:6.0f} ms   speedup: {old_q_s / new_q_s:6.1f}x")
+    print(f"  cutoffs   apply: {old_c_s * 1000:8.0f} ms   vectorised: {new_c_s * 1000:6.0f} ms   speedup: {old_c_s / new_c_s:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
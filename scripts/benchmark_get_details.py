@@ -0,0 +1,209 @@
+"""benchmark_get_details.py — Compare the old per-row ``get_details`` enrichment with the vectorised one.
+
+Creates a throwaway in-memory test database (tables created straight from the
+models) with a few years of patches, per-league roles (some patches without
+roles, to exercise the fallback), tourney results with battle conditions and
+a configurable number of result rows.  Both implementations are run over the
+same queryset — battle-condition querysets are materialised, as the results
+pages do — and the outputs are checked for equality before the timings and
+query counts are printed.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/benchmark_get_details.py
+    python scripts/benchmark_get_details.py --results 400 --rows-per-result 100 --repeat 5
+"""
+
+import argparse
+import datetime
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+django.setup()
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment  # noqa: E402
+
+from thetower.backend.tourney_results import data  # noqa: E402
+from thetower.backend.tourney_results.constants import leagues, wave_border_choices  # noqa: E402
+from thetower.backend.tourney_results.models import BattleCondition, PatchNew, Role, TourneyResult, TourneyRow  # noqa: E402
+
+
+class _DisableMigrations(dict):
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+def _patch_to_roles_per_row(league: str) -> dict:
+    """The previous ``patch_to_roles``: one Role query per patch, with its fallback for patches without roles."""
+    mapping = defaultdict(list)
+    patches = list(PatchNew.objects.all().order_by("start_date"))
+    last_patch_with_roles = None
+    for i, patch in enumerate(patches):
+        roles = tuple(Role.objects.filter(patch=patch, league=league))
+        if not roles:
+            if not last_patch_with_roles:
+                last_patch_with_roles = i - 1
+            roles = mapping[patches[last_patch_with_roles]]
+        mapping[patch] = roles
+    return mapping
+
+
+def get_details_per_row(rows) -> pd.DataFrame:
+    """The previous per-row implementation, kept here as the baseline.
+
+    Patches and roles are resolved the way ``data`` did before the resolvers:
+    one patch query per row and a linear scan over the roles of the row's patch.
+    """
+    rows = rows.prefetch_related("result")
+
+    df = pd.DataFrame(
+        rows.values("player_id", "position", "nickname", "wave", "avatar_id", "relic_id", "result__date", "result__league", "result_id")
+    )
+    df = df.rename(
+        columns={
+            "player_id": "id",
+            "nickname": "tourney_name",
+            "avatar_id": "avatar",
+            "relic_id": "relic",
+            "result__date": "date",
+            "result__league": "league",
+        }
+    )
+
+    if df.empty:
+        return df
+
+    lookup = data.get_player_id_lookup()
+    approved_lookup = data.get_player_id_approved_lookup()
+
+    conditions_mapping = {result.id: result.conditions.all() for result in TourneyResult.objects.filter(id__in=df.result_id.unique())}
+
+    patches = [PatchNew.objects.get(start_date__lte=date, end_date__gte=date) for date in df.date]
+    roles_by_league = {league: _patch_to_roles_per_row(league) for league in df.league.unique()}
+
+    def wave_to_role(wave, patch, league):
+        for role in roles_by_league[league][patch]:
+            if role.wave_bottom <= wave < role.wave_top:
+                return role
+        return None
+
+    bcs = [conditions_mapping.get(id_) for id_ in df.result_id]
+
+    df["real_name"] = [lookup.get(id, name) for id, name in zip(df.id, df.tourney_name)]
+    df["verified"] = ["✓" if approved_lookup.get(id) else "" for id, name in zip(df.id, df.tourney_name)]
+    df["wave_role"] = [wave_to_role(wave, patch, league) for wave, patch, league in zip(df["wave"], patches, df.league)]
+    df["wave_role_color"] = df.wave_role.map(lambda role: getattr(role, "color", None))
+    df["bcs"] = bcs
+    df["patch"] = patches
+
+    return df
+
+
+def populate(results: int, rows_per_result: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+
+    conditions = [BattleCondition.objects.create(name=f"Condition {i}", shortcut=f"C{i}") for i in range(8)]
+
+    start = datetime.date(2023, 1, 1)
+    patches = []
+    for i in range(12):
+        patch_start = start + datetime.timedelta(days=60 * i)
+        patches.append(
+            PatchNew.objects.create(version_minor=20 + i, version_patch=0, start_date=patch_start, end_date=patch_start + datetime.timedelta(days=59))
+        )
+
+    borders = sorted(set(wave_border_choices))
+    for i, patch in enumerate(patches):
+        if i % 4 == 3:
+            continue  # no roles: falls back to an earlier patch's roles
+        for league in leagues:
+            for bottom, top in zip(borders[:-1], borders[1:]):
+                Role.objects.create(wave_bottom=bottom, wave_top=top, patch=patch, league=league, color=f"#{bottom % 256:02x}{top % 256:02x}00")
+
+    last_day = (patches[-1].end_date - start).days
+    row_objs = []
+    for i in range(results):
+        result = TourneyResult.objects.create(
+            result_file="uploads/x.csv",
+            date=start + datetime.timedelta(days=int(rng.integers(0, last_day + 1))),
+            league=leagues[i % len(leagues)],
+            public=True,
+        )
+        result.conditions.set(rng.choice(conditions, size=2, replace=False))
+        waves = np.sort(rng.integers(1, max(borders) + 500, rows_per_result))[::-1]
+        for position, wave in enumerate(waves, 1):
+            row_objs.append(
+                TourneyRow(
+                    player_id=f"{int(rng.integers(0, 2**40)):016X}", position=position, nickname=f"nick{position}", wave=int(wave), result=result
+                )
+            )
+    TourneyRow.objects.bulk_create(row_objs, batch_size=5000)
+
+
+def _run(func, repeat: int) -> tuple[float, int, pd.DataFrame]:
+    """Return (best wall seconds, queries of the last run, result) for ``func``."""
+    best = float("inf")
+    df = None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = perf_counter()
+            df = func(TourneyRow.objects.all().order_by("result__date", "position"))
+            for bcs in df["bcs"]:
+                list(bcs)
+            best = min(best, perf_counter() - t0)
+    return best, len(ctx.captured_queries), df
+
+
+def _pks(values) -> list:
+    return [getattr(value, "pk", value) for value in values]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark get_details against the old per-row enrichment")
+    parser.add_argument("--results", type=int, default=200, help="Number of tourney results")
+    parser.add_argument("--rows-per-result", type=int, default=50, help="Rows per tourney result")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    settings.MIGRATION_MODULES = _DisableMigrations()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        populate(args.results, args.rows_per_result)
+        print(f"Synthetic data: {args.results} results, {args.results * args.rows_per_result:,} rows")
+
+        old_s, old_q, old_df = _run(get_details_per_row, args.repeat)
+        new_s, new_q, new_df = _run(data.get_details, args.repeat)
+
+        object_cols = ["wave_role", "patch"]
+        plain_cols = [col for col in old_df.columns if col not in object_cols + ["bcs"]]
+        pd.testing.assert_frame_equal(old_df[plain_cols], new_df[plain_cols])
+        for col in object_cols:
+            assert _pks(old_df[col]) == _pks(new_df[col]), col
+        assert [_pks(bcs) for bcs in old_df["bcs"]] == [_pks(bcs) for bcs in new_df["bcs"]], "bcs"
+        print(f"Outputs identical: {len(new_df):,} rows")
+
+        print(f"  per-row    : {old_s * 1000:8.0f} ms   {old_q:5d} queries")
+        print(f"  vectorised : {new_s * 1000:8.0f} ms   {new_q:5d} queries")
+        print(f"  speedup    : {old_s / new_s:8.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""benchmark_placement_cache.py — Time cold and incremental placement cache regeneration.
+
+Writes synthetic live snapshots for every league into a temporary CSV_DATA
+tree (default 20,000 players x 96 snapshots, i.e. a full 48-hour tourney at
+30-minute intervals) and times:
+
+- a cold ``execute_once`` run (no existing caches, all leagues concurrently);
+- an incremental run after one more snapshot per league;
+- an up-to-date run with nothing new.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/benchmark_placement_cache.py
+    python scripts/benchmark_placement_cache.py --players 30000 --snapshots 96 --workers 1
+"""
+
+import argparse
+import datetime
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+def write_snapshots(league_dir: Path, players: int, snapshots: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    league_dir.mkdir(parents=True, exist_ok=True)
+    player_ids = np.array([f"{x:016X}" for x in rng.choice(10**12, players, replace=False)], dtype=object)
+    names = np.array([f"player{i}" for i in range(players)], dtype=object)
+    brackets = np.array([f"{i // 30:08X}" for i in range(players)], dtype=object)
+    joined = np.sort(rng.integers(0, max(snapshots // 2, 1), players))
+    waves = np.zeros(players, dtype=np.int64)
+    start = datetime.datetime(2026, 1, 3, 0, 30)
+    for i in range(snapshots):
+        active = joined <= i
+        waves[active] += rng.integers(0, 40, active.sum())
+        df = pd.DataFrame(
+            {
+                "player_id": player_ids[active],
+                "name": names[active],
+                "avatar": 1,
+                "relic": 2,
+                "wave": waves[active],
+                "bracket": brackets[active],
+                "tourney_number": 1,
+            }
+        ).sort_values("wave", ascending=False)
+        df.to_csv(league_dir / f"{(start + datetime.timedelta(minutes=30 * i)):%Y-%m-%d__%H_%M}.csv.gz", index=False, compression="gzip")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark placement cache generation on synthetic snapshots")
+    parser.add_argument("--players", type=int, default=20000, help="Players per league")
+    parser.add_argument("--snapshots", type=int, default=96, help="Snapshots per league")
+    parser.add_argument("--workers", type=int, default=None, help="Leagues processed concurrently (default: all)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CSV_DATA"] = tmp
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+        # "import" is a keyword, so the generator module can only be loaded by name; it sets up Django itself.
+        generator = importlib.import_module("thetower.backend.tourney_results.import.generate_placement_cache")
+        workers = args.workers or generator.DEFAULT_WORKERS
+
+        t0 = perf_counter()
+        for seed, league in enumerate(generator.leagues):
+            write_snapshots(Path(tmp) / "current_tourney" / league, args.players, args.snapshots + 1, seed)
+        print(f"Wrote {len(generator.leagues)} leagues x {args.snapshots + 1} snapshots x {args.players:,} players in {perf_counter() - t0:.1f}s")
+
+        # Hold back the last snapshot of each league for the incremental run.
+        held = []
+        for league in generator.leagues:
+            last = sorted((Path(tmp) / "current_tourney" / league).glob("*.csv.gz"))[-1]
+            held.append((last, last.rename(last.with_suffix(".held"))))
+
+        timings = {}
+        t0 = perf_counter()
+        generator.execute_once(workers=workers)
+        timings["cold"] = perf_counter() - t0
+
+        for original, moved in held:
+            moved.rename(original)
+        t0 = perf_counter()
+        generator.execute_once(workers=workers)
+        timings["incremental (+1 snapshot)"] = perf_counter() - t0
+
+        t0 = perf_counter()
+        generator.execute_once(workers=workers)
+        timings["up to date"] = perf_counter() - t0
+
+    print(f"workers={workers}")
+    for label, seconds in timings.items():
+        print(f"  {label:<26} {seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""benchmark_reconstruct.py — Compare the old pivot/melt ``reconstruct_all_snapshots`` with the sparse one.
+
+Builds a synthetic delta archive shaped like a busy Legend/Champion tourney
+(default: 30,000 players, 50 snapshots, players joining throughout the day and
+changing wave on roughly half of the snapshots), then times both
+implementations and records their peak traced memory.  The outputs are checked
+for equality before any numbers are printed.
+
+No Django or CSV_DATA setup is needed; everything runs in memory.
+
+Usage (from repo root, venv activated):
+
+    python scripts/benchmark_reconstruct.py
+    python scripts/benchmark_reconstruct.py --players 50000 --snapshots 56 --repeat 5
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+# Make sure the src layout is importable when run from the repo root.
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from thetower.backend.tourney_results.archive_utils import reconstruct_all_snapshots  # noqa: E402
+
+
+def reconstruct_all_snapshots_pivot(archive: pd.DataFrame, extra_timestamps=None) -> pd.DataFrame:
+    """The previous dense pivot/melt implementation, kept here as the baseline."""
+    if archive.empty:
+        return pd.DataFrame()
+
+    times = sorted(archive["snapshot_time"].unique())
+    if extra_timestamps is not None:
+        all_times = sorted(set(times) | {pd.Timestamp(t) for t in extra_timestamps})
+    else:
+        all_times = times
+
+    pivot = archive.pivot_table(index="snapshot_time", columns="player_id", values="wave", aggfunc="last")
+    pivot = pivot.reindex(all_times).ffill()
+
+    long = pivot.reset_index().melt(id_vars=["snapshot_time"], var_name="player_id", value_name="wave")
+    long = long.dropna(subset=["wave"])
+    long["wave"] = long["wave"].astype(int)
+
+    static_cols = ["name", "avatar", "relic", "bracket", "tourney_number"]
+    static = archive.sort_values("snapshot_time").groupby("player_id").last()[static_cols]
+    long = long.join(static, on="player_id")
+
+    long = long.rename(columns={"snapshot_time": "datetime"})
+    long = long.sort_values(["datetime", "wave"], ascending=[True, False]).reset_index(drop=True)
+    return long
+
+
+def make_archive(players: int, snapshots: int, seed: int = 0) -> tuple[pd.DataFrame, list[pd.Timestamp]]:
+    """Return a synthetic delta archive plus the full list of snapshot timestamps."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2026-01-03 00:30")
+    times = [start + pd.Timedelta(minutes=30 * i) for i in range(snapshots)]
+
+    player_ids = np.array([f"{x:016X}" for x in rng.choice(2**60, players, replace=False)], dtype=object)
+    join_at = np.sort(rng.integers(0, snapshots, players))
+
+    frames = []
+    waves = np.zeros(players, dtype=np.int64)
+    for i, ts in enumerate(times):
+        active = np.flatnonzero(join_at <= i)
+        joined_now = join_at[active] == i
+        changed = joined_now | (rng.random(len(active)) < 0.5)
+        waves[active[changed]] += rng.integers(1, 40, changed.sum())
+        idx = active[changed]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "snapshot_time": ts,
+                    "player_id": player_ids[idx],
+                    "name": [f"player{j}" for j in idx],
+                    "avatar": 1,
+                    "relic": 2,
+                    "wave": waves[idx],
+                    "bracket": [f"BR{j // 30:05d}" for j in idx],
+                    "tourney_number": 123,
+                }
+            )
+        )
+
+    archive = pd.concat(frames, ignore_index=True)
+    # Drop a couple of snapshots' deltas entirely to exercise extra_timestamps forward-fill.
+    silent = {times[snapshots // 3], times[2 * snapshots // 3]}
+    archive = archive[~archive["snapshot_time"].isin(silent)].reset_index(drop=True)
+    return archive, times
+
+
+def _measure(func, archive, times, repeat: int) -> tuple[float, float, pd.DataFrame]:
+    """Return (best wall seconds, peak traced MB, result) for ``func``."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = perf_counter()
+        result = func(archive, extra_timestamps=times)
+        best = min(best, perf_counter() - t0)
+
+    tracemalloc.start()
+    func(archive, extra_timestamps=times)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1_000_000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reconstruct_all_snapshots against the old pivot/melt version")
+    parser.add_argument("--players", type=int, default=30_000, help="Number of players in the synthetic archive")
+    parser.add_argument("--snapshots", type=int, default=50, help="Number of snapshots in the synthetic archive")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    archive, times = make_archive(args.players, args.snapshots)
+    print(f"Synthetic archive: {args.players:,} players, {args.snapshots} snapshots, {len(archive):,} delta rows")
+
+    old_s, old_mb, old_df = _measure(reconstruct_all_snapshots_pivot, archive, times, args.repeat)
+    new_s, new_mb, new_df = _measure(reconstruct_all_snapshots, archive, times, args.repeat)
+
+    pd.testing.assert_frame_equal(old_df, new_df, check_dtype=False)
+    print(f"Outputs identical: {len(new_df):,} rows")
+    print(f"  pivot/melt : {old_s * 1000:8.0f} ms   peak {old_mb:8.1f} MB")
+    print(f"  sparse     : {new_s * 1000:8.0f} ms   peak {new_mb:8.1f} MB")
+    print(f"  speedup    : {old_s / new_s:8.1f}x  memory {old_mb / new_mb:6.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
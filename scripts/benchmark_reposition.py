@@ -0,0 +1,211 @@
+"""benchmark_reposition.py — Compare the old loop/bulk_update ``reposition`` with the vectorised one.
+
+Creates a throwaway in-memory test database (tables created straight from the
+models) holding one Legend result with a configurable number of rows (plenty of
+wave ties), then flags a handful of players near the top as sus so almost every
+row below them moves.  Before each run the stored positions are reset to the
+pre-moderation ranking and the player summaries rebuilt, so both
+implementations do the same amount of work.
+The old and new ``calculate_positions`` are also compared on random inputs with
+nested exclusion sets, and the final stored positions of both ``reposition``
+implementations are checked for equality before timings and query counts are
+printed, as are the player summaries ``reposition`` maintained against a rebuild.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/benchmark_reposition.py
+    python scripts/benchmark_reposition.py --rows 25000 --flagged 40 --repeat 5
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment  # noqa: E402
+
+from thetower.backend.sus.models import ModerationRecord  # noqa: E402
+from thetower.backend.tourney_results import player_summary, tourney_utils  # noqa: E402
+from thetower.backend.tourney_results.constants import legend  # noqa: E402
+from thetower.backend.tourney_results.data import get_banned_ids, get_shun_ids, get_sus_ids  # noqa: E402
+from thetower.backend.tourney_results.models import PlayerSummary, TourneyResult, TourneyRow  # noqa: E402
+from thetower.backend.tourney_results.shun_config import include_shun_enabled_for  # noqa: E402
+
+
+class _DisableMigrations(dict):
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+def calculate_positions_loop(ids, indices, waves, exclude_ids) -> list[int]:
+    """The previous loop implementation, kept here as the baseline."""
+    positions = []
+    current = 0
+    borrow = 1
+    last_valid_wave = None
+
+    if any(isinstance(item, (list, set)) for item in exclude_ids):
+        exclude_ids = set().union(*exclude_ids)
+    else:
+        exclude_ids = set(exclude_ids)
+
+    for id_, idx, wave in zip(ids, indices, waves):
+        if id_ in exclude_ids:
+            positions.append(-1)
+            continue
+
+        if last_valid_wave is not None and wave == last_valid_wave:
+            borrow += 1
+        else:
+            current += borrow
+            borrow = 1
+
+        positions.append(current)
+        last_valid_wave = wave
+
+    return positions
+
+
+def reposition_bulk_update(tourney_result: TourneyResult) -> int:
+    """The previous ``reposition``: queryset walk plus model-instance ``bulk_update``."""
+    qs = tourney_result.rows.all().order_by("-wave")
+    bulk_data = qs.values_list("player_id", "wave", "nickname")
+    indexes = [idx for idx, _ in enumerate(bulk_data)]
+    ids = [datum[0] for datum in bulk_data]
+    waves = [datum[1] for datum in bulk_data]
+
+    excluded_ids = get_sus_ids() | get_banned_ids()
+    if not include_shun_enabled_for("reposition"):
+        excluded_ids = excluded_ids | get_shun_ids()
+    positions = calculate_positions_loop(ids, indexes, waves, excluded_ids)
+
+    bulk_update_data = []
+    for index, obj in enumerate(qs):
+        if obj.position != positions[index]:
+            obj.position = positions[index]
+            bulk_update_data.append(obj)
+
+    if bulk_update_data:
+        TourneyRow.objects.bulk_update(bulk_update_data, ["position"])
+    return len(bulk_update_data)
+
+
+def check_calculate_positions(cases: int = 300, seed: int = 1) -> None:
+    rng = np.random.default_rng(seed)
+    for _ in range(cases):
+        n = int(rng.integers(0, 60))
+        ids = [f"P{int(i)}" for i in rng.integers(0, 40, n)]
+        waves = np.sort(rng.integers(0, 8, n))[::-1].tolist()
+        flagged = [f"P{int(i)}" for i in rng.integers(0, 40, int(rng.integers(0, 10)))]
+        exclude = [set(flagged[::2]), set(flagged[1::2])] if rng.random() < 0.5 else set(flagged)
+        expected = calculate_positions_loop(ids, range(n), waves, exclude)
+        assert tourney_utils.calculate_positions(ids, range(n), waves, exclude) == expected, (ids, waves, exclude)
+    print(f"calculate_positions identical on {cases} random cases")
+
+
+def populate(rows: int, flagged: int, seed: int = 0) -> tuple[TourneyResult, dict[int, int]]:
+    """Return the result and the pre-moderation positions by row id."""
+    rng = np.random.default_rng(seed)
+    result = TourneyResult.objects.create(result_file="uploads/x.csv", date=datetime.date(2025, 1, 1), league=legend, public=True)
+
+    waves = np.sort(rng.integers(200, 6000, rows))[::-1]  # ~25 players per distinct wave on 25k rows
+    player_ids = [f"{int(i):016X}" for i in rng.choice(2**40, rows, replace=False)]
+    initial = calculate_positions_loop(player_ids, range(rows), waves.tolist(), set())
+    TourneyRow.objects.bulk_create(
+        [
+            TourneyRow(player_id=player_id, position=position, nickname=f"nick{i}", wave=int(wave), result=result)
+            for i, (player_id, wave, position) in enumerate(zip(player_ids, waves, initial))
+        ],
+        batch_size=5000,
+    )
+
+    for player_id in rng.choice(player_ids[: max(1, rows // 50)], flagged, replace=False):
+        ModerationRecord.objects.create(tower_id=player_id, moderation_type=ModerationRecord.ModerationType.SUS)
+
+    row_ids = TourneyRow.objects.filter(result=result).order_by("id").values_list("id", flat=True)
+    return result, dict(zip(row_ids, initial))
+
+
+def _reset(result: TourneyResult, initial: dict[int, int]) -> None:
+    rows = list(TourneyRow.objects.filter(result=result))
+    for row in rows:
+        row.position = initial[row.id]
+    TourneyRow.objects.bulk_update(rows, ["position"], batch_size=2000)
+    player_summary.rebuild()
+
+
+def _summaries() -> list[tuple]:
+    return list(PlayerSummary.objects.order_by("player_id").values_list(*["player_id", *player_summary._FIELDS]))
+
+
+def _stored_positions(result: TourneyResult) -> list[tuple[int, int]]:
+    return list(TourneyRow.objects.filter(result=result).order_by("id").values_list("id", "position"))
+
+
+def _run(func, result: TourneyResult, initial: dict[int, int], repeat: int) -> tuple[float, int, int, list]:
+    """Return (best wall seconds, queries of the last run, changes, stored positions) for ``func``."""
+    best = float("inf")
+    changes = 0
+    for _ in range(repeat):
+        _reset(result, initial)
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = perf_counter()
+            changes = func(result)
+            best = min(best, perf_counter() - t0)
+    return best, len(ctx.captured_queries), changes, _stored_positions(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reposition against the old loop/bulk_update implementation")
+    parser.add_argument("--rows", type=int, default=25_000, help="Rows in the Legend result")
+    parser.add_argument("--flagged", type=int, default=25, help="Players near the top to flag as sus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    check_calculate_positions()
+
+    settings.MIGRATION_MODULES = _DisableMigrations()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        result, initial = populate(args.rows, args.flagged)
+        tourney_utils.get_sus_ids()  # warm the moderation snapshot outside the timings
+        print(f"Synthetic data: 1 {legend} result, {args.rows:,} rows, {args.flagged} flagged players")
+
+        old_s, old_q, old_changes, old_positions = _run(reposition_bulk_update, result, initial, args.repeat)
+        new_s, new_q, new_changes, new_positions = _run(tourney_utils.reposition, result, initial, args.repeat)
+
+        assert old_changes == new_changes, (old_changes, new_changes)
+        assert old_positions == new_positions, "stored positions differ"
+        print(f"Stored positions identical: {new_changes:,} rows changed")
+        maintained = _summaries()
+        player_summary.rebuild()
+        assert maintained == _summaries(), "player summaries differ from a rebuild"
+        print(f"Player summaries identical to a rebuild: {len(maintained):,} players")
+
+        print(f"  loop + bulk_update : {old_s * 1000:8.0f} ms   {old_q:5d} queries")
+        print(f"  vectorised + join  : {new_s * 1000:8.0f} ms   {new_q:5d} queries")
+        print(f"  speedup            : {old_s / new_s:8.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
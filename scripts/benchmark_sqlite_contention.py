@@ -0,0 +1,169 @@
+"""benchmark_sqlite_contention.py — Page reads against a concurrent importer, with and without the SQLite tuning.
+
+Creates a throwaway SQLite file holding the tourney tables, seeds it with some
+results, then starts one importer process — which keeps writing new results
+the way ``create_tourney_rows`` does: batched ``bulk_create`` calls inside one
+transaction per result — and several reader processes running the queries of
+the results and player pages.  Each scenario gets a fresh file:
+
+- ``untuned``: rollback journal and SQLite defaults; pages read on ``default``.
+- ``tuned``: the ``SQLITE_PRAGMAS`` from settings (WAL, mmap, page cache,
+  in-memory temp store); pages read on the ``readonly`` alias.
+
+Read latency percentiles, reads per second and importer throughput are printed
+for each scenario.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/benchmark_sqlite_contention.py
+    python scripts/benchmark_sqlite_contention.py --readers 8 --duration 20 --rows-per-result 25000
+"""
+
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+os.environ["TOWERDB_READONLY"] = "1"
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+
+from thetower.backend.tourney_results.constants import how_many_results_public_site, leagues  # noqa: E402
+from thetower.backend.tourney_results.models import TourneyResult, TourneyRow  # noqa: E402
+from thetower.backend.towerdb.routers import READ_ONLY_DB_ALIAS  # noqa: E402
+
+SCENARIOS = {
+    # name: (pragmas applied to each connection, alias the pages read on)
+    "untuned": ({"journal_mode": "DELETE"}, "default"),
+    "tuned": (settings.SQLITE_PRAGMAS, READ_ONLY_DB_ALIAS),
+}
+ID_POOL = 50_000
+BATCH = 5000
+
+
+def _use_file(path: str) -> None:
+    """Point every alias at ``path``; connections opened from now on use it."""
+    connections.close_all()
+    for alias in connections:
+        connections.settings[alias]["NAME"] = path
+
+
+def _create_schema() -> None:
+    # The history table references the user table.
+    with connection.schema_editor() as editor:
+        for model in (get_user_model(), TourneyResult, TourneyResult.history.model, TourneyRow):
+            editor.create_model(model)
+
+
+def _import_result(rng: np.random.Generator, day: int, rows: int) -> None:
+    """Write one result like ``create_tourney_rows``: one transaction, batched inserts."""
+    with transaction.atomic():
+        result = TourneyResult.objects.create(
+            result_file="uploads/x.csv",
+            date=datetime.date(2020, 1, 1) + datetime.timedelta(days=day),
+            league=leagues[day % len(leagues)],
+            public=True,
+        )
+        waves = np.sort(rng.integers(1, 5000, rows))[::-1]
+        player_ids = rng.integers(0, ID_POOL, rows)
+        TourneyRow.objects.bulk_create(
+            (
+                TourneyRow(player_id=f"{player_id:016X}", nickname=f"nick{player_id}", wave=int(wave), position=position, result=result)
+                for position, (player_id, wave) in enumerate(zip(player_ids, waves), 1)
+            ),
+            batch_size=BATCH,
+        )
+
+
+def _importer(first_day: int, rows: int, stop, out) -> None:
+    rng = np.random.default_rng(1)
+    written = 0
+    start = perf_counter()
+    day = first_day
+    while not stop.is_set():
+        _import_result(rng, day, rows)
+        written += rows
+        day += 1
+    out.put(("importer", written / (perf_counter() - start)))
+
+
+def _reader(seed: int, alias: str, stop, out) -> None:
+    rng = np.random.default_rng(seed)
+    result_ids = list(TourneyResult.objects.using(alias).values_list("id", flat=True))
+    latencies = []
+    while not stop.is_set():
+        t0 = perf_counter()
+        if rng.random() < 0.5:
+            # results page: a leaderboard slice of one tourney
+            offset = int(rng.integers(0, 1000))
+            rows = TourneyRow.objects.using(alias).filter(result_id=int(rng.choice(result_ids)), position__gte=offset, position__lt=offset + 100)
+        else:
+            # player page: every public row of one id, with its results
+            player_id = f"{int(rng.integers(0, ID_POOL)):016X}"
+            rows = TourneyRow.objects.using(alias).filter(player_id=player_id, result__public=True, position__lte=how_many_results_public_site)
+        list(rows.values("player_id", "position", "nickname", "wave", "result__date", "result__league"))
+        latencies.append(perf_counter() - t0)
+    out.put(("reader", latencies))
+
+
+def _run_scenario(name: str, args) -> None:
+    pragmas, alias = SCENARIOS[name]
+    settings.SQLITE_PRAGMAS = pragmas
+    with tempfile.TemporaryDirectory() as tmp:
+        _use_file(str(Path(tmp) / "tower.sqlite3"))
+        _create_schema()
+        rng = np.random.default_rng(0)
+        for day in range(args.seed_results):
+            _import_result(rng, day, args.rows_per_result)
+        connections.close_all()  # SQLite connections must not cross a fork
+
+        ctx = multiprocessing.get_context("fork")
+        stop, out = ctx.Event(), ctx.Queue()
+        workers = [ctx.Process(target=_importer, args=(args.seed_results, args.rows_per_result, stop, out))]
+        workers += [ctx.Process(target=_reader, args=(seed, alias, stop, out)) for seed in range(args.readers)]
+        for worker in workers:
+            worker.start()
+        ctx.Event().wait(args.duration)
+        stop.set()
+        reports = [out.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    rows_per_s = next(value for kind, value in reports if kind == "importer")
+    latencies = np.concatenate([value for kind, value in reports if kind == "reader"]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(
+        f"  {name:8s}: {len(latencies) / args.duration:8,.0f} reads/s   "
+        f"p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   p99 {p99:7.1f} ms   max {latencies.max():8.1f} ms   "
+        f"importer {rows_per_s:8,.0f} rows/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark page reads against a concurrent importer")
+    parser.add_argument("--readers", type=int, default=4, help="Reader processes")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario")
+    parser.add_argument("--seed-results", type=int, default=20, help="Results written before the run")
+    parser.add_argument("--rows-per-result", type=int, default=10000, help="Rows per imported result")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), nargs="+", default=list(SCENARIOS), help="Scenarios to run")
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.duration:g}s per scenario, {args.rows_per_result:,} rows per imported result")
+    for name in args.scenario:
+        _run_scenario(name, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""check_league_fetch.py — Run both leaderboard fetchers against a local stand-in for the leaderboard endpoint.
+
+Starts a threaded HTTP server on localhost that serves a canned leaderboard CSV
+per league (``?tier=<league>``), answering each request after ``--delay``
+seconds.  Some leagues fail their first request (503, or a dropped connection)
+to exercise the per-league retries.  ``get_live_results.get_results`` and
+``get_results.get_results`` then run against it with ``CSV_DATA`` pointed at a
+temporary folder.  The script checks that every league's file was written
+with the canned rows under one shared name, and prints how far apart the
+leagues' fetches completed.  It exits with a non-zero code on any mismatch.
+
+No database is needed.
+
+Usage (from repo root, venv activated):
+
+    python scripts/check_league_fetch.py
+    python scripts/check_league_fetch.py --delay 1.5 --rows 25000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from thetower.backend.tourney_results import get_live_results, get_results  # noqa: E402
+from thetower.backend.tourney_results.constants import leagues  # noqa: E402
+
+PASS = "\033[32mPASS\033[0m"
+FAIL = "\033[31mFAIL\033[0m"
+
+COLUMNS = ["player_id", "name", "avatar", "relic", "wave", "bracket", "tourney_number"]
+# league -> how its first request fails
+FAILURES = {leagues[1]: "503", leagues[3]: "drop"}
+
+
+def _canned_leaderboard(league: str, rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "player_id": [f"{x:016X}" for x in rng.choice(2**48, rows, replace=False)],
+            "name": [f"{league[:3]}{i} " for i in range(rows)],  # trailing space: the fetchers strip names
+            "avatar": rng.integers(-1, 40, rows),
+            "relic": rng.integers(-1, 60, rows),
+            "wave": rng.integers(1, 5000, rows),
+            "bracket": [f" B{i // 30:05d}" for i in range(rows)],
+            "tourney_number": 1,
+        }
+    )
+
+
+class _Server:
+    """Stand-in leaderboard endpoint: ``GET /?tier=<league>`` returns that league's CSV without a header row."""
+
+    def __init__(self, boards: dict[str, pd.DataFrame], delay: float):
+        self.bodies = {league: df.to_csv(index=False, header=False).encode() for league, df in boards.items()}
+        self.delay = delay
+        self.requests: dict[str, int] = {}
+        self.served_at: dict[str, float] = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                league = parse_qs(urlparse(self.path).query).get("tier", [""])[0]
+                with server.lock:
+                    server.requests[league] = attempt = server.requests.get(league, 0) + 1
+                threading.Event().wait(server.delay)
+                failure = FAILURES.get(league) if attempt == 1 else None
+                if failure == "drop":
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+                    return
+                if failure == "503" or league not in server.bodies:
+                    self.send_error(503 if failure else 404)
+                    return
+                body = server.bodies[league]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.served_at[league] = perf_counter()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self) -> None:
+        self.requests.clear()
+        self.served_at.clear()
+
+
+def _check_files(label: str, paths: dict[str, Path], boards: dict[str, pd.DataFrame]) -> bool:
+    ok = True
+    for league, df in boards.items():
+        path = paths[league]
+        if not path.exists():
+            print(f"  [{FAIL}] {label}: {league} not written ({path})")
+            ok = False
+            continue
+        stored = pd.read_csv(path, dtype={"player_id": str})
+        if not stored.wave.is_monotonic_decreasing:
+            print(f"  [{FAIL}] {label}: {league} rows are not sorted by wave")
+            ok = False
+        stored = stored.sort_values("player_id").reset_index(drop=True)
+        expected = df.assign(name=df.name.str.strip(), bracket=df.bracket.str.strip()).sort_values("player_id").reset_index(drop=True)
+        if not stored[COLUMNS].equals(expected[COLUMNS]):
+            print(f"  [{FAIL}] {label}: {league} rows differ from the canned leaderboard")
+            ok = False
+    return ok
+
+
+def _run(label: str, server: _Server, run, paths: dict[str, Path], boards: dict[str, pd.DataFrame]) -> bool:
+    server.reset()
+    start = perf_counter()
+    run()
+    elapsed = perf_counter() - start
+    ok = _check_files(label, paths, boards)
+    served = sorted(server.served_at.values())
+    spread = served[-1] - served[0] if served else float("nan")
+    retried = sorted(league for league, count in server.requests.items() if count > 1)
+    print(f"  [{PASS if ok else FAIL}] {label}: {len(served)} leagues in {elapsed:.1f}s, fetches completed within {spread:.2f}s, retried: {retried}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the leaderboard fetchers against a local stand-in server")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds the server takes per request")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per canned leaderboard")
+    args = parser.parse_args()
+
+    boards = {league: _canned_leaderboard(league, args.rows, seed) for seed, league in enumerate(leagues)}
+    server = _Server(boards, args.delay)
+    ok = True
+    with tempfile.TemporaryDirectory() as csv_data:
+        os.environ["CSV_DATA"] = csv_data
+        os.environ["NEW_LEADERBOARD_URL"] = server.url
+        os.environ["LEADERBOARD_PASS"] = "test"
+
+        # Tourney day, 12:00 UTC: get_live_results takes a snapshot.
+        tourney_day = datetime.datetime(2025, 1, 1, 12, 0, tzinfo=datetime.UTC)
+        get_live_results.get_current_time__game_server = lambda: tourney_day
+        name = get_live_results.get_file_name()
+        paths = {league: Path(csv_data) / "current_tourney" / league / name for league in leagues}
+        ok &= _run("get_live_results", server, get_live_results.get_results, paths, boards)
+
+        # Two days later: get_results stores the final leaderboards.
+        get_results.get_current_time__game_server = lambda: tourney_day + datetime.timedelta(days=2)
+        for league in leagues:
+            (Path(csv_data) / league).mkdir()
+        name = get_results.get_file_name()
+        paths = {league: Path(csv_data) / league / name for league in leagues}
+        ok &= _run("get_results", server, get_results.get_results, paths, boards)
+    server.httpd.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
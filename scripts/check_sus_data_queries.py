@@ -0,0 +1,116 @@
+"""check_sus_data_queries.py — Regression check: ``get_sus_data`` query count must not grow with N.
+
+Creates a throwaway in-memory test database (tables created straight from the
+models), fills it with N active sus players for several N — a mix of players
+linked to a GameInstance, unlinked tower_ids, banned players and resolved
+records — and counts the queries ``get_sus_data`` runs with and without
+HIDDEN_FEATURES.  The script exits with a non-zero code if the count differs
+between sizes.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/check_sus_data_queries.py
+    python scripts/check_sus_data_queries.py --sizes 5 50 500
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from thetower.backend.sus.models import GameInstance, KnownPlayer, ModerationRecord, PlayerId  # noqa: E402
+from thetower.backend.tourney_results.data import get_sus_data  # noqa: E402
+
+PASS = "\033[32mPASS\033[0m"
+FAIL = "\033[31mFAIL\033[0m"
+
+
+class _DisableMigrations(dict):
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+def _populate(n: int) -> None:
+    """Replace all moderation data with ``n`` active sus tower_ids."""
+    ModerationRecord.objects.all().delete()
+    PlayerId.objects.all().delete()
+    GameInstance.objects.all().delete()
+    KnownPlayer.objects.all().delete()
+
+    sus = ModerationRecord.ModerationType.SUS
+    for i in range(n):
+        tower_id = f"{i:016X}"
+        game_instance = None
+        if i % 3:
+            player = KnownPlayer.objects.create(name=f"Player {i}", approved=True)
+            game_instance = GameInstance.objects.create(player=player, primary=True)
+            PlayerId.objects.create(id=tower_id, game_instance=game_instance, primary=True)
+        ModerationRecord.objects.create(tower_id=tower_id, game_instance=game_instance, moderation_type=sus, reason=f"reason {i}")
+        if i % 4 == 0:
+            ModerationRecord.objects.create(tower_id=tower_id, game_instance=game_instance, moderation_type=ModerationRecord.ModerationType.BAN)
+        if i % 5 == 0:
+            ModerationRecord.objects.create(tower_id=tower_id, moderation_type=sus, resolved_at=timezone.now())
+
+
+def _count_queries(hidden: bool) -> tuple[int, int]:
+    """Return (query count, rows returned) for one ``get_sus_data`` call."""
+    if hidden:
+        os.environ["HIDDEN_FEATURES"] = "1"
+    else:
+        os.environ.pop("HIDDEN_FEATURES", None)
+    with CaptureQueriesContext(connection) as ctx:
+        data = get_sus_data()
+    return len(ctx.captured_queries), len(data)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that get_sus_data runs a constant number of queries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 400], help="Numbers of sus players to test with")
+    args = parser.parse_args()
+
+    hidden_before = os.environ.get("HIDDEN_FEATURES")
+    settings.MIGRATION_MODULES = _DisableMigrations()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    ok = True
+    try:
+        for hidden in (False, True):
+            label = "hidden features" if hidden else "public site"
+            counts = {}
+            for n in args.sizes:
+                _populate(n)
+                counts[n], rows = _count_queries(hidden)
+                if rows != n:
+                    print(f"  [{FAIL}] {label}: expected {n} rows, got {rows}")
+                    ok = False
+            flat = len(set(counts.values())) == 1
+            ok &= flat
+            detail = ", ".join(f"N={n}: {c}" for n, c in counts.items())
+            print(f"  [{PASS if flat else FAIL}] {label}: {detail}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if hidden_before is None:
+            os.environ.pop("HIDDEN_FEATURES", None)
+        else:
+            os.environ["HIDDEN_FEATURES"] = hidden_before
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""check_tourney_row_query_plans.py — Regression check: no historical page may scan all of ``TourneyRow``.
+
+Creates a throwaway in-memory test database (tables and indexes created straight
+from the models) and runs the ``TourneyRow`` reads of ``get_tourneys``, the
+player and comparison pages, the counts page and the median history page,
+capturing the SQL they issue.  Every captured statement that touches the rows
+table is run through ``EXPLAIN QUERY PLAN``; the script exits with a non-zero
+code if any plan scans ``tourney_results_tourneyrow`` (with or without an index)
+instead of searching it.
+
+The database is not ``ANALYZE``d, as in production, so the plans are the ones
+SQLite derives from the schema alone.
+
+Usage (from repo root, venv activated, DJANGO_DATA set):
+
+    python scripts/check_tourney_row_query_plans.py
+    python scripts/check_tourney_row_query_plans.py --verbose
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment  # noqa: E402
+
+from thetower.backend.tourney_results import data, thresholds  # noqa: E402
+from thetower.backend.tourney_results.constants import champ, how_many_results_public_site, legend  # noqa: E402
+from thetower.backend.tourney_results.models import PlacementThreshold, TourneyResult, TourneyRow  # noqa: E402
+
+PASS = "\033[32mPASS\033[0m"
+FAIL = "\033[31mFAIL\033[0m"
+
+ROWS_TABLE = TourneyRow._meta.db_table
+FULL_SCAN = re.compile(rf"\bSCAN {ROWS_TABLE}\b")
+
+PLAYER_IDS = ["0000000000000001", "0000000000000002", "0000000000000003"]
+
+
+class _DisableMigrations(dict):
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+def _populate() -> None:
+    start = datetime.date(2025, 1, 1)
+    for i in range(6):
+        TourneyResult.objects.create(
+            result_file="uploads/x.csv", date=start + datetime.timedelta(days=3 * i), league=[champ, legend][i % 2], public=True
+        )
+
+
+def _player_page(player_ids: list[str]) -> None:
+    # web/historical/player.py
+    rows = TourneyRow.objects.filter(player_id__in=player_ids, result__public=True, position__lte=how_many_results_public_site)
+    bool(rows)  # the page's "no results" check
+    data.get_details(rows)
+
+
+def _single_player_page() -> None:
+    # web/historical/player.py, id without a PlayerId record
+    rows = TourneyRow.objects.filter(player_id=PLAYER_IDS[0], result__public=True, position__lte=how_many_results_public_site)
+    bool(rows)  # the page's "no results" check
+    data.get_details(rows)
+
+
+def _comparison_page() -> None:
+    # web/historical/comparison.py
+    rows = TourneyRow.objects.filter(player_id__in=set(PLAYER_IDS), result__public=True, position__lt=how_many_results_public_site)
+    data.get_details(rows)
+
+
+def _counts_page() -> None:
+    # web/historical/counts.py reads the global thresholds, which are computed from the rows at import.
+    results = TourneyResult.objects.filter(league=champ, public=True).order_by("-date")
+    list(PlacementThreshold.objects.filter(result__in=results, kind=PlacementThreshold.GLOBAL).values_list("result_id", "place", "wave"))
+    for result in results:
+        thresholds.global_place_waves(result)
+
+
+def _median_history_page() -> None:
+    # web/historical/median_history.py
+    result_ids = list(TourneyResult.objects.filter(league=legend, public=True).order_by("-date").values_list("id", flat=True)[:4])
+    list(TourneyRow.objects.filter(result__in=result_ids, position__gt=0).values("result_id", "wave"))
+
+
+CHECKS = {
+    "get_tourneys (results page)": lambda: data.get_tourneys(TourneyResult.objects.filter(league=champ, public=True), offset=0, limit=100),
+    "get_tourneys (one result, live pages)": lambda: data.get_tourneys([TourneyResult.objects.filter(league=legend).first()]),
+    "get_tourneys (player ids)": lambda: data.get_tourneys(TourneyResult.objects.filter(public=True), ids=PLAYER_IDS),
+    "player page": lambda: _player_page(PLAYER_IDS),
+    "player page (single id)": _single_player_page,
+    "comparison page": _comparison_page,
+    "counts page": _counts_page,
+    "median history page": _median_history_page,
+}
+
+
+def _plan(sql: str) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _check(label: str, func, verbose: bool) -> bool:
+    """Run ``func`` and check the plan of every rows-table statement it issued."""
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    statements = [query["sql"] for query in ctx.captured_queries if ROWS_TABLE in query["sql"]]
+    if not statements:
+        print(f"  [{FAIL}] {label}: issued no {ROWS_TABLE} query")
+        return False
+
+    ok = True
+    for sql in statements:
+        plan = _plan(sql)
+        scans = [step for step in plan if FULL_SCAN.search(step)]
+        ok &= not scans
+        if scans or verbose:
+            print(f"      {sql[:300]}{'...' if len(sql) > 300 else ''}")
+            for step in plan:
+                print(f"        {step}")
+    print(f"  [{PASS if ok else FAIL}] {label}: {len(statements)} statement(s)")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that the historical pages never scan the whole TourneyRow table")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only failing ones")
+    args = parser.parse_args()
+
+    hidden_before = os.environ.pop("HIDDEN_FEATURES", None)
+    settings.MIGRATION_MODULES = _DisableMigrations()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    ok = True
+    try:
+        _populate()
+        for label, func in CHECKS.items():
+            ok &= _check(label, func, args.verbose)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if hidden_before is not None:
+            os.environ["HIDDEN_FEATURES"] = hidden_before
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class SusConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "thetower.backend.sus"
+
+    def ready(self):
+        from django.db import transaction
+        from django.db.models.signals import post_delete, post_save
+
+        from . import data_versions
+        from .models import GameInstance, KnownPlayer, ModerationRecord, PlayerId
+
+        # Bumped once the change is committed, so other processes never rebuild from the old rows.
+        def bump_moderation(sender, **kwargs):
+            transaction.on_commit(lambda: data_versions.bump(data_versions.MODERATION))
+
+        def bump_identity(sender, **kwargs):
+            transaction.on_commit(lambda: data_versions.bump(data_versions.IDENTITY))
+
+        for model in (ModerationRecord, PlayerId):
+            post_save.connect(bump_moderation, sender=model, weak=False, dispatch_uid=f"moderation_version_save_{model.__name__}")
+            post_delete.connect(bump_moderation, sender=model, weak=False, dispatch_uid=f"moderation_version_delete_{model.__name__}")
+
+        for model in (KnownPlayer, GameInstance, PlayerId):
+            post_save.connect(bump_identity, sender=model, weak=False, dispatch_uid=f"identity_version_save_{model.__name__}")
+            post_delete.connect(bump_identity, sender=model, weak=False, dispatch_uid=f"identity_version_delete_{model.__name__}")
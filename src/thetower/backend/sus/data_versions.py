@@ -0,0 +1,68 @@
+"""Version counters for in-process caches of moderation and player-identity data.
+
+Django admin, the bot, the import services and the Streamlit pages all run in
+separate processes, so a plain in-memory counter would only invalidate caches
+in the process that made the change.  Each counter is therefore backed by a
+small stamp file in ``DJANGO_DATA/versions/`` which is rewritten on every bump;
+readers compare the file's mtime (one ``stat`` call) against the value their
+cache was built with.
+
+Bumps are wired to ``post_save``/``post_delete`` in ``SusConfig.ready`` and
+deferred with ``transaction.on_commit``: a bump seen before the change is
+committed would let another process rebuild its cache from the old rows.
+Queryset ``update()``/``bulk_*`` calls bypass those signals and must call
+``bump`` themselves.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ..env_config import get_django_data
+
+logger = logging.getLogger(__name__)
+
+MODERATION = "moderation"
+IDENTITY = "identity"
+PATCHES = "patches"
+
+_lock = threading.Lock()
+_local_versions: dict[str, int] = {}
+
+
+def _stamp_path(name: str) -> Optional[Path]:
+    try:
+        return get_django_data() / "versions" / f"{name}.version"
+    except RuntimeError:
+        return None
+
+
+def bump(name: str) -> None:
+    """Advance the ``name`` counter in this process and for every other process."""
+    with _lock:
+        _local_versions[name] = _local_versions.get(name, 0) + 1
+        local = _local_versions[name]
+
+    path = _stamp_path(name)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(f"{os.getpid()}:{local}\n", encoding="utf8")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning(f"Could not write version stamp {path}: {exc}")
+
+
+def current(name: str) -> tuple[int, int]:
+    """Return an opaque, comparable version of ``name``; it changes whenever ``bump`` is called."""
+    local = _local_versions.get(name, 0)
+    path = _stamp_path(name)
+    try:
+        stamp = path.stat().st_mtime_ns if path is not None else 0
+    except OSError:
+        stamp = 0
+    return local, stamp
@@ -6,12 +6,97 @@ class TourneyResultsConfig(AppConfig):
     name = "thetower.backend.tourney_results"
 
     def ready(self):
+        from django.conf import settings
         from django.db.backends.signals import connection_created
 
-        def set_wal_mode(sender, connection, **kwargs):
+        from ..towerdb.routers import READ_ONLY_DB_ALIAS
+
+        def tune_sqlite(sender, connection, **kwargs):
             if connection.vendor == "sqlite":
+                read_only = connection.alias == READ_ONLY_DB_ALIAS
                 with connection.cursor() as cursor:
-                    cursor.execute("PRAGMA journal_mode=WAL;")
-                    cursor.execute("PRAGMA synchronous=NORMAL;")
+                    for pragma, value in settings.SQLITE_PRAGMAS.items():
+                        if read_only and pragma == "journal_mode":
+                            continue  # changing it writes to the file; the writers keep it set
+                        cursor.execute(f"PRAGMA {pragma}={value};")
+                    if read_only:
+                        cursor.execute("PRAGMA query_only=ON;")
+
+        connection_created.connect(tune_sqlite, weak=False, dispatch_uid="tune_sqlite")
+
+        from django.db import transaction
+        from django.db.models.signals import post_delete, post_save
+
+        from ..sus import data_versions
+        from .models import PatchNew, Role
+
+        def bump_patches(sender, **kwargs):
+            transaction.on_commit(lambda: data_versions.bump(data_versions.PATCHES))
+
+        for model in (PatchNew, Role):
+            post_save.connect(bump_patches, sender=model, weak=False, dispatch_uid=f"patches_version_save_{model.__name__}")
+            post_delete.connect(bump_patches, sender=model, weak=False, dispatch_uid=f"patches_version_delete_{model.__name__}")
+
+        from ..sus.models import GameInstance, KnownPlayer, PlayerId
+        from . import player_summary, search_index
+
+        def refresh_players(player_ids):
+            search_index.refresh_known_names(player_ids)
+            player_summary.refresh_ids(player_ids)
+
+        def refresh_known_player(sender, instance, **kwargs):
+            refresh_players(search_index.ids_of_known_player(instance.pk))
+
+        def refresh_game_instance(sender, instance, **kwargs):
+            refresh_players(search_index.ids_of_game_instance(instance.pk))
+
+        def refresh_player_id(sender, instance, **kwargs):
+            # Making an id primary demotes the instance's other ids through update(), which sends no signal.
+            ids = search_index.ids_of_game_instance(instance.game_instance_id) if instance.game_instance_id else []
+            refresh_players([instance.pk, *ids])
+
+        for model, handler in ((KnownPlayer, refresh_known_player), (GameInstance, refresh_game_instance), (PlayerId, refresh_player_id)):
+            post_save.connect(handler, sender=model, weak=False, dispatch_uid=f"player_indexes_save_{model.__name__}")
+            post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f"player_indexes_delete_{model.__name__}")
+
+        import threading
+
+        from django.db.models.signals import pre_save
+
+        from .models import TourneyResult, TourneyRow
+
+        pending = threading.local()
+
+        def refresh_summaries_on_commit(player_ids):
+            # Collected per thread and refreshed once after commit, so deleting a result (which deletes
+            # its rows one signal at a time) re-aggregates each player once, from the committed rows.
+            pending.__dict__.setdefault("ids", set()).update(player_ids)
+            transaction.on_commit(flush_summaries)
+
+        def flush_summaries():
+            player_ids = pending.__dict__.pop("ids", None)
+            if player_ids:
+                player_summary.refresh_ids(player_ids)
+
+        def remember_result(sender, instance, **kwargs):
+            fields = TourneyResult.objects.filter(pk=instance.pk).values_list("public", "date", "league")
+            instance._summary_fields_before = fields.first() if instance.pk else None
+
+        def refresh_result(sender, instance, created, **kwargs):
+            # A new result has no rows yet; create_tourney_rows merges them in.
+            if created or getattr(instance, "_summary_fields_before", None) == (instance.public, instance.date, instance.league):
+                return
+            refresh_summaries_on_commit(instance.rows.values_list("player_id", flat=True).distinct())
+
+        def remember_row(sender, instance, **kwargs):
+            instance._summary_player_id_before = TourneyRow.objects.filter(pk=instance.pk).values_list("player_id", flat=True).first() if instance.pk else None
+
+        def refresh_row(sender, instance, **kwargs):
+            before = getattr(instance, "_summary_player_id_before", None)
+            refresh_summaries_on_commit({instance.player_id, *([before] if before else [])})
 
-        connection_created.connect(set_wal_mode, weak=False)
+        pre_save.connect(remember_result, sender=TourneyResult, weak=False, dispatch_uid="player_summary_presave_TourneyResult")
+        post_save.connect(refresh_result, sender=TourneyResult, weak=False, dispatch_uid="player_summary_save_TourneyResult")
+        pre_save.connect(remember_row, sender=TourneyRow, weak=False, dispatch_uid="player_summary_presave_TourneyRow")
+        post_save.connect(refresh_row, sender=TourneyRow, weak=False, dispatch_uid="player_summary_save_TourneyRow")
+        post_delete.connect(refresh_row, sender=TourneyRow, weak=False, dispatch_uid="player_summary_delete_TourneyRow")
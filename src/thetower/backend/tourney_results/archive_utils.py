@@ -13,26 +13,58 @@ written — this is the delta-compressed representation.  A full snapshot at any
 point in time can be reconstructed via ``reconstruct_at`` or
 ``reconstruct_all_snapshots``.
 
+Columnar companion
+------------------
+Every archive write also produces ``{date}_archive.col`` next to the CSV: a
+single uncompressed file holding one contiguous NumPy buffer per column
+(``snapshot_time`` as int64 nanoseconds, numeric columns as-is, and string
+columns dictionary-encoded as int32 codes plus a fixed-width unicode
+dictionary).  ``read_archive`` memory-maps it and only copies out the columns
+the caller asks for, so readers skip gzip, CSV parsing and ``to_datetime``.
+The CSV stays the portable copy; the columnar file is ignored whenever it is
+missing or older than the CSV.
+
+Append segments
+---------------
+While a tourney is live, ``append_snapshot_to_archive`` does not rewrite the
+archive.  Each snapshot's delta rows go into an immutable columnar segment
+``{date}_archive.segments/{YYYY-MM-DD__HH_MM}.col`` and a small ``state.json``
+sidecar in the same directory records the last-known wave per player, so an
+append costs O(new rows).  ``read_archive`` transparently concatenates the base
+archive (if any) with every segment newer than it.  ``compact_archive`` folds
+the segments into a single ``{date}_archive.csv.gz`` (+ ``.col``) when the
+tourney completes; any full archive write discards the segments it supersedes.
+
 Key functions
 -------------
 - ``group_snapshots_by_tourney``   — split a flat list of snapshot Paths into per-tourney groups
 - ``build_tourney_archive``        — build a delta archive from one tourney's snapshot list
-- ``append_snapshot_to_archive``   — incrementally append one snapshot's delta rows to an archive
+- ``append_snapshot_to_archive``   — incrementally append one snapshot's delta rows as a new segment
+- ``compact_archive``              — fold an archive's append segments into a single base file
 - ``build_all_archives``           — build all missing per-tourney archives for a league live dir
 - ``bundle_tourney_to_raw``        — tar a completed tourney's snapshots into cold storage
 - ``get_raw_path``                 — return the ``{league}_raw/`` directory path for a league
-- ``list_archives``                — list existing ``*_archive.csv.gz`` files
-- ``read_archive``                 — read one archive file to a DataFrame
+- ``list_archives``                — list existing archives (base files or segment-only)
+- ``archive_exists``               — True if an archive has a base file or any segment
+- ``archive_last_snapshot_time``   — last snapshot time folded into an archive
+- ``read_archive``                 — read one archive (columnar copy first, plus segments) to a DataFrame
+- ``write_columnar_archive``       — write the ``.col`` companion for an archive DataFrame
+- ``read_columnar_archive``        — memory-map a ``.col`` file and materialise selected columns
 - ``reconstruct_at``               — full leaderboard state at a point in time
 - ``reconstruct_all_snapshots``    — full timeline DataFrame (matches ``get_live_df`` output shape)
 """
 
+import json
 import logging
+import mmap
+import os
 import re
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -69,11 +101,19 @@ def list_snapshots(live_path: Path) -> list[Path]:
 
 
 def list_archives(live_path: Path) -> list[Path]:
-    """Return existing ``*_archive.csv.gz`` files sorted chronologically."""
+    """Return existing ``*_archive.csv.gz`` archive paths sorted chronologically.
+
+    Archives that so far only consist of append segments (a live tourney that has
+    not been compacted yet) are included under their eventual base path.
+    """
     if not live_path.exists():
         return []
-    files = [p for p in live_path.glob("*_archive.csv.gz") if p.stat().st_size > 0]
-    return sorted(files, key=lambda p: p.stem.replace("_archive", ""))
+    files = {p.name: p for p in live_path.glob("*_archive.csv.gz") if p.stat().st_size > 0}
+    for seg_dir in live_path.glob(f"*_archive{_SEGMENTS_SUFFIX}"):
+        archive_path = seg_dir.with_name(seg_dir.name[: -len(_SEGMENTS_SUFFIX)] + ".csv.gz")
+        if archive_path.name not in files and list_segments(archive_path):
+            files[archive_path.name] = archive_path
+    return sorted(files.values(), key=lambda p: p.stem.replace("_archive", ""))
 
 
 def _read_tourney_number(path: Path) -> Optional[int]:
@@ -157,6 +197,48 @@ def _archive_name_for_group(group: list[Path]) -> str:
     return f"{first_date}_archive.csv.gz"
 
 
+def snapshot_delta_rows(snap_df: pd.DataFrame, snap_time: datetime, last_wave: dict[str, int]) -> list[dict]:
+    """Return the archive delta rows one snapshot contributes on top of ``last_wave``.
+
+    Players appearing in multiple brackets (ghost-bracket entries) are
+    deduplicated first.  A ghost bracket inserts the same player_id with wave=1
+    alongside their real bracket entry in the same snapshot.  Keep only the row
+    with the highest wave per player so the archive delta stream is clean and
+    last_wave tracking stays accurate.  For tie-breaking on static columns,
+    prefer the row with the higher wave (i.e. the real bracket entry).
+
+    Only first appearances and wave changes are returned; ``last_wave`` is not
+    modified.
+    """
+    best: dict[str, tuple] = {}  # pid -> (wave, row)
+    for row in snap_df.itertuples(index=False):
+        pid = str(row.player_id)
+        try:
+            wave = int(row.wave)
+        except (ValueError, TypeError):
+            continue
+        if pid not in best or wave > best[pid][0]:
+            best[pid] = (wave, row)
+
+    snap_time_str = snap_time.isoformat()
+    rows: list[dict] = []
+    for pid, (wave, row) in best.items():
+        if pid not in last_wave or last_wave[pid] != wave:
+            rows.append(
+                {
+                    "snapshot_time": snap_time_str,
+                    "player_id": pid,
+                    "name": getattr(row, "name", ""),
+                    "avatar": getattr(row, "avatar", ""),
+                    "relic": getattr(row, "relic", ""),
+                    "wave": wave,
+                    "bracket": getattr(row, "bracket", ""),
+                    "tourney_number": getattr(row, "tourney_number", ""),
+                }
+            )
+    return rows
+
+
 def build_tourney_archive(snapshots: list[Path], write_path: Optional[Path] = None) -> pd.DataFrame:
     """Build a delta-compressed archive DataFrame from one tourney's snapshot list.
 
@@ -196,39 +278,9 @@ def build_tourney_archive(snapshots: list[Path], write_path: Optional[Path] = No
         if df.empty:
             continue
 
-        snap_time_str = snap_time.isoformat()
-
-        # Deduplicate players appearing in multiple brackets (ghost-bracket entries).
-        # A ghost bracket inserts the same player_id with wave=1 alongside their real
-        # bracket entry in the same snapshot.  Keep only the row with the highest wave
-        # per player so the archive delta stream is clean and last_wave tracking stays
-        # accurate.  For tie-breaking on static columns, prefer the row with the higher
-        # wave (i.e. the real bracket entry).
-        best: dict[str, tuple] = {}  # pid -> (wave, row)
-        for row in df.itertuples(index=False):
-            pid = str(row.player_id)
-            try:
-                wave = int(row.wave)
-            except (ValueError, TypeError):
-                continue
-            if pid not in best or wave > best[pid][0]:
-                best[pid] = (wave, row)
-
-        for pid, (wave, row) in best.items():
-            if pid not in last_wave or last_wave[pid] != wave:
-                rows.append(
-                    {
-                        "snapshot_time": snap_time_str,
-                        "player_id": pid,
-                        "name": getattr(row, "name", ""),
-                        "avatar": getattr(row, "avatar", ""),
-                        "relic": getattr(row, "relic", ""),
-                        "wave": wave,
-                        "bracket": getattr(row, "bracket", ""),
-                        "tourney_number": getattr(row, "tourney_number", ""),
-                    }
-                )
-                last_wave[pid] = wave
+        delta = snapshot_delta_rows(df, snap_time, last_wave)
+        rows.extend(delta)
+        last_wave.update({row["player_id"]: row["wave"] for row in delta})
 
     if not rows:
         return pd.DataFrame()
@@ -274,6 +326,10 @@ def build_all_archives(live_path: Path, force: bool = False) -> list[Path]:
         is_current = i == len(groups) - 1  # Always rebuild the live tourney
         if archive_path.exists() and not force and not is_current:
             logger.debug(f"Archive already exists, skipping: {archive_path.name}")
+            col_path = columnar_path(archive_path)
+            if not col_path.exists() or col_path.stat().st_mtime < archive_path.stat().st_mtime:
+                logger.info(f"Backfilling columnar copy {col_path.name}")
+                write_columnar_archive(read_archive(archive_path), col_path)
             continue
         logger.info(f"Building archive for {archive_path.name} ({len(group)} snapshots)...")
         build_tourney_archive(group, write_path=archive_path)
@@ -282,13 +338,339 @@ def build_all_archives(live_path: Path, force: bool = False) -> list[Path]:
     return written
 
 
-def read_archive(path: Path) -> pd.DataFrame:
-    """Read a ``{date}_archive.csv.gz`` file and parse snapshot_time as datetime."""
-    df = pd.read_csv(path)
-    df["snapshot_time"] = pd.to_datetime(df["snapshot_time"], format="ISO8601")
+def read_archive(path: Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """Read a ``{date}_archive.csv.gz`` archive and parse snapshot_time as datetime.
+
+    The columnar companion (``{date}_archive.col``) is used when it exists and is
+    at least as new as the CSV; otherwise the gzip CSV is parsed.  Append segments
+    newer than the base file are concatenated onto it.
+
+    Args:
+        path: Path to the ``{date}_archive.csv.gz`` file.
+        columns: Optional subset of columns to load.  ``None`` loads all columns.
+
+    Raises:
+        FileNotFoundError: If neither a base file nor any segment exists.
+        KeyError: If any of ``columns`` is not in the archive.
+    """
+    segments = list_segments(path)
+    if not segments:
+        return _read_base_archive(path, columns)
+
+    # snapshot_time is needed to skip segments already folded into the base.
+    load_columns = columns if columns is None or "snapshot_time" in columns else [*columns, "snapshot_time"]
+    parts: list[pd.DataFrame] = []
+    base_max = None
+    if path.exists() and path.stat().st_size > 0:
+        base = _read_base_archive(path, load_columns)
+        if not base.empty:
+            base_max = base["snapshot_time"].max()
+            parts.append(base)
+
+    for seg in segments:
+        if base_max is not None and pd.Timestamp(_parse_snapshot_time(seg)) <= base_max:
+            continue
+        parts.append(read_columnar_archive(seg, columns=load_columns))
+
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=load_columns)
+    if columns is not None and "snapshot_time" not in columns:
+        df = df.drop(columns=["snapshot_time"])
     return df
 
 
+def _read_base_archive(path: Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """Read the single-file part of an archive, preferring the columnar companion."""
+    col_path = columnar_path(path)
+    try:
+        if col_path.exists() and col_path.stat().st_mtime >= path.stat().st_mtime:
+            return read_columnar_archive(col_path, columns=columns)
+    except KeyError:
+        raise
+    except Exception as exc:
+        logger.warning(f"Failed to read columnar archive {col_path.name}: {exc}; falling back to CSV")
+
+    if columns is not None:
+        _check_columns(path, columns, pd.read_csv(path, nrows=0).columns)
+    df = pd.read_csv(path, usecols=columns)
+    if "snapshot_time" in df.columns:
+        df["snapshot_time"] = pd.to_datetime(df["snapshot_time"], format="ISO8601")
+    return df
+
+
+def _check_columns(path: Path, columns: list[str], available) -> None:
+    available = set(available)
+    missing = [name for name in columns if name not in available]
+    if missing:
+        raise KeyError(f"Columns {missing} not in archive {path.name}")
+
+
+# ── columnar archive ──────────────────────────────────────────────────────────
+
+_COLUMNAR_MAGIC = b"TWRCOL1\n"
+_COLUMNAR_ALIGN = 64
+
+
+def columnar_path(archive_path: Path) -> Path:
+    """Return the ``{date}_archive.col`` companion path for a ``{date}_archive.csv.gz`` file."""
+    name = archive_path.name
+    if name.endswith(".csv.gz"):
+        name = name[: -len(".csv.gz")]
+    return archive_path.with_name(f"{name}.col")
+
+
+def _columnar_buffers(df: pd.DataFrame) -> tuple[list[dict], list[np.ndarray]]:
+    """Encode each DataFrame column into header specs plus the raw arrays to write."""
+    specs: list[dict] = []
+    arrays: list[np.ndarray] = []
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy(dtype="datetime64[ns]").view("i8")
+            specs.append({"name": col, "kind": "datetime", "buffers": [{"dtype": values.dtype.str}]})
+            arrays.append(np.ascontiguousarray(values))
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy()
+            specs.append({"name": col, "kind": "plain", "buffers": [{"dtype": values.dtype.str}]})
+            arrays.append(np.ascontiguousarray(values))
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            dictionary = np.asarray([str(v) for v in uniques], dtype=str)
+            if dictionary.dtype.itemsize == 0:
+                dictionary = dictionary.astype("<U1")
+            codes = codes.astype(np.int32)
+            specs.append(
+                {
+                    "name": col,
+                    "kind": "dictionary",
+                    "buffers": [{"dtype": codes.dtype.str}, {"dtype": dictionary.dtype.str, "length": len(dictionary)}],
+                }
+            )
+            arrays.extend([codes, dictionary])
+
+    return specs, arrays
+
+
+def write_columnar_archive(df: pd.DataFrame, path: Path) -> None:
+    """Write ``df`` to ``path`` in the memory-mappable columnar layout (atomic replace).
+
+    File layout: magic, 8-byte little-endian header length, JSON header, then
+    one 64-byte aligned buffer per column (two for dictionary-encoded columns).
+    """
+    specs, arrays = _columnar_buffers(df)
+
+    # Header offsets depend on the header length, so lay out buffers relative to
+    # the data section and fix the data section start once the header is sized.
+    offset = 0
+    it = iter(arrays)
+    for spec in specs:
+        for buf in spec["buffers"]:
+            arr = next(it)
+            buf["offset"] = offset
+            buf["nbytes"] = arr.nbytes
+            offset += -(-arr.nbytes // _COLUMNAR_ALIGN) * _COLUMNAR_ALIGN
+
+    header = {"rows": len(df), "columns": specs}
+    header_bytes = json.dumps(header).encode("utf8")
+    data_start = len(_COLUMNAR_MAGIC) + 8 + len(header_bytes)
+    data_start = -(-data_start // _COLUMNAR_ALIGN) * _COLUMNAR_ALIGN
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".col.tmp")
+    try:
+        with os.fdopen(tmp_fd, "wb") as f:
+            f.write(_COLUMNAR_MAGIC)
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            it = iter(arrays)
+            for spec in specs:
+                for buf in spec["buffers"]:
+                    arr = next(it)
+                    f.seek(data_start + buf["offset"])
+                    f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_columnar_archive(path: Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """Memory-map a ``.col`` archive and materialise only the requested columns.
+
+    Only the byte ranges of the requested columns are touched.  Values are
+    copied out of the map before it is closed, so the returned DataFrame does not
+    pin the file (which would block the writer's replace on Windows).
+
+    Raises:
+        KeyError: If any of ``columns`` is not in the archive, as for the CSV.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_COLUMNAR_MAGIC)) != _COLUMNAR_MAGIC:
+            raise ValueError(f"Not a columnar archive: {path.name}")
+        header_len = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_len).decode("utf8"))
+        data_start = -(-(len(_COLUMNAR_MAGIC) + 8 + header_len) // _COLUMNAR_ALIGN) * _COLUMNAR_ALIGN
+        rows = header["rows"]
+
+        specs = header["columns"]
+        if columns is not None:
+            _check_columns(path, columns, [spec["name"] for spec in specs])
+            wanted = set(columns)
+            specs = [spec for spec in specs if spec["name"] in wanted]
+
+        if rows == 0 or f.seek(0, os.SEEK_END) <= data_start:
+            return pd.DataFrame({spec["name"]: pd.Series(dtype=object) for spec in specs})
+
+        out: dict[str, object] = {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+
+            def _copy(buf: dict, count: int) -> np.ndarray:
+                # np.array copies, so no view into the map outlives this block.
+                return np.array(np.frombuffer(mm, dtype=np.dtype(buf["dtype"]), count=count, offset=data_start + buf["offset"]))
+
+            for spec in specs:
+                name = spec["name"]
+                if spec["kind"] == "datetime":
+                    out[name] = pd.to_datetime(_copy(spec["buffers"][0], rows).view("datetime64[ns]"))
+                elif spec["kind"] == "plain":
+                    out[name] = _copy(spec["buffers"][0], rows)
+                else:
+                    codes_buf, dict_buf = spec["buffers"]
+                    codes = _copy(codes_buf, rows)
+                    dictionary = _copy(dict_buf, dict_buf["length"]).astype(object)
+                    values = dictionary.take(codes, mode="clip") if len(dictionary) else np.full(rows, np.nan, dtype=object)
+                    values[codes < 0] = np.nan
+                    out[name] = values
+
+    return pd.DataFrame(out)
+
+
+# ── append segments ───────────────────────────────────────────────────────────
+
+_SEGMENTS_SUFFIX = ".segments"
+_SEGMENT_STATE_NAME = "state.json"
+
+
+def segments_path(archive_path: Path) -> Path:
+    """Return the ``{date}_archive.segments/`` directory for a ``{date}_archive.csv.gz`` file."""
+    name = archive_path.name
+    if name.endswith(".csv.gz"):
+        name = name[: -len(".csv.gz")]
+    return archive_path.with_name(f"{name}{_SEGMENTS_SUFFIX}")
+
+
+def list_segments(archive_path: Path) -> list[Path]:
+    """Return the archive's append segments sorted chronologically."""
+    seg_dir = segments_path(archive_path)
+    if not seg_dir.exists():
+        return []
+    return sorted(seg_dir.glob("*.col"), key=_parse_snapshot_time)
+
+
+def archive_exists(archive_path: Path) -> bool:
+    """True if the archive has a non-empty base file or at least one append segment."""
+    if archive_path.exists() and archive_path.stat().st_size > 0:
+        return True
+    return bool(list_segments(archive_path))
+
+
+def archive_mtime(archive_path: Path) -> float:
+    """Return the last time the archive was written (base file or segment state), 0.0 if absent."""
+    mtimes = [0.0]
+    if archive_path.exists():
+        mtimes.append(archive_path.stat().st_mtime)
+    state_path = segments_path(archive_path) / _SEGMENT_STATE_NAME
+    if state_path.exists():
+        mtimes.append(state_path.stat().st_mtime)
+    return max(mtimes)
+
+
+def _load_segment_state(archive_path: Path) -> Optional[dict]:
+    """Load the last-known-wave sidecar, or None if it is missing or behind the segments."""
+    state_path = segments_path(archive_path) / _SEGMENT_STATE_NAME
+    if not state_path.exists():
+        return None
+    try:
+        state = json.loads(state_path.read_text(encoding="utf8"))
+    except Exception:
+        logger.warning(f"Unreadable segment state {state_path}; rebuilding from archive")
+        return None
+
+    # A crash between writing a segment and the sidecar leaves the sidecar behind.
+    segments = list_segments(archive_path)
+    if segments and (state.get("last_snapshot") is None or _parse_snapshot_time(segments[-1]) > datetime.fromisoformat(state["last_snapshot"])):
+        return None
+    return state
+
+
+def _write_segment_state(archive_path: Path, last_snapshot: datetime, last_wave: dict[str, int]) -> None:
+    """Atomically write the last-known-wave sidecar for an archive's segments."""
+    seg_dir = segments_path(archive_path)
+    seg_dir.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=seg_dir, suffix=".json.tmp")
+    try:
+        with os.fdopen(tmp_fd, "w", encoding="utf8") as f:
+            json.dump({"last_snapshot": last_snapshot.isoformat(), "last_wave": last_wave}, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, seg_dir / _SEGMENT_STATE_NAME)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _discard_segments(archive_path: Path) -> None:
+    """Remove the archive's segment directory once a full base file supersedes it."""
+    import shutil
+
+    seg_dir = segments_path(archive_path)
+    if seg_dir.exists():
+        shutil.rmtree(seg_dir, ignore_errors=True)
+        logger.info(f"Discarded append segments {seg_dir.name}")
+
+
+def archive_last_snapshot_time(archive_path: Path) -> Optional[pd.Timestamp]:
+    """Return the last snapshot time folded into the archive, or None if there is none.
+
+    Uses the segment sidecar when present (it also advances on snapshots that
+    changed no waves), otherwise the base file's ``snapshot_time`` column.
+    """
+    state = _load_segment_state(archive_path)
+    if state is not None and state.get("last_snapshot"):
+        return pd.Timestamp(state["last_snapshot"])
+    if not archive_exists(archive_path):
+        return None
+    df = read_archive(archive_path, columns=["snapshot_time"])
+    return df["snapshot_time"].max() if not df.empty else None
+
+
+def compact_archive(archive_path: Path) -> int:
+    """Fold an archive's append segments into a single base file.
+
+    Writes ``{date}_archive.csv.gz`` (+ columnar companion) from the base file and
+    all segments, then removes the segment directory.  Safe to call when there is
+    nothing to compact.
+
+    Returns
+    -------
+    Number of delta rows in the compacted archive (0 if there were no segments).
+    """
+    if not list_segments(archive_path):
+        return 0
+    df = read_archive(archive_path)
+    df = df.sort_values("snapshot_time", kind="stable").reset_index(drop=True)
+    _atomic_write(df, archive_path)
+    logger.info(f"Compacted {archive_path.name} ({len(df):,} delta rows)")
+    return len(df)
+
+
 def reconstruct_at(archive: pd.DataFrame, at: datetime) -> pd.DataFrame:
     """Reconstruct the full leaderboard state at a given point in time.
 
@@ -324,6 +706,11 @@ def reconstruct_all_snapshots(archive: pd.DataFrame, extra_timestamps=None) -> p
 
     This is the drop-in replacement for reading ~48 individual snapshot CSVs.
 
+    The expansion is sparse: each delta row is repeated over the snapshot range
+    it stays valid for (until the player's next delta), so only cells from a
+    player's first appearance onward are ever materialised — no dense
+    snapshot × player pivot is built.
+
     Args:
         archive: Delta-compressed archive DataFrame.
         extra_timestamps: Optional sequence of additional datetime values (e.g.
@@ -334,28 +721,56 @@ def reconstruct_all_snapshots(archive: pd.DataFrame, extra_timestamps=None) -> p
     if archive.empty:
         return pd.DataFrame()
 
-    times = sorted(archive["snapshot_time"].unique())
+    snap_times = archive["snapshot_time"].to_numpy(dtype="datetime64[ns]")
     if extra_timestamps is not None:
-        all_times = sorted(set(times) | {pd.Timestamp(t) for t in extra_timestamps})
+        extra = np.array([pd.Timestamp(t).to_datetime64() for t in extra_timestamps], dtype="datetime64[ns]")
+        all_times = np.unique(np.concatenate([snap_times, extra]))
     else:
-        all_times = times
-
-    # Pivot: rows = snapshot_time, columns = player_id, values = wave
-    pivot = archive.pivot_table(index="snapshot_time", columns="player_id", values="wave", aggfunc="last")
-    pivot = pivot.reindex(all_times).ffill()
-
-    # Melt back to long form
-    long = pivot.reset_index().melt(id_vars=["snapshot_time"], var_name="player_id", value_name="wave")
-    long = long.dropna(subset=["wave"])  # players not yet appeared at this time
-    long["wave"] = long["wave"].astype(int)
-
-    # Join static columns (last known values per player — they never change anyway)
+        all_times = np.unique(snap_times)
+
+    player_codes, player_ids = pd.factorize(archive["player_id"], sort=True)
+    time_idx = np.searchsorted(all_times, snap_times)
+    waves = archive["wave"].to_numpy()
+
+    # Order deltas by (player, time); within one (player, time) keep the last row
+    # in archive order, matching the previous pivot_table(aggfunc="last").
+    order = np.lexsort((time_idx, player_codes))
+    player_codes, time_idx, waves = player_codes[order], time_idx[order], waves[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[:-1] = (player_codes[1:] != player_codes[:-1]) | (time_idx[1:] != time_idx[:-1])
+    player_codes, time_idx, waves, order = player_codes[keep], time_idx[keep], waves[keep], order[keep]
+
+    # Each delta is valid until the same player's next delta (or the last snapshot).
+    end_idx = np.full(len(time_idx), len(all_times), dtype=np.int64)
+    same_player = player_codes[1:] == player_codes[:-1]
+    end_idx[:-1][same_player] = time_idx[1:][same_player]
+    counts = end_idx - time_idx
+
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    out_time_idx = np.arange(counts.sum()) - starts + np.repeat(time_idx, counts)
+    out_codes = np.repeat(player_codes, counts)
+    out_waves = np.repeat(waves, counts).astype(int)
+
+    # Rows come out grouped by player (sorted ids) then time — the old melt order —
+    # so a single lexsort reproduces the previous (datetime, -wave) ordering and ties.
+    final = np.lexsort((out_codes, -out_waves, out_time_idx))
+    out_codes, out_waves, out_time_idx = out_codes[final], out_waves[final], out_time_idx[final]
+
+    # Join static columns (last known values per player — they never change anyway).
+    # The last kept delta of each player is its latest archive row.
     static_cols = ["name", "avatar", "relic", "bracket", "tourney_number"]
-    static = archive.sort_values("snapshot_time").groupby("player_id").last()[static_cols]
-    long = long.join(static, on="player_id")
-
-    long = long.rename(columns={"snapshot_time": "datetime"})
-    long = long.sort_values(["datetime", "wave"], ascending=[True, False]).reset_index(drop=True)
+    last_row = np.empty(len(player_ids), dtype=np.int64)
+    last_row[player_codes] = order
+
+    long = pd.DataFrame(
+        {
+            "datetime": all_times[out_time_idx],
+            "player_id": np.asarray(player_ids, dtype=object)[out_codes],
+            "wave": out_waves,
+        }
+    )
+    for col in static_cols:
+        long[col] = archive[col].to_numpy()[last_row][out_codes]
     return long
 
 
@@ -373,8 +788,10 @@ def append_snapshot_to_archive(snapshot_path: Path, archive_path: Path) -> int:
 
     This is the streaming equivalent of ``build_tourney_archive``: instead of
     rebuilding the full archive from all snapshots, it reads one new snapshot,
-    computes the delta against the last-known state in the archive, and appends
-    only the changed rows.  Suitable for calling after every snapshot write.
+    computes the delta against the last-known wave per player kept in the
+    segment sidecar, and writes only the changed rows as a new immutable segment.
+    The existing archive is never re-read or rewritten, so an append costs
+    O(new rows).  Suitable for calling after every snapshot write.
 
     Ghost-bracket deduplication is applied to the incoming snapshot (same logic
     as ``build_tourney_archive``: keep the highest-wave row per player).
@@ -384,8 +801,8 @@ def append_snapshot_to_archive(snapshot_path: Path, archive_path: Path) -> int:
     snapshot_path:
         Path to a single ``YYYY-MM-DD__HH_MM.csv.gz`` snapshot file.
     archive_path:
-        Path to the ``{date}_archive.csv.gz`` file to update.  Need not exist yet;
-        if absent the snapshot is treated as the first in a new tourney.
+        Path to the ``{date}_archive.csv.gz`` archive to update.  Need not exist
+        yet; if absent the snapshot is treated as the first in a new tourney.
 
     Returns
     -------
@@ -404,56 +821,32 @@ def append_snapshot_to_archive(snapshot_path: Path, archive_path: Path) -> int:
     if snap_df.empty:
         return 0
 
-    # Deduplicate ghost-bracket entries — keep highest-wave row per player.
-    best: dict[str, tuple] = {}
-    for row in snap_df.itertuples(index=False):
-        pid = str(row.player_id)
-        try:
-            wave = int(row.wave)
-        except (ValueError, TypeError):
-            continue
-        if pid not in best or wave > best[pid][0]:
-            best[pid] = (wave, row)
-
-    # Load last known wave per player from the existing archive.
-    last_wave: dict[str, int] = {}
-    existing: Optional[pd.DataFrame] = None
-    if archive_path.exists():
-        existing = read_archive(archive_path)
-        if not existing.empty:
-            last = existing.sort_values("snapshot_time").groupby("player_id")["wave"].last()
-            last_wave = last.to_dict()
-
-    snap_time_str = snap_time.isoformat()
-    new_rows: list[dict] = []
-    for pid, (wave, row) in best.items():
-        if pid not in last_wave or last_wave[pid] != wave:
-            new_rows.append(
-                {
-                    "snapshot_time": snap_time_str,
-                    "player_id": pid,
-                    "name": getattr(row, "name", ""),
-                    "avatar": getattr(row, "avatar", ""),
-                    "relic": getattr(row, "relic", ""),
-                    "wave": wave,
-                    "bracket": getattr(row, "bracket", ""),
-                    "tourney_number": getattr(row, "tourney_number", ""),
-                }
-            )
-
-    if not new_rows:
-        return 0
-
-    new_df = pd.DataFrame(new_rows)
-    new_df["snapshot_time"] = pd.to_datetime(new_df["snapshot_time"])
-
-    if existing is not None and not existing.empty:
-        combined = pd.concat([existing, new_df], ignore_index=True)
+    # Load last known wave per player from the sidecar; derive it from the
+    # archive once if the sidecar is missing (e.g. after a full rebuild).
+    state = _load_segment_state(archive_path)
+    if state is not None:
+        last_wave: dict[str, int] = state["last_wave"]
     else:
-        combined = new_df
-
-    combined = combined.sort_values("snapshot_time").reset_index(drop=True)
-    _atomic_write(combined, archive_path)
+        last_wave = {}
+        if archive_exists(archive_path):
+            existing = read_archive(archive_path, columns=["snapshot_time", "player_id", "wave"])
+            if not existing.empty:
+                last = existing.sort_values("snapshot_time", kind="stable").groupby("player_id")["wave"].last()
+                last_wave = {str(pid): int(wave) for pid, wave in last.items()}
+
+    new_rows = snapshot_delta_rows(snap_df, snap_time, last_wave)
+
+    if new_rows:
+        new_df = pd.DataFrame(new_rows)
+        new_df["snapshot_time"] = pd.to_datetime(new_df["snapshot_time"])
+        seg_path = segments_path(archive_path) / f"{snap_time.strftime('%Y-%m-%d__%H_%M')}.col"
+        seg_path.parent.mkdir(parents=True, exist_ok=True)
+        write_columnar_archive(new_df, seg_path)
+        last_wave.update({row["player_id"]: row["wave"] for row in new_rows})
+        logger.info(f"Wrote segment {seg_path.name} for {archive_path.name} ({len(new_rows):,} delta rows)")
+
+    # Advance the sidecar even when nothing changed so the archive counts as current.
+    _write_segment_state(archive_path, snap_time, last_wave)
     return len(new_rows)
 
 
@@ -508,15 +901,17 @@ def bundle_tourney_to_raw(group: list[Path], raw_path: Path) -> Path:
 
 
 def _atomic_write(df: pd.DataFrame, path: Path) -> None:
-    """Write df to path as gzip CSV, using a sibling temp file for atomicity."""
-    import tempfile
+    """Write df to path as gzip CSV, using a sibling temp file for atomicity.
+
+    The columnar companion is written afterwards so its mtime is never older
+    than the CSV it mirrors.  Any append segments are discarded: a full write
+    always covers them.
+    """
     import shutil
 
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp_fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".csv.gz.tmp")
     try:
-        import os
-
         os.close(tmp_fd)
         df.to_csv(tmp_path, index=False, compression="gzip")
         os.chmod(tmp_path, 0o644)
@@ -524,13 +919,18 @@ def _atomic_write(df: pd.DataFrame, path: Path) -> None:
         logger.info(f"Wrote archive to {path} ({len(df):,} delta rows)")
     except Exception:
         try:
-            import os
-
             os.unlink(tmp_path)
         except OSError:
             pass
         raise
 
+    try:
+        write_columnar_archive(df, columnar_path(path))
+    except Exception:
+        logger.exception(f"Failed to write columnar copy of {path.name}; readers will fall back to the CSV")
+
+    _discard_segments(path)
+
 
 def verify_archive_fidelity(snapshots: list[Path], archive_path: Path) -> tuple[bool, list[str]]:
     """Verify that a delta archive faithfully represents the given snapshot list.
@@ -561,7 +961,7 @@ def verify_archive_fidelity(snapshots: list[Path], archive_path: Path) -> tuple[
     """
     errors: list[str] = []
 
-    if not archive_path.exists():
+    if not archive_exists(archive_path):
         return False, [f"Archive not found: {archive_path}"]
 
     archive = read_archive(archive_path)
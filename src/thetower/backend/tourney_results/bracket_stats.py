@@ -0,0 +1,51 @@
+"""Per-bracket wave statistics computed in one sort/groupby pass.
+
+Used by the placement cache generator (rank quantiles) and the live bracket
+analysis page (promotion/relegation cutoffs).  Everything works on a frame with
+``bracket`` and ``wave`` columns holding one row per player.
+
+Tie rule for the cutoffs: tied players all share the worst rank of their group
+(last-in-tie), as on the live pages.
+"""
+
+import pandas as pd
+
+
+def waves_at_ranks(df: pd.DataFrame, ranks: list[int]) -> dict[int, pd.Series]:
+    """Return {rank: wave of the rank-th best player of each bracket}, indexed by bracket.
+
+    Brackets with fewer than ``rank`` players are left out, as are brackets whose
+    rank-th wave is missing.
+    """
+    ordered = df[["bracket", "wave"]].sort_values("wave", ascending=False, na_position="last", kind="stable")
+    position = ordered.groupby("bracket", sort=False).cumcount().to_numpy() + 1
+    return {rank: ordered.loc[position == rank].set_index("bracket")["wave"].dropna() for rank in ranks}
+
+
+def _cumulative_wave_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Distinct waves per bracket, highest first, with the number of players at or above each."""
+    counts = df.dropna(subset=["wave"]).groupby(["bracket", "wave"]).size().rename("players").reset_index()
+    counts = counts.sort_values(["bracket", "wave"], ascending=[True, False], kind="stable")
+    counts["cumulative"] = counts.groupby("bracket")["players"].cumsum()
+    return counts
+
+
+def promotion_cutoff_waves(df: pd.DataFrame, n: int) -> pd.Series:
+    """Wave of the last player to actually promote into the top ``n``, per bracket.
+
+    That is the minimum wave whose entire tied group still fits within the top
+    ``n`` slots; brackets where nobody promotes (more than ``n`` players tied at
+    the top wave) are left out.
+    """
+    counts = _cumulative_wave_counts(df)
+    return counts[counts["cumulative"] <= n].groupby("bracket")["wave"].min()
+
+
+def relegation_cutoff_waves(df: pd.DataFrame, n: int) -> pd.Series:
+    """Wave of the highest-ranked player who demotes at rank ``n``, per bracket.
+
+    That is the first wave (going highest to lowest) where the number of players
+    at or above it reaches ``n``; brackets with fewer than ``n`` players are left out.
+    """
+    counts = _cumulative_wave_counts(df)
+    return counts[counts["cumulative"] >= n].groupby("bracket")["wave"].max()
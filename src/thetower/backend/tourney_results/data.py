@@ -4,6 +4,7 @@ import logging
 import os
 import re
 from collections import Counter, defaultdict
+from dataclasses import dataclass
 from glob import glob
 from pathlib import Path
 from typing import Optional
@@ -15,9 +16,9 @@ import pandas as pd
 # TODO: load_tourney_results/_load_tourney_results still need st.cache_data wrapping and progress
 # reporting; restore once deprecated pages are rewritten.
 # import streamlit as st
-from cachetools.func import ttl_cache
 from django.db.models import Q, QuerySet
 
+from ..sus import data_versions
 from ..sus.models import ModerationRecord, PlayerId
 from .constants import (
     champ,
@@ -30,65 +31,27 @@ from .formatting import color_position_barebones
 from .models import BattleCondition
 from .models import PatchNew as Patch
 from .models import Role, TourneyResult, TourneyRow
+from .resolvers import get_patch_resolver, get_role_resolver
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
 django.setup()
 
 
-@ttl_cache(maxsize=128, ttl=60)
-def get_patches():
-    return Patch.objects.all().order_by("start_date")
+def get_patches() -> list[Patch]:
+    """All patches ordered by start date."""
+    return get_patch_resolver().patches
 
 
-@ttl_cache(maxsize=512, ttl=60)
 def date_to_patch(date: datetime.datetime) -> Optional[Patch]:
-    for patch in get_patches():
-        if date >= patch.start_date and date <= patch.end_date:
-            return patch
+    return get_patch_resolver().patch_for_date(date)
 
 
-@ttl_cache(maxsize=512, ttl=60)
-def wave_to_role_in_patch(roles: list[Role], role_bot_top: list[tuple[int, int]], wave: int) -> Optional[Role]:
-    for role, (wave_bottom, wave_top) in zip(roles, role_bot_top):
-        if wave >= wave_bottom and wave < wave_top:
-            return role
-
-
-@ttl_cache(maxsize=512, ttl=60)
 def patch_to_roles(league):
-    patch_to_roles = defaultdict(list)
-
-    patches = get_patches()
-    last_patch_with_roles = None
-
-    for i, patch in enumerate(patches):
-        roles = tuple(Role.objects.filter(patch=patch, league=league))
-
-        if not roles:
-            if not last_patch_with_roles:
-                last_patch_with_roles = i - 1
-
-            roles = patch_to_roles[patches[last_patch_with_roles]]
-
-        if not roles:
-            print("WARNING")
-
-        patch_to_roles[patch] = roles
-
-    return patch_to_roles
+    return get_role_resolver().patch_to_roles(league)
 
 
 def wave_to_role(wave: int, patch: Optional[Patch], league: str) -> Optional[Role]:
-    if not patch:
-        return None
-
-    roles = patch_to_roles(league)[patch]
-
-    if not roles:
-        return None
-
-    roles_bot_top = tuple((role.wave_bottom, role.wave_top) for role in roles)
-    return wave_to_role_in_patch(roles, roles_bot_top, wave)
+    return get_role_resolver().role_for_wave(wave, patch, league)
 
 
 def load_data(folder):  # Potentially unused
@@ -125,18 +88,75 @@ def load_data(folder):  # Potentially unused
     return total_results, results_by_id, position_by_id
 
 
+@dataclass(frozen=True)
+class PlayerIdTable:
+    """Resolution table for every tower_id linked to a known player.
+
+    ``entries`` maps tower_id -> (primary tower_id or None, real name, approved).
+    The primary id is only resolved for approved players.  The dicts handed out
+    by the ``get_*_lookup`` helpers are precomputed once per table and shared,
+    so callers must not mutate them.
+    """
+
+    version: tuple
+    entries: dict[str, tuple[Optional[str], str, bool]]
+    names: dict[str, str]
+    approved: dict[str, bool]
+    primary_ids: dict[str, str]
+
+    def resolve(self, player_id: str) -> Optional[tuple[Optional[str], str, bool]]:
+        """Return (primary tower_id, real name, approved) for ``player_id``, or None if unknown."""
+        return self.entries.get(player_id)
+
+
+_player_id_table: Optional[PlayerIdTable] = None
+
+
+def get_player_id_table() -> PlayerIdTable:
+    """Return the cached player-ID resolution table, rebuilding it if the identity version changed.
+
+    The version is bumped whenever a KnownPlayer, GameInstance or PlayerId is
+    saved or deleted (see ``SusConfig.ready``), in any process.
+    """
+    global _player_id_table
+
+    version = data_versions.current(data_versions.IDENTITY)
+    table = _player_id_table
+    if table is not None and table.version == version:
+        return table
+
+    rows = list(
+        PlayerId.objects.filter(game_instance__isnull=False).values_list(
+            "id", "game_instance__player__name", "primary", "game_instance__player__approved"
+        )
+    )
+    approved_rows = [(id_, name, primary) for id_, name, primary, approved in rows if approved]
+
+    # Ids are renormalised to the primary id of the player with the same name.
+    player_primary_id = {name: id_ for id_, name, primary in approved_rows if primary}
+    primary_ids = {id_: player_primary_id[name] for id_, name, _ in approved_rows if name in player_primary_id}
+
+    table = PlayerIdTable(
+        version=version,
+        entries={id_: (primary_ids.get(id_), name, approved) for id_, name, _, approved in rows},
+        names={id_: name for id_, name, _ in approved_rows},
+        approved={id_: True for id_, _, _ in approved_rows},
+        primary_ids=primary_ids,
+    )
+    _player_id_table = table
+    return table
+
+
 def get_player_id_lookup():
-    return dict(PlayerId.objects.filter(game_instance__player__approved=True).values_list("id", "game_instance__player__name"))
+    return get_player_id_table().names
 
 
 def get_player_id_approved_lookup():
-    return dict(PlayerId.objects.filter(game_instance__player__approved=True).values_list("id", "game_instance__player__approved"))
+    return get_player_id_table().approved
 
 
 def get_id_lookup():
-    id_objs = PlayerId.objects.filter(game_instance__player__approved=True).values_list("id", "game_instance__player__name", "primary")
-    player_primary_id = {name: id_ for id_, name, primary in id_objs if primary}
-    return {id_: player_primary_id[name] for id_, name, _ in id_objs if name in player_primary_id}
+    return get_player_id_table().primary_ids
 
 
 def get_id_real_name_mapping(df: pd.DataFrame, lookup: dict[str, str]) -> dict[str, str]:
@@ -331,76 +351,59 @@ def get_player_list(df):
 
 
 def get_sus_data():
+    """Return active sus players as dicts sorted by name.
+
+    Runs a fixed number of queries regardless of how many players are sus:
+    one for the active sus records, one for names and (with hidden features)
+    one for active bans.
+    """
     hidden_features = os.environ.get("HIDDEN_FEATURES")
 
-    # Get unique tower_ids with active sus status
-    sus_tower_ids = set(
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True  # Active = not resolved
-        ).values_list("tower_id", flat=True)
-    )
+    active_sus = ModerationRecord.objects.filter(
+        moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True  # Active = not resolved
+    ).order_by("-started_at")
+
+    # Unique tower_ids with active sus status, plus the reason of the most recent sus record per tower_id
+    sus_tower_ids = set()
+    reasons = {}
+    for tower_id, reason in active_sus.values_list("tower_id", "reason"):
+        sus_tower_ids.add(tower_id)
+        reasons.setdefault(tower_id, reason or "")
+
+    # Name from the most recent record linked to a GameInstance for each tower_id (tower_id itself as fallback)
+    names = {}
+    for tower_id, name in (
+        ModerationRecord.objects.filter(tower_id__in=active_sus.values("tower_id"), game_instance__isnull=False)
+        .order_by("-started_at")
+        .values_list("tower_id", "game_instance__player__name")
+    ):
+        names.setdefault(tower_id, name)
 
     if hidden_features:
         # Build detailed data with moderation info
-        data = []
-        for tower_id in sus_tower_ids:
-            # Get name from any linked GameInstance record for this tower_id
-            name = tower_id  # Default fallback
-            try:
-                record_with_game_instance = (
-                    ModerationRecord.objects.filter(tower_id=tower_id, game_instance__isnull=False).select_related("game_instance__player").first()
-                )
-                if record_with_game_instance and record_with_game_instance.game_instance:
-                    name = record_with_game_instance.game_instance.player.name
-            except Exception:
-                pass
-
-            # Check for other active moderation types for this player
-            banned = ModerationRecord.objects.filter(
-                tower_id=tower_id, moderation_type=ModerationRecord.ModerationType.BAN, resolved_at__isnull=True  # Active = not resolved
-            ).exists()
-
-            # Get reason from any sus record for this player
-            reason = ""
-            try:
-                sus_record = ModerationRecord.objects.filter(
-                    tower_id=tower_id, moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True  # Active = not resolved
-                ).first()
-                if sus_record:
-                    reason = sus_record.reason or ""
-            except Exception:
-                pass
-
-            data.append(
-                {
-                    "name": name,
-                    "player_id": tower_id,
-                    "sus": True,  # Always true since we filtered for SUS tower_ids
-                    "banned": banned,
-                    "notes": reason,
-                }
-            )
+        banned_tower_ids = set(
+            ModerationRecord.objects.filter(
+                tower_id__in=active_sus.values("tower_id"),
+                moderation_type=ModerationRecord.ModerationType.BAN,
+                resolved_at__isnull=True,  # Active = not resolved
+            ).values_list("tower_id", flat=True)
+        )
 
-        # Sort by name and return as QuerySet-like structure
-        return sorted(data, key=lambda x: x["name"] or "")
+        data = [
+            {
+                "name": names.get(tower_id, tower_id),
+                "player_id": tower_id,
+                "sus": True,  # Always true since we filtered for SUS tower_ids
+                "banned": tower_id in banned_tower_ids,
+                "notes": reasons[tower_id],
+            }
+            for tower_id in sus_tower_ids
+        ]
     else:
         # Simple name/player_id data
-        data = []
-        for tower_id in sus_tower_ids:
-            # Get name from any linked GameInstance record for this tower_id
-            name = tower_id  # Default fallback
-            try:
-                record_with_game_instance = (
-                    ModerationRecord.objects.filter(tower_id=tower_id, game_instance__isnull=False).select_related("game_instance__player").first()
-                )
-                if record_with_game_instance and record_with_game_instance.game_instance:
-                    name = record_with_game_instance.game_instance.player.name
-            except Exception:
-                pass
-
-            data.append({"name": name, "player_id": tower_id})
+        data = [{"name": names.get(tower_id, tower_id), "player_id": tower_id} for tower_id in sus_tower_ids]
 
-        return sorted(data, key=lambda x: x["name"] or "")
+    return sorted(data, key=lambda x: x["name"] or "")
 
 
 def is_under_review(player_id: str):
@@ -419,104 +422,90 @@ def is_support_flagged(player_id: str):
     )
 
 
-def is_shun(player_id: str):
-    """
-    Check if a tower_id is shunned.
-    Checks the GameInstance directly - simpler and more efficient.
+@dataclass(frozen=True)
+class ModerationSnapshot:
+    """Active moderation state as sets of tower_ids, built in one pass.
+
+    A tower_id is in a set if it has an active standalone record of that type,
+    or if it belongs to a GameInstance with an active record of that type.
     """
-    from thetower.backend.sus.models import PlayerId
-
-    # Try to find the GameInstance for this tower_id
-    try:
-        player_id_obj = PlayerId.objects.select_related("game_instance").get(id=player_id)
-        if player_id_obj.game_instance:
-            # Direct check: is this GameInstance shunned?
-            return ModerationRecord.objects.filter(
-                game_instance=player_id_obj.game_instance,
-                moderation_type=ModerationRecord.ModerationType.SHUN,
-                resolved_at__isnull=True,  # Active = not resolved
-            ).exists()
-    except PlayerId.DoesNotExist:
-        pass
 
-    # Fallback: check by tower_id (for unverified/unmigrated IDs)
-    return ModerationRecord.objects.filter(
-        tower_id=player_id, moderation_type=ModerationRecord.ModerationType.SHUN, resolved_at__isnull=True
-    ).exists()
+    version: tuple
+    sus: frozenset[str]
+    banned: frozenset[str]
+    shun: frozenset[str]
+    soft_banned: frozenset[str]
 
 
-def is_sus(player_id: str):
-    """
-    Check if a tower_id is sus.
-    Checks the GameInstance directly - simpler and more efficient.
-    """
-    from thetower.backend.sus.models import PlayerId
-
-    # Try to find the GameInstance for this tower_id
-    try:
-        player_id_obj = PlayerId.objects.select_related("game_instance").get(id=player_id)
-        if player_id_obj.game_instance:
-            # Direct check: is this GameInstance sus?
-            return ModerationRecord.objects.filter(
-                game_instance=player_id_obj.game_instance,
-                moderation_type=ModerationRecord.ModerationType.SUS,
-                resolved_at__isnull=True,  # Active = not resolved
-            ).exists()
-    except PlayerId.DoesNotExist:
-        pass
+_moderation_snapshot: Optional[ModerationSnapshot] = None
 
-    # Fallback: check by tower_id (for unverified/unmigrated IDs)
-    return ModerationRecord.objects.filter(tower_id=player_id, moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True).exists()
 
+def get_moderation_snapshot() -> ModerationSnapshot:
+    """Return the cached moderation snapshot, rebuilding it if the moderation version changed.
 
-def is_soft_banned(player_id: str):
+    The version is bumped whenever a ModerationRecord or PlayerId is saved or
+    deleted (see ``SusConfig.ready``), in any process.
     """
-    Check if a tower_id is soft banned.
-    Checks the GameInstance directly - simpler and more efficient.
-    """
-    from thetower.backend.sus.models import PlayerId
-
-    # Try to find the GameInstance for this tower_id
-    try:
-        player_id_obj = PlayerId.objects.select_related("game_instance").get(id=player_id)
-        if player_id_obj.game_instance:
-            # Direct check: is this GameInstance soft banned?
-            return ModerationRecord.objects.filter(
-                game_instance=player_id_obj.game_instance,
-                moderation_type=ModerationRecord.ModerationType.SOFT_BAN,
-                resolved_at__isnull=True,  # Active = not resolved
-            ).exists()
-    except PlayerId.DoesNotExist:
-        pass
+    global _moderation_snapshot
+
+    version = data_versions.current(data_versions.MODERATION)
+    snapshot = _moderation_snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    types = ModerationRecord.ModerationType
+    standalone = {t: set() for t in (types.SUS, types.BAN, types.SHUN, types.SOFT_BAN)}
+    instances = {t: set() for t in standalone}
+    for moderation_type, tower_id, game_instance_id in ModerationRecord.objects.filter(
+        resolved_at__isnull=True, moderation_type__in=list(standalone)
+    ).values_list("moderation_type", "tower_id", "game_instance_id"):
+        if game_instance_id is None:
+            standalone[moderation_type].add(tower_id)
+        else:
+            instances[moderation_type].add(game_instance_id)
+
+    # Expand flagged GameInstances to ALL of their tower_ids with a single query.
+    ids_by_instance = defaultdict(set)
+    flagged_instances = set().union(*instances.values())
+    if flagged_instances:
+        for game_instance_id, tower_id in PlayerId.objects.filter(game_instance_id__in=flagged_instances).values_list("game_instance_id", "id"):
+            ids_by_instance[game_instance_id].add(tower_id)
+
+    def _ids(moderation_type):
+        ids = set(standalone[moderation_type])
+        for game_instance_id in instances[moderation_type]:
+            ids |= ids_by_instance[game_instance_id]
+        return frozenset(ids)
+
+    snapshot = ModerationSnapshot(
+        version=version,
+        sus=_ids(types.SUS),
+        banned=_ids(types.BAN),
+        shun=_ids(types.SHUN),
+        soft_banned=_ids(types.SOFT_BAN),
+    )
+    _moderation_snapshot = snapshot
+    return snapshot
 
-    # Fallback: check by tower_id (for unverified/unmigrated IDs)
-    return ModerationRecord.objects.filter(
-        tower_id=player_id, moderation_type=ModerationRecord.ModerationType.SOFT_BAN, resolved_at__isnull=True
-    ).exists()
 
+def is_shun(player_id: str):
+    """Check if a tower_id is shunned (directly or through its GameInstance)."""
+    return player_id in get_moderation_snapshot().shun
+
+
+def is_sus(player_id: str):
+    """Check if a tower_id is sus (directly or through its GameInstance)."""
+    return player_id in get_moderation_snapshot().sus
 
-def is_banned(player_id: str):
-    """
-    Check if a tower_id is banned.
-    Checks the GameInstance directly - simpler and more efficient.
-    """
-    from thetower.backend.sus.models import PlayerId
-
-    # Try to find the GameInstance for this tower_id
-    try:
-        player_id_obj = PlayerId.objects.select_related("game_instance").get(id=player_id)
-        if player_id_obj.game_instance:
-            # Direct check: is this GameInstance banned?
-            return ModerationRecord.objects.filter(
-                game_instance=player_id_obj.game_instance,
-                moderation_type=ModerationRecord.ModerationType.BAN,
-                resolved_at__isnull=True,  # Active = not resolved
-            ).exists()
-    except PlayerId.DoesNotExist:
-        pass
 
-    # Fallback: check by tower_id (for unverified/unmigrated IDs)
-    return ModerationRecord.objects.filter(tower_id=player_id, moderation_type=ModerationRecord.ModerationType.BAN, resolved_at__isnull=True).exists()
+def is_soft_banned(player_id: str):
+    """Check if a tower_id is soft banned (directly or through its GameInstance)."""
+    return player_id in get_moderation_snapshot().soft_banned
+
+
+def is_banned(player_id: str):
+    """Check if a tower_id is banned (directly or through its GameInstance)."""
+    return player_id in get_moderation_snapshot().banned
 
 
 def get_shun_ids():
@@ -524,26 +513,7 @@ def get_shun_ids():
     Get all tower_ids that should be filtered as shunned.
     Returns all tower_ids in shunned GameInstances, plus standalone shunned tower_ids.
     """
-    from thetower.backend.sus.models import PlayerId
-
-    # Get tower_ids directly shunned (no game_instance link yet)
-    standalone_shunned = set(
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.SHUN, resolved_at__isnull=True, game_instance__isnull=True
-        ).values_list("tower_id", flat=True)
-    )
-
-    # Get shunned GameInstances
-    shunned_instances = (
-        ModerationRecord.objects.filter(moderation_type=ModerationRecord.ModerationType.SHUN, resolved_at__isnull=True, game_instance__isnull=False)
-        .values_list("game_instance_id", flat=True)
-        .distinct()
-    )
-
-    # Get ALL tower_ids in those GameInstances
-    instance_ids = set(PlayerId.objects.filter(game_instance_id__in=shunned_instances).values_list("id", flat=True))
-
-    return standalone_shunned | instance_ids
+    return set(get_moderation_snapshot().shun)
 
 
 def get_sus_ids():
@@ -551,26 +521,7 @@ def get_sus_ids():
     Get all tower_ids that should be filtered as sus.
     Returns all tower_ids in sus GameInstances, plus standalone sus tower_ids.
     """
-    from thetower.backend.sus.models import PlayerId
-
-    # Get tower_ids directly sus (no game_instance link yet)
-    standalone_sus = set(
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True, game_instance__isnull=True
-        ).values_list("tower_id", flat=True)
-    )
-
-    # Get sus GameInstances
-    sus_instances = (
-        ModerationRecord.objects.filter(moderation_type=ModerationRecord.ModerationType.SUS, resolved_at__isnull=True, game_instance__isnull=False)
-        .values_list("game_instance_id", flat=True)
-        .distinct()
-    )
-
-    # Get ALL tower_ids in those GameInstances
-    instance_ids = set(PlayerId.objects.filter(game_instance_id__in=sus_instances).values_list("id", flat=True))
-
-    return standalone_sus | instance_ids
+    return set(get_moderation_snapshot().sus)
 
 
 def get_banned_ids():
@@ -578,26 +529,7 @@ def get_banned_ids():
     Get all tower_ids that should be filtered as banned.
     Returns all tower_ids in banned GameInstances, plus standalone banned tower_ids.
     """
-    from thetower.backend.sus.models import PlayerId
-
-    # Get tower_ids directly banned (no game_instance link yet)
-    standalone_banned = set(
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.BAN, resolved_at__isnull=True, game_instance__isnull=True
-        ).values_list("tower_id", flat=True)
-    )
-
-    # Get banned GameInstances
-    banned_instances = (
-        ModerationRecord.objects.filter(moderation_type=ModerationRecord.ModerationType.BAN, resolved_at__isnull=True, game_instance__isnull=False)
-        .values_list("game_instance_id", flat=True)
-        .distinct()
-    )
-
-    # Get ALL tower_ids in those GameInstances
-    instance_ids = set(PlayerId.objects.filter(game_instance_id__in=banned_instances).values_list("id", flat=True))
-
-    return standalone_banned | instance_ids
+    return set(get_moderation_snapshot().banned)
 
 
 def get_soft_banned_ids():
@@ -605,28 +537,7 @@ def get_soft_banned_ids():
     Get all tower_ids that should be filtered as soft banned.
     Returns all tower_ids in soft banned GameInstances, plus standalone soft banned tower_ids.
     """
-    from thetower.backend.sus.models import PlayerId
-
-    # Get tower_ids directly soft banned (no game_instance link yet)
-    standalone_soft_banned = set(
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.SOFT_BAN, resolved_at__isnull=True, game_instance__isnull=True
-        ).values_list("tower_id", flat=True)
-    )
-
-    # Get soft banned GameInstances
-    soft_banned_instances = (
-        ModerationRecord.objects.filter(
-            moderation_type=ModerationRecord.ModerationType.SOFT_BAN, resolved_at__isnull=True, game_instance__isnull=False
-        )
-        .values_list("game_instance_id", flat=True)
-        .distinct()
-    )
-
-    # Get ALL tower_ids in those GameInstances
-    instance_ids = set(PlayerId.objects.filter(game_instance_id__in=soft_banned_instances).values_list("id", flat=True))
-
-    return standalone_soft_banned | instance_ids
+    return set(get_moderation_snapshot().soft_banned)
 
 
 def get_last_tourney(league=champ):
@@ -641,9 +552,11 @@ def get_results_for_patch(patch: Patch, league=champ):
     return TourneyResult.objects.filter(date__gte=patch.start_date, date__lte=patch.end_date, league=league, **public).order_by("-date")
 
 
-@ttl_cache(maxsize=128, ttl=60)
 def get_patch_for_result(date: datetime) -> Patch:
-    return Patch.objects.get(start_date__lte=date, end_date__gte=date)
+    patch = date_to_patch(date)
+    if patch is None:
+        raise Patch.DoesNotExist(f"No patch covers {date}")
+    return patch
 
 
 def get_tourneys(
@@ -693,15 +606,20 @@ def get_details(rows: QuerySet[TourneyRow]) -> pd.DataFrame:
     lookup = get_player_id_lookup()
     approved_lookup = get_player_id_approved_lookup()
 
-    conditions_mapping = {result.id: result.conditions.all() for result in TourneyResult.objects.filter(id__in=df.result_id.unique())}
+    results = TourneyResult.objects.filter(id__in=df.result_id.unique()).prefetch_related("conditions")
+    conditions_mapping = {result.id: result.conditions.all() for result in results}
 
-    patches = [get_patch_for_result(date) for date in df.date]
+    patches = get_patch_resolver().patches_for_dates(df.date)
+    missing = pd.isna(patches)
+    if missing.any():
+        raise Patch.DoesNotExist(f"No patch covers {df.date[missing].iloc[0]}")
+    wave_roles, wave_role_colors = get_role_resolver().roles_for_waves(df["wave"].to_numpy(), patches, df.league.to_numpy())
     bcs = [conditions_mapping.get(id_) for id_ in df.result_id]
 
     df["real_name"] = [lookup.get(id, name) for id, name in zip(df.id, df.tourney_name)]
     df["verified"] = ["✓" if approved_lookup.get(id) else "" for id, name in zip(df.id, df.tourney_name)]
-    df["wave_role"] = [wave_to_role(wave, patch, league) for wave, patch, league in zip(df["wave"], patches, df.league)]
-    df["wave_role_color"] = df.wave_role.map(lambda role: getattr(role, "color", None))
+    df["wave_role"] = wave_roles
+    df["wave_role_color"] = wave_role_colors
     df["bcs"] = bcs
     df["patch"] = patches
 
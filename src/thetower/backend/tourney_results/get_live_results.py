@@ -1,18 +1,15 @@
 #!/tourney/tourney_venv/bin/python
 import datetime
-import io
 import logging
-import os
 import time
 from pathlib import Path
 
-import pandas as pd
-import requests
 import schedule
 
 from thetower.backend.env_config import get_csv_data
 
-from .constants import leagues
+from . import live_entries
+from .leaderboard_fetch import fetch_leaderboard, for_each_league, make_session
 
 # Constants
 weekdays_sat = [5, 6, 0, 1]
@@ -56,31 +53,27 @@ def get_file_path(file_name, league):
     return f"{csv_data}/current_tourney/{league}/{file_name}"
 
 
-def make_request(league):
-    base_url = os.getenv("NEW_LEADERBOARD_URL")
-    params = {"tier": league, "pass": os.getenv("LEADERBOARD_PASS")}
+def make_request(league, session=None):
+    if session is None:
+        with make_session(1) as session:
+            return make_request(league, session)
 
-    csv_response = requests.get(base_url, params=params)
-    csv_contents = csv_response.text
-
-    header = "player_id,name,avatar,relic,wave,bracket,tourney_number\n"
-
-    csv_contents = header + csv_contents
-    df = pd.read_csv(io.StringIO(csv_contents.strip()), on_bad_lines="warn")
+    df = fetch_leaderboard(session, league)
     df["wave"] = df["wave"].astype(int)
     df = df.sort_values("wave", ascending=False)
-    df["name"] = df["name"].map(lambda x: x.strip())
-    df["bracket"] = df["bracket"].map(lambda x: x.strip())
-    logging.info(f"There are {len(df.query('name.str.len() == 0'))} blank tourney names.")
-    df.loc[df["name"].str.len() == 0, "name"] = df["player_id"]
+    df["name"] = df["name"].str.strip()
+    df["bracket"] = df["bracket"].str.strip().astype("category")
+    blank_names = df["name"].str.len() == 0
+    logging.info(f"There are {blank_names.sum()} blank tourney names.")
+    df.loc[blank_names, "name"] = df.loc[blank_names, "player_id"]
     return df
 
 
-def execute(league):
+def execute(league, session=None, file_name=None):
     logging.info(f"Working on {league}.")
-    file_path = Path(get_file_path(get_file_name(), league))
+    file_path = Path(get_file_path(file_name or get_file_name(), league))
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    df = make_request(league)
+    df = make_request(league, session)
 
     tmp_path = file_path.with_name(file_path.name + ".tmp")
     try:
@@ -91,6 +84,12 @@ def execute(league):
         raise
     logging.info(f"Successfully stored file {file_path}")
 
+    try:
+        live_entries.write_entries(league, df)
+    except Exception:
+        # The entry checks fall back to reading the snapshot.
+        logging.exception(f"Failed to write the live entry index for {league}")
+
     return True
 
 
@@ -107,12 +106,9 @@ def get_results():
         logging.info("Skipping because tourney *just* started.")
         return
 
-    for league in leagues:
-        try:
-            execute(league)
-        except Exception as e:
-            logging.exception(e)
-        time.sleep(2)
+    # Name every league's snapshot after the start of the run, even if a fetch is retried past the minute.
+    file_name = get_file_name()
+    for_each_league(lambda league, session: execute(league, session, file_name))
 
 
 if __name__ == "__main__":
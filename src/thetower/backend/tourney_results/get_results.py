@@ -1,17 +1,14 @@
 #!/tourney/tourney_venv/bin/python
 import datetime
-import io
 import logging
 import os
 import time
 
-import pandas as pd
-import requests
 import schedule
 
 from thetower.backend.env_config import get_csv_data
 
-from .constants import leagues
+from .leaderboard_fetch import fetch_leaderboard, for_each_league, make_session
 
 # Constants
 weekdays_sat = [5, 6, 0, 1]
@@ -61,31 +58,27 @@ def get_file_path(file_name, league):
     return f"{csv_data}/{league}/{file_name}"
 
 
-def make_request(league):
-    base_url = os.getenv("NEW_LEADERBOARD_URL")
-    params = {"tier": league, "pass": os.getenv("LEADERBOARD_PASS")}
+def make_request(league, session=None):
+    if session is None:
+        with make_session(1) as session:
+            return make_request(league, session)
 
-    csv_response = requests.get(base_url, params=params)
-    csv_contents = csv_response.text
-
-    header = "player_id,name,avatar,relic,wave,bracket,tourney_number\n"
-
-    csv_contents = header + csv_contents
-    df = pd.read_csv(io.StringIO(csv_contents.strip()), on_bad_lines="warn")
+    df = fetch_leaderboard(session, league)
     nan_waves = df["wave"].isna().sum()
     if nan_waves:
         logging.warning(f"Dropping {nan_waves} rows with NaN wave values.")
         df = df.dropna(subset=["wave"])
     df["wave"] = df["wave"].astype(int)
     df = df.sort_values("wave", ascending=False)
-    df["name"] = df["name"].map(lambda x: x.strip())
-    df["bracket"] = df["bracket"].map(lambda x: x.strip())
-    logging.info(f"There are {len(df.query('name.str.len() == 0'))} blank tourney names.")
-    df.loc[df["name"].str.len() == 0, "name"] = df["player_id"]
+    df["name"] = df["name"].str.strip()
+    df["bracket"] = df["bracket"].str.strip().astype("category")
+    blank_names = df["name"].str.len() == 0
+    logging.info(f"There are {blank_names.sum()} blank tourney names.")
+    df.loc[blank_names, "name"] = df.loc[blank_names, "player_id"]
     return df
 
 
-def execute(league):
+def execute(league, session=None):
     logging.info(f"Working on {league}.")
     file_path = get_file_path(get_file_name(), league)
 
@@ -94,7 +87,7 @@ def execute(league):
         return
 
     try:
-        df = make_request(league)
+        df = make_request(league, session)
     except Exception as e:
         logging.error(f"Error in make_request: {e}")
         return
@@ -114,12 +107,7 @@ def get_results():
         logging.info("Skipping cause tourney day!!")
         return
 
-    for league in leagues:
-        try:
-            execute(league)
-        except Exception as e:
-            logging.exception(e)
-        time.sleep(2)
+    for_each_league(execute)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,16 @@
 Generate per-tourney placement cache files for live placement analysis.
 
 This script groups live snapshots into tourneys (using a 42-hour gap), then
-incrementally updates a single flat cache file per tourney (per league). It is
-safe to run periodically (every 30 minutes) or once via --once.
-
-Writes are atomic; the cache file contains a `last_processed_iso` marker so the
-generator only processes new snapshots since the last run.
+incrementally updates a sectioned cache per tourney (per league), see
+``placement_cache`` for the layout. It is safe to run periodically (every 30
+minutes) or once via --once.
+
+The bracket first-seen log is appended per snapshot and records the last
+processed snapshot, so the generator only reads new snapshots (bracket column
+only) since the last run; the heavier sections are rebuilt once per run from
+the latest snapshot. Section and manifest writes are atomic.
 """
+
 import argparse
 import datetime
 import json
@@ -16,6 +20,7 @@ import logging
 import os
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import django
@@ -26,9 +31,26 @@ import schedule
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
 django.setup()
 
+from django.db import connections
+
 from thetower.backend.env_config import get_csv_data
+from thetower.backend.tourney_results.bracket_stats import waves_at_ranks
 from thetower.backend.tourney_results.constants import leagues
 from thetower.backend.tourney_results.data import get_player_id_lookup
+from thetower.backend.tourney_results.live_directory import write_directory
+from thetower.backend.tourney_results.placement_cache import (
+    SCHEMA_VERSION,
+    append_bracket_log,
+    manifest_path,
+    read_bracket_log,
+    read_manifest,
+    read_players,
+    remove_sections,
+    section_path,
+    write_players,
+    write_wave_index,
+)
+from thetower.backend.tourney_results.placement_index import BracketWaveIndex
 from thetower.backend.tourney_results.shun_config import include_shun_enabled_for
 from thetower.backend.tourney_results.tourney_utils import get_time
 
@@ -41,8 +63,8 @@ logging.info(f"Resolved LIVE_BASE: {LIVE_BASE}")
 # place caches in the existing results_cache directory (requested):
 # cache files will be written under LIVE_BASE to keep them alongside snapshots
 CACHE_BASE = LIVE_BASE
-# Cache schema versioning: bump when the on-disk JSON structure changes
-SCHEMA_VERSION = 2  # v2 introduces precomputed quantile_data
+# Leagues are independent, so they are processed concurrently
+DEFAULT_WORKERS = len(leagues)
 # Tourney grouping: snapshots > 42 hours apart indicate a new tourney
 GAP_HOURS = 42
 
@@ -108,60 +130,32 @@ def snapshot_iso(p: Path) -> str:
     return p.stem
 
 
-def build_player_index_from_df(df: pd.DataFrame) -> dict:
+def build_player_index(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Build a safe player index from a dataframe.
+    Build the player index (player_id, real_name, highest_wave, bracket) from a snapshot.
 
-    This is defensive: it tolerates missing columns and NaN values and will
-    populate sensible defaults rather than raising exceptions which would
-    otherwise cause the whole generator to skip writing a good cache.
+    Tolerates missing values: real_name falls back to an empty string and
+    highest_wave stays NaN when a player has no numeric wave.
     """
-    res = {}
-    if df is None or df.empty:
-        return res
-
-    # Ensure expected columns exist
-    cols = set(df.columns)
-    has_player = "player_id" in cols
-    has_real = "real_name" in cols
-    has_wave = "wave" in cols
-    has_bracket = "bracket" in cols
+    columns = ["player_id", "real_name", "highest_wave", "bracket"]
+    if df is None or df.empty or "player_id" not in df.columns:
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in columns})
 
-    if not has_player:
-        return res
+    grouped = df.groupby(df["player_id"].astype(str), sort=False)
+    players = pd.DataFrame(
+        {
+            "real_name": grouped["real_name"].first() if "real_name" in df.columns else "",
+            "highest_wave": grouped["wave"].max() if "wave" in df.columns else float("nan"),
+            "bracket": grouped["bracket"].first() if "bracket" in df.columns else None,
+        }
+    )
+    players["real_name"] = players["real_name"].fillna("").astype(str)
+    return players.rename_axis("player_id").reset_index()[columns]
 
-    for pid, group in df.groupby("player_id"):
-        try:
-            # real_name: prefer first non-null, else empty string
-            real_name = ""
-            if has_real:
-                rn = group["real_name"].dropna()
-                if not rn.empty:
-                    real_name = str(rn.iloc[0])
-
-            # highest_wave: take numeric max if present
-            highest_wave = None
-            if has_wave:
-                try:
-                    max_wave = group["wave"].dropna().max()
-                    if pd.notna(max_wave):
-                        highest_wave = int(max_wave)
-                except Exception:
-                    highest_wave = None
-
-            # bracket: first non-null bracket value
-            bracket = None
-            if has_bracket:
-                b = group["bracket"].dropna()
-                if not b.empty:
-                    bracket = str(b.iloc[0])
-
-            res[str(pid)] = {"real_name": real_name, "highest_wave": highest_wave, "bracket": bracket}
-        except Exception:
-            # defensive fallback for an unexpected per-player error
-            res[str(pid)] = {"real_name": "", "highest_wave": None, "bracket": None}
 
-    return res
+def read_snapshot(path: Path, columns: list[str]) -> pd.DataFrame:
+    """Read only ``columns`` (those present) of a snapshot."""
+    return pd.read_csv(path, usecols=lambda c: c in columns)
 
 
 def calculate_quantiles_for_cache(df: pd.DataFrame) -> dict:
@@ -199,33 +193,13 @@ def calculate_quantiles_for_cache(df: pd.DataFrame) -> dict:
     results = {}
 
     try:
-        for rank in ranks:
-            waves_at_rank = []
-
-            # Collect wave values for this rank across all brackets
-            for bracket in df["bracket"].unique():
-                bracket_df = df[df["bracket"] == bracket]
-                sorted_bracket = bracket_df.sort_values("wave", ascending=False)
-
-                # Only include brackets with enough players for this rank
-                if len(sorted_bracket) >= rank:
-                    wave_at_rank = sorted_bracket.iloc[rank - 1]["wave"]
-                    # Ensure it's a valid number
-                    if pd.notna(wave_at_rank):
-                        waves_at_rank.append(float(wave_at_rank))
-
-            # Calculate quantiles for this rank
-            if waves_at_rank:
-                wave_series = pd.Series(waves_at_rank)
-                rank_quantiles = {}
-                for q in quantiles:
-                    try:
-                        rank_quantiles[str(q)] = float(wave_series.quantile(q))
-                    except Exception:
-                        rank_quantiles[str(q)] = None
-                results[str(rank)] = rank_quantiles
+        # One sort of all players; each bracket's rank-th wave is read off the per-bracket positions.
+        for rank, waves_at_rank in waves_at_ranks(df, ranks).items():
+            if not waves_at_rank.empty:
+                rank_quantiles = waves_at_rank.astype(float).quantile(quantiles)
+                results[str(rank)] = {str(q): float(value) for q, value in zip(quantiles, rank_quantiles)}
             else:
-                # No valid data for this rank
+                # No valid data for this rank (no bracket has enough players)
                 results[str(rank)] = {str(q): None for q in quantiles}
 
     except Exception:
@@ -238,157 +212,136 @@ def calculate_quantiles_for_cache(df: pd.DataFrame) -> dict:
 def process_tourney_group(league: str, group: list[Path], include_shun: bool = False):
     """Process a single tourney group (chronological list of snapshot Paths).
 
-    Writes a flat cache file named {tourney_date}_placement_cache.json under
-    the live results cache for the league, next to snapshots:
-    LIVE_BASE/{league}_live/{tourney_date}_placement_cache.json
+    Updates the sectioned placement cache of the tourney (see
+    ``placement_cache``) under LIVE_BASE/{league}_live/, next to snapshots:
+
+    - only the bracket column of new snapshots is read, to append their newly
+      seen brackets to the bracket first-seen log;
+    - the player index, wave index and quantiles are built once, from the
+      latest snapshot, and the manifest is written last.
+
+    Returns:
+        (snapshot path, player index DataFrame) of the finished cache, or None
+        if the cache could not be brought up to date
     """
     if not group:
-        return
+        return None
     first = group[0]
     tourney_date = get_time(first).date().isoformat()  # YYYY-MM-DD
     # Place cache files alongside snapshots under the league_live folder so
     # operators find them next to the snapshots (matching get_live_results.py layout)
-    cache_file = LIVE_BASE / f"{league}_live" / f"{tourney_date}_placement_cache.json"
+    cache_file = manifest_path(LIVE_BASE / f"{league}_live", tourney_date)
+    brackets_file = section_path(cache_file, "brackets")
+    players_file = section_path(cache_file, "players")
+    waves_file = section_path(cache_file, "waves")
 
-    # Load existing cache if present
-    last_processed_iso = None
-    bracket_times = {}
-    player_index = {}
-    existing_snapshot_iso = None
+    try:
+        manifest = read_manifest(cache_file)
+    except Exception:
+        logging.exception(f"Failed to load existing cache for {league} {tourney_date}, regenerating")
+        manifest = None
+        remove_sections(cache_file)
 
-    if cache_file.exists():
+    if manifest is not None:
+        # If schema is outdated, force a full regeneration so new sections are present
         try:
-            payload = json.loads(cache_file.read_text(encoding="utf8"))
-            last_processed_iso = payload.get("last_processed_iso")
-            bracket_times = payload.get("bracket_creation_times", {}) or {}
-            player_index = payload.get("player_index", {}) or {}
-            existing_snapshot_iso = payload.get("snapshot_iso")
-            # If schema is outdated, force a full regeneration so new fields are present
-            try:
-                existing_schema = int(payload.get("schema_version", 1))
-            except Exception:
-                existing_schema = 1
-            if existing_schema < SCHEMA_VERSION:
-                logging.info(f"Outdated cache schema (v{existing_schema} < v{SCHEMA_VERSION}) for {league} {tourney_date}; forcing full regen")
-                last_processed_iso = None
-                bracket_times = {}
-                player_index = {}
-            elif payload.get("include_shun") != include_shun:
-                logging.info(f"include_shun changed for {league} {tourney_date}; forcing full regen")
-                last_processed_iso = None
-                bracket_times = {}
-                player_index = {}
+            existing_schema = int(manifest.get("schema_version", 1))
         except Exception:
-            logging.exception("Failed to load existing cache, regenerating")
-            last_processed_iso = None
-            bracket_times = {}
-            player_index = {}
-
-    # Build list of snapshots to process (those after last_processed_iso)
-    to_process = []
+            existing_schema = 1
+        if existing_schema < SCHEMA_VERSION:
+            logging.info(f"Outdated cache schema (v{existing_schema} < v{SCHEMA_VERSION}) for {league} {tourney_date}; forcing full regen")
+            manifest = None
+            remove_sections(cache_file)
+        elif manifest.get("include_shun") != include_shun:
+            logging.info(f"include_shun changed for {league} {tourney_date}; forcing full regen")
+            manifest = None
+            remove_sections(cache_file)
+
+    bracket_times, last_processed_iso = read_bracket_log(brackets_file)
+
+    # Build list of snapshots to process (those after the last one in the bracket log)
+    last_dt = None
     if last_processed_iso:
         try:
             last_dt = get_time(Path(last_processed_iso))
         except Exception:
             last_dt = None
-    else:
-        last_dt = None
+    to_process = [p for p in group if last_dt is None or get_time(p) > last_dt]
 
-    for p in group:
-        p_dt = get_time(p)
-        if (last_dt is None) or (p_dt > last_dt):
-            to_process.append(p)
-
-    if not to_process:
-        logging.info(f"Cache up-to-date for {league} {tourney_date} (snapshot {existing_snapshot_iso})")
-        return
+    if not to_process and manifest is not None and manifest.get("snapshot_iso") == last_processed_iso and players_file.exists():
+        logging.info(f"Cache up-to-date for {league} {tourney_date} (snapshot {last_processed_iso})")
+        return last_processed_iso, read_players(players_file)
 
     logging.info(f"Processing {len(to_process)} new snapshots for {league} {tourney_date}")
 
     for snap in to_process:
         try:
-            # Read only this snapshot
-            df = pd.read_csv(snap)
+            # Only the bracket column is needed to track bracket first-seen times
+            brackets = read_snapshot(snap, ["bracket"])
             # store full snapshot path so resume logic is robust
             snap_iso = str(snap.resolve())
             snap_time = get_time(snap).isoformat()
 
-            # Record bracket first-seen time if new
-            for br in df["bracket"].unique():
-                if br not in bracket_times:
-                    bracket_times[br] = snap_time
+            new_brackets = [br for br in brackets["bracket"].dropna().astype(str).unique() if br not in bracket_times]
+            bracket_times.update(dict.fromkeys(new_brackets, snap_time))
 
-            # After processing snapshot, advance last_processed_iso
+            # The log marker makes the generator resumable after each snapshot
+            append_bracket_log(brackets_file, snap_iso, snap_time, new_brackets)
             last_processed_iso = snap_iso
-
-            # Persist progress after each snapshot to make the generator resumable
-            payload = {
-                "schema_version": SCHEMA_VERSION,
-                "tourney_date": tourney_date,
-                # snapshot_iso and last_processed_iso are full snapshot path strings
-                "snapshot_iso": last_processed_iso,
-                "last_processed_iso": last_processed_iso,
-                "include_shun": include_shun,
-                # use timezone-aware UTC timestamp
-                "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                "bracket_creation_times": bracket_times,
-                "player_index": player_index,
-                "meta": {"num_brackets": len(bracket_times)},
-            }
-            atomic_write(cache_file, payload)
-            logging.info(f"Wrote progress for {league} {tourney_date} at {last_processed_iso}")
-
         except Exception as e:
             logging.exception(f"Failed to process snapshot {snap} for {league} {tourney_date}: {e}")
             # stop processing further snapshots to retry later
-            return
+            return None
 
-    # After processing all snapshots, update player_index from the latest snapshot
-    # that actually contains player rows. Iterate from the end backwards so if
-    # the final file for some reason is empty or malformed we pick the last
-    # good snapshot instead of producing an empty player index.
+    # Build the heavy sections from the latest snapshot that actually contains
+    # player rows. Iterate from the end backwards so if the final file for some
+    # reason is empty or malformed we pick the last good snapshot instead of
+    # producing an empty player index.
     try:
         df_latest = None
         for snap in reversed(group):
             try:
-                cand = pd.read_csv(snap)
-                if cand is not None and not cand.empty and "player_id" in cand.columns:
+                cand = read_snapshot(snap, ["player_id", "name", "wave", "bracket"])
+                if not cand.empty and "player_id" in cand.columns:
                     df_latest = cand
                     break
             except Exception:
                 # skip malformed snapshot and try the previous one
                 continue
 
+        quantile_data = (manifest or {}).get("quantile_data", {})
         if df_latest is None:
-            logging.warning(f"No valid latest snapshot found for {league} {tourney_date}; keeping existing player_index")
+            logging.warning(f"No valid latest snapshot found for {league} {tourney_date}; keeping existing player index")
+            players = read_players(players_file) if players_file.exists() else build_player_index(None)
         else:
-            # Normalize and enrich the latest dataframe so build_player_index_from_df
-            # has the columns it expects. Incoming live snapshots commonly have a
-            # `name` column (tourney display name) rather than `real_name`.
-            # Map player_id -> real_name using the same lookup used elsewhere
-            # in the codebase to keep caches consistent with live views.
+            # Incoming live snapshots have a `name` column (tourney display name)
+            # rather than `real_name`. Map player_id -> real_name using the same
+            # lookup used elsewhere in the codebase to keep caches consistent with
+            # live views, falling back to the snapshot name.
             try:
                 lookup = get_player_id_lookup()
             except Exception:
                 lookup = {}
-
-            # populate real_name from lookup (fall back to snapshot name if present)
-            if "name" in df_latest.columns:
-                df_latest["real_name"] = [lookup.get(pid, name) for pid, name in zip(df_latest.player_id, df_latest.name)]
-            else:
-                df_latest["real_name"] = [lookup.get(pid, "") for pid in df_latest.player_id]
+            real_names = df_latest["player_id"].map(lookup)
+            df_latest["real_name"] = real_names.fillna(df_latest["name"]) if "name" in df_latest.columns else real_names.fillna("")
 
             # normalize bracket strings and coerce wave to numeric where possible
             if "bracket" in df_latest.columns:
-                df_latest["bracket"] = df_latest["bracket"].astype(str).map(lambda x: x.strip())
+                df_latest["bracket"] = df_latest["bracket"].astype(str).str.strip()
             if "wave" in df_latest.columns:
                 df_latest["wave"] = pd.to_numeric(df_latest["wave"], errors="coerce")
 
-            player_index = build_player_index_from_df(df_latest)
+            players = build_player_index(df_latest)
+            write_players(players_file, players)
 
-        # Calculate quantile data from the latest snapshot for quantile analysis page
-        quantile_data = {}
-        if df_latest is not None and not df_latest.empty:
+            # Sorted per-bracket waves of the latest snapshot for the placement page. All
+            # players are kept; the page applies moderation exclusions when loading it.
+            try:
+                write_wave_index(waves_file, BracketWaveIndex.from_frame(df_latest))
+            except Exception:
+                logging.exception(f"Failed to build wave index for {league} {tourney_date}")
+
+            # Calculate quantile data from the latest snapshot for quantile analysis page
             try:
                 quantile_data = calculate_quantiles_for_cache(df_latest)
                 logging.info(f"Calculated quantile data for {league} {tourney_date}")
@@ -398,22 +351,42 @@ def process_tourney_group(league: str, group: list[Path], include_shun: bool = F
         payload = {
             "schema_version": SCHEMA_VERSION,
             "tourney_date": tourney_date,
+            # snapshot_iso and last_processed_iso are full snapshot path strings
             "snapshot_iso": last_processed_iso,
             "last_processed_iso": last_processed_iso,
             "include_shun": include_shun,
+            # use timezone-aware UTC timestamp
             "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "bracket_creation_times": bracket_times,
-            "player_index": player_index,
             "quantile_data": quantile_data,
-            "meta": {"num_brackets": len(bracket_times), "num_players": len(player_index)},
+            "meta": {"num_brackets": len(bracket_times), "num_players": len(players)},
         }
         atomic_write(cache_file, payload)
         logging.info(f"Finalized cache for {league} {tourney_date} (snap {last_processed_iso})")
+        return last_processed_iso, players
     except Exception:
-        logging.exception("Failed to update player_index from latest snapshot")
+        logging.exception("Failed to update player index from latest snapshot")
+        return None
+
 
+def process_league(league: str, include_shun: bool):
+    """Bring every tourney cache of ``league`` up to date; return the state of its latest tourney."""
+    try:
+        snaps = list_live_snapshots(league)
+        groups = group_snapshots_into_tourneys(snaps)
+        logging.info(f"Found {len(groups)} tourney groups for league {league}")
+        state = None
+        for group in groups:
+            state = process_tourney_group(league, group, include_shun=include_shun)
+        return state
+    except Exception:
+        logging.exception(f"Failed processing league {league}")
+        return None
+    finally:
+        # Worker threads get their own DB connections; don't leave them open.
+        connections.close_all()
 
-def execute_once():
+
+def execute_once(workers: int = DEFAULT_WORKERS):
     logging.info("Starting placement cache generation run")
     # Read current desired include_shun value for placement cache pages so we
     # generate caches that match the UI configuration. This ensures that when
@@ -422,35 +395,46 @@ def execute_once():
     # This setting is used by both live_placement_analysis and live_quantile_analysis pages.
     include_shun = include_shun_enabled_for("live_placement_cache")
     logging.info(f"Placement cache generation: include_shun={include_shun}")
-    for league in leagues:
-        try:
-            snaps = list_live_snapshots(league)
-            groups = group_snapshots_into_tourneys(snaps)
-            logging.info(f"Found {len(groups)} tourney groups for league {league}")
-            for group in groups:
-                process_tourney_group(league, group, include_shun=include_shun)
-        except Exception:
-            logging.exception(f"Failed processing league {league}")
+
+    # Load the shared name lookup once before the league workers use it.
+    try:
+        get_player_id_lookup()
+    except Exception:
+        logging.exception("Failed to load player id lookup")
+
+    # league -> (snapshot, player index) of its current (latest) tourney, for the player directory
+    league_indexes = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for league, state in zip(leagues, pool.map(lambda league: process_league(league, include_shun), leagues)):
+            if state is not None:
+                league_indexes[league] = state
+
+    try:
+        write_directory(league_indexes)
+        logging.info(f"Wrote live player directory for {len(league_indexes)} leagues")
+    except Exception:
+        logging.exception("Failed to write live player directory")
     logging.info("Placement cache generation run complete")
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Leagues processed concurrently")
     args = parser.parse_args()
 
     if args.once:
-        execute_once()
+        execute_once(workers=args.workers)
         return
 
     # run once immediately so the long-running process kicks off work
     # as soon as it starts, then fall into scheduled runs on :01 and :31
     # (this follows the schedule usage in get_live_results.py)
-    execute_once()
+    execute_once(workers=args.workers)
 
     # schedule at :01 and :31 each hour (30-minute cycles anchored to the clock)
-    schedule.every().hour.at(":01").do(execute_once)
-    schedule.every().hour.at(":31").do(execute_once)
+    schedule.every().hour.at(":01").do(execute_once, workers=args.workers)
+    schedule.every().hour.at(":31").do(execute_once, workers=args.workers)
     logging.info("Scheduled placement cache generation on :01 and :31 each hour")
 
     while True:
@@ -7,15 +7,18 @@ ensuring each freshly-written snapshot is picked up promptly.
 
 During the tourney window, for each league:
   - Any staging snapshots in current_tourney/{league}/ not yet appended to the
-    delta archive are processed via append_snapshot_to_archive().
-  - Streamlit cache is cleared so the web UI sees the new data.
+    delta archive are processed via append_snapshot_to_archive(), which writes
+    one immutable segment per snapshot instead of rewriting the archive.
+  - Nothing is signalled to the web UI: its live timeline store notices the
+    new snapshot and segment from their mtimes and extends the cached timeline.
 
 After the tourney window closes, for each league still holding staging snapshots:
+  - The archive's append segments are compacted into {date}_archive.csv.gz.
   - Archive fidelity is verified (row-for-row reconstruction check).
   - Snapshots are bundled into a raw tar in {league}_raw/.
   - Tar contents are verified (byte-for-byte).
-  - Only after both verifications pass are the staging snapshots deleted.
-  - Streamlit cache is cleared.
+  - Only after both verifications pass are the staging snapshots deleted; the
+    web UI picks up the compacted archive from its mtime the same way.
 """
 import datetime
 import logging
@@ -34,11 +37,12 @@ django.setup()
 from thetower.backend.env_config import get_csv_data
 from thetower.backend.tourney_results.archive_utils import (
     append_snapshot_to_archive,
+    archive_last_snapshot_time,
     bundle_tourney_to_raw,
+    compact_archive,
     get_raw_path,
     group_snapshots_by_tourney,
     list_snapshots,
-    read_archive,
     verify_archive_fidelity,
     verify_tar_contents,
 )
@@ -78,6 +82,13 @@ def _cleanup_completed_tourney(group: list[Path], archive_path: Path, raw_dir: P
     """Bundle, verify, and delete staging snapshots for a completed tourney."""
     logging.info(f"Starting post-tourney cleanup for {league} {tourney_date} ({len(group)} snapshots)")
 
+    # Step 0: fold the append segments into a single archive file
+    try:
+        compact_archive(archive_path)
+    except Exception:
+        logging.exception(f"Failed to compact archive for {league} {tourney_date}; aborting cleanup")
+        return
+
     # Step 1: verify archive fidelity before touching anything
     logging.info(f"Verifying archive fidelity for {league} {tourney_date}...")
     ok, errors = verify_archive_fidelity(group, archive_path)
@@ -121,11 +132,8 @@ def _cleanup_completed_tourney(group: list[Path], archive_path: Path, raw_dir: P
     logging.info(f"Deleted {deleted}/{len(group)} staging snapshots for {league} {tourney_date}")
 
 
-def process_league(league: str, in_window: bool) -> bool:
-    """Process one league: append new snapshots and optionally clean up after tourney.
-
-    Returns True if any archive was updated (so caller knows to clear Streamlit cache).
-    """
+def process_league(league: str, in_window: bool) -> None:
+    """Process one league: append new snapshots and optionally clean up after tourney."""
     staging_dir = LIVE_BASE / "current_tourney" / league
     live_dir = LIVE_BASE / f"{league}_live"
     raw_dir = get_raw_path(league, LIVE_BASE)
@@ -134,12 +142,11 @@ def process_league(league: str, in_window: bool) -> bool:
 
     staging_snapshots = list_snapshots(staging_dir)
     if not staging_snapshots:
-        return False
+        return
 
     # Group into tourneys in case service lagged across a tourney boundary.
     # In normal operation there is exactly one group (the current tourney).
     groups = group_snapshots_by_tourney(staging_snapshots)
-    archive_updated = False
 
     for i, group in enumerate(groups):
         is_completed = not in_window or (i < len(groups) - 1)
@@ -149,60 +156,40 @@ def process_league(league: str, in_window: bool) -> bool:
 
         # Determine which snapshots have not yet been appended.
         last_archived_time: pd.Timestamp | None = None
-        if archive_path.exists():
-            try:
-                arc_df = read_archive(archive_path)
-                if not arc_df.empty:
-                    last_archived_time = arc_df["snapshot_time"].max()
-            except Exception:
-                logging.exception(f"Failed to read existing archive {archive_path}; will reprocess all snapshots")
-
-        new_rows = 0
+        try:
+            last_archived_time = archive_last_snapshot_time(archive_path)
+        except Exception:
+            logging.exception(f"Failed to read existing archive {archive_path}; will reprocess all snapshots")
+
         for snap in group:
             snap_ts = pd.Timestamp(get_time(snap))
             if last_archived_time is None or snap_ts > last_archived_time:
                 try:
                     count = append_snapshot_to_archive(snap, archive_path)
-                    new_rows += count
                     last_archived_time = snap_ts
                     logging.info(f"Appended {count} delta rows from {snap.name} to {archive_path.name}")
                 except Exception:
                     logging.exception(f"Failed to append {snap.name} to archive; skipping")
                     break  # stop processing further snapshots; retry next run
 
-        if new_rows > 0:
-            archive_updated = True
-
         if is_completed:
             _cleanup_completed_tourney(group, archive_path, raw_dir, league, tourney_date)
 
-    return archive_updated
-
 
 def execute():
     logging.info("import_live_results: starting run")
     in_window = _in_tourney_window()
     logging.info(f"import_live_results: tourney_window={in_window}")
 
-    any_updated = False
+    # The web process's LiveTimelineStore notices new snapshots and archive
+    # writes from their mtimes, so there is nothing to signal from here.
     for league in leagues:
         try:
-            updated = process_league(league, in_window)
-            if updated:
-                any_updated = True
+            process_league(league, in_window)
         except Exception:
             logging.exception(f"import_live_results: unhandled error processing league {league}")
         time.sleep(1)
 
-    if any_updated:
-        try:
-            from thetower.web.live.data_ops import clear_cache
-
-            clear_cache()
-            logging.info("import_live_results: cleared Streamlit cache")
-        except Exception as exc:
-            logging.warning(f"import_live_results: failed to clear Streamlit cache: {exc}")
-
     logging.info("import_live_results: run complete")
 
 
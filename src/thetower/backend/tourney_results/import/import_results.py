@@ -21,6 +21,7 @@ from ..constants import leagues
 from ..get_results import get_file_name, get_last_date
 from ..models import BattleCondition, TourneyResult
 from ..overview_cache import regenerate_overview_cache
+from ..thresholds import update_thresholds
 from ..tourney_utils import create_tourney_rows, get_summary
 
 # Graceful towerbcs import handling
@@ -121,6 +122,11 @@ def execute():
 
         create_tourney_rows(result)
 
+        try:
+            update_thresholds(result)
+        except Exception:
+            logging.exception(f"Failed to update placement thresholds for {result}")
+
         # Generate summary for Legend league results
         if league == "Legend":
             logging.info("Generating summary for Legends league results")
@@ -0,0 +1,120 @@
+"""Fetching league leaderboards from the game's leaderboard endpoint.
+
+``get_results`` and ``get_live_results`` fetch every league in one run.  The
+leagues are fetched concurrently (at most ``MAX_CONCURRENT_FETCHES`` at a time)
+over one pooled ``requests.Session``, so the snapshots of a run are taken
+within seconds of each other instead of one after another.  Each league is
+retried on connection errors, timeouts and 429/5xx responses with exponential
+backoff, independently of the others.  A league's CSV is parsed while it
+downloads (``read_leaderboard``), so a fetch never holds the body as text.
+
+The endpoint is ``NEW_LEADERBOARD_URL`` with ``LEADERBOARD_PASS``; point the
+former at a local server to test against canned leaderboards
+(``scripts/check_league_fetch.py`` does that).
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Iterable, TypeVar
+
+import pandas as pd
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from .constants import leagues
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_CONCURRENT_FETCHES = 6
+ATTEMPTS = 4
+BACKOFF_SECONDS = 2.0  # doubled after every failed attempt
+TIMEOUT = (10, 120)  # connect, read (seconds)
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+LEADERBOARD_COLUMNS = ["player_id", "name", "avatar", "relic", "wave", "bracket", "tourney_number"]
+_DTYPES = {
+    "player_id": str,
+    "name": str,
+    "avatar": "Int32",
+    "relic": "Int32",
+    "wave": "Int32",
+    "bracket": "category",
+    "tourney_number": "Int32",
+}
+
+
+def make_session(pool_size: int = MAX_CONCURRENT_FETCHES) -> requests.Session:
+    """A session whose connection pool can serve ``pool_size`` concurrent requests to the endpoint."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def read_leaderboard(stream: IO[bytes], encoding: str = "utf-8") -> pd.DataFrame:
+    """Parse a leaderboard CSV body (no header row) straight from ``stream``.
+
+    Numeric columns are nullable integers (``wave`` may be blank), ``bracket``
+    is categorical; ids and names are read as text, blank names as "".
+    """
+    return pd.read_csv(
+        stream,
+        header=None,
+        names=LEADERBOARD_COLUMNS,
+        dtype=_DTYPES,
+        encoding=encoding,
+        keep_default_na=False,
+        na_values={column: [""] for column, dtype in _DTYPES.items() if dtype == "Int32"},
+        on_bad_lines="warn",
+    )
+
+
+def fetch_leaderboard(session: requests.Session, league: str, attempts: int = ATTEMPTS, backoff: float = BACKOFF_SECONDS) -> pd.DataFrame:
+    """Return the leaderboard of ``league`` as parsed by ``read_leaderboard``, retrying transient failures.
+
+    The response body is parsed while it downloads, without holding the whole text in memory first.
+    """
+    base_url = os.getenv("NEW_LEADERBOARD_URL")
+    params = {"tier": league, "pass": os.getenv("LEADERBOARD_PASS")}
+
+    for attempt in range(1, attempts + 1):
+        try:
+            with session.get(base_url, params=params, timeout=TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                # The charset response.text would use; the endpoint serves UTF-8 otherwise.
+                return read_leaderboard(response.raw, response.encoding or "utf-8")
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError, urllib3.exceptions.HTTPError) as e:
+            retryable = not isinstance(e, requests.HTTPError) or e.response is None or e.response.status_code in _RETRY_STATUSES
+            if not retryable or attempt == attempts:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            logger.warning(f"Fetching {league} failed (attempt {attempt}/{attempts}): {e}; retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+def for_each_league(
+    task: Callable[[str, requests.Session], T],
+    league_names: Iterable[str] = leagues,
+    max_workers: int = MAX_CONCURRENT_FETCHES,
+) -> dict[str, T]:
+    """Run ``task(league, session)`` for every league concurrently, sharing one pooled session.
+
+    Returns {league: result}; a league whose task raised is logged and left out.
+    """
+    league_names = list(league_names)
+    results: dict[str, T] = {}
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="league-fetch") as pool:
+        futures = {league: pool.submit(task, league, session) for league in league_names}
+        for league, future in futures.items():
+            try:
+                results[league] = future.result()
+            except Exception:
+                logger.exception(f"Fetching {league} failed")
+    return results
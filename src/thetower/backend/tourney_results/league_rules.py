@@ -46,6 +46,11 @@ class LeagueRules:
         """Last place that is safe from relegation, or None if no relegation."""
         return self.relegate_cutoff - 1 if self.relegate_cutoff is not None else None
 
+    @property
+    def min_full_bracket_size(self) -> int:
+        """Smallest bracket counted as full; tolerates a few missing players (late-join or early-leave)."""
+        return max(self.bracket_size - 5, self.bracket_size // 2)
+
     @property
     def median_place(self) -> int:
         """Approximate median bracket position (middle of bracket_size)."""
@@ -0,0 +1,206 @@
+"""Cross-league directory of the players in the current live tourneys.
+
+``generate_placement_cache`` writes ``live_player_directory.col`` (columnar
+layout of ``archive_utils``) next to the league folders after every run: one
+row per player of each league's current tourney (player_id, league, bracket,
+real_name), taken from the placement caches' player indexes, plus the snapshot
+each league was generated from.
+
+The live placement page searches it instead of loading and scanning every
+league's snapshot.  ``get_live_player_directory`` loads the file lazily, applies
+the current moderation exclusions and the fullish-bracket cut the page uses,
+derives display names, and keeps the result until the file, the moderation
+data or a league's latest snapshot changes.  Substring lookups go through a
+trigram index, so a search only verifies the rows sharing all of the query's
+trigrams.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..env_config import get_csv_data
+from .archive_utils import list_snapshots, read_columnar_archive, write_columnar_archive
+from .constants import leagues
+from .data import get_moderation_snapshot
+from .placement_index import FULL_BRACKET_MIN_PLAYERS
+
+logger = logging.getLogger(__name__)
+
+DIRECTORY_FILE = "live_player_directory.col"
+NGRAM = 3
+_COLUMNS = ["player_id", "league", "bracket", "real_name", "snapshot"]
+
+
+def directory_path() -> Path:
+    return Path(get_csv_data()) / DIRECTORY_FILE
+
+
+def write_directory(league_players: dict[str, tuple[Optional[str], pd.DataFrame]]) -> None:
+    """Write the directory file.
+
+    Args:
+        league_players: league -> (snapshot path the league's cache was built from,
+            placement-cache player index) for each league's current tourney
+    """
+    frames = []
+    for league, (snapshot_iso, players) in league_players.items():
+        frame = players[["player_id", "bracket", "real_name"]].copy()
+        frame["league"] = league
+        frame["snapshot"] = Path(snapshot_iso).name if snapshot_iso else None
+        frames.append(frame)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame({col: pd.Series(dtype=object) for col in _COLUMNS})
+    df["player_id"] = df["player_id"].astype(str)
+    df["real_name"] = df["real_name"].fillna("").astype(str)
+    write_columnar_archive(df[_COLUMNS], directory_path())
+
+
+class _NgramIndex:
+    """Trigram posting lists over a list of (lowercased) strings, answering substring queries."""
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        postings: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            for gram in {text[j : j + NGRAM] for j in range(len(text) - NGRAM + 1)}:
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.asarray(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+    def search(self, query: str) -> list[int]:
+        """Return the ascending row numbers whose text contains ``query``."""
+        if len(query) < NGRAM:
+            return [i for i, text in enumerate(self.texts) if query in text]
+
+        grams = {query[j : j + NGRAM] for j in range(len(query) - NGRAM + 1)}
+        lists = sorted((self._postings.get(gram) for gram in grams), key=lambda rows: -1 if rows is None else len(rows))
+        if lists[0] is None:
+            return []
+        candidates = lists[0]
+        for rows in lists[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return []
+        # Sharing every trigram does not imply containment; confirm each candidate.
+        return [i for i in candidates.tolist() if query in self.texts[i]]
+
+
+class LivePlayerDirectory:
+    """Players of the current live tourneys across leagues, with name and ID search."""
+
+    def __init__(self, df: pd.DataFrame):
+        league_order = {league: i for i, league in enumerate(leagues)}
+        df = df.assign(_league_order=df["league"].map(league_order).fillna(len(leagues)))
+        self.df = df.sort_values(["_league_order", "real_name", "player_id"], kind="stable").drop(columns="_league_order").reset_index(drop=True)
+        # First row wins, i.e. the highest league a player appears in.
+        self._row_by_id = {player_id: row for row, player_id in reversed(list(enumerate(self.df["player_id"])))}
+        self._name_index: Optional[_NgramIndex] = None
+        self._id_index: Optional[_NgramIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file_frame(cls, df: pd.DataFrame, excluded_ids, latest_snapshots: dict[str, Optional[str]]) -> "LivePlayerDirectory":
+        """Build the searchable directory from the file contents.
+
+        Leagues whose rows were not generated from their latest snapshot are left
+        out (the page would reject that league's placement cache as stale).
+        """
+        current = df["snapshot"].notna() & (df["snapshot"] == df["league"].map(latest_snapshots))
+        df = df[current & ~df["player_id"].isin(list(excluded_ids))]
+
+        # Same cut as get_placement_analysis_data: only brackets with enough players count.
+        players = df.groupby(["league", "bracket"])["player_id"].transform("nunique")
+        df = df[players >= FULL_BRACKET_MIN_PLAYERS].copy()
+
+        # Same display names as process_display_names, per league.
+        names = df.groupby(["league", "real_name"])["player_id"].transform("nunique")
+        df["display_name"] = df["real_name"].where(names <= 1, df["real_name"] + " (" + df["player_id"] + ")")
+        return cls(df[["player_id", "league", "bracket", "real_name", "display_name"]])
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _index(self, attr: str, texts) -> _NgramIndex:
+        index = getattr(self, attr)
+        if index is None:
+            with self._lock:
+                index = getattr(self, attr)
+                if index is None:
+                    index = _NgramIndex(list(texts))
+                    setattr(self, attr, index)
+        return index
+
+    def search_names(self, query: str) -> list[tuple[str, str, str]]:
+        """Return (real_name, player_id, league) for players whose name contains ``query`` (case-insensitive).
+
+        Matches are unique per (league, real_name), as on the placement page.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        # display_name starts with real_name, so matching it also covers real_name matches.
+        rows = self._index("_name_index", self.df["display_name"].str.lower()).search(query)
+        matches = self.df.iloc[rows].drop_duplicates(subset=["league", "real_name"])
+        return list(zip(matches["real_name"], matches["player_id"], matches["league"]))
+
+    def search_ids(self, query: str) -> list[tuple[str, str, str]]:
+        """Return (real_name, player_id, league) for players whose ID contains ``query``, sorted by ID."""
+        query = query.strip().upper()
+        if not query:
+            return []
+        rows = self._index("_id_index", self.df["player_id"]).search(query)
+        matches = self.df.iloc[rows].sort_values("player_id", kind="stable")
+        return list(zip(matches["real_name"], matches["player_id"], matches["league"]))
+
+    def find(self, player_id: str) -> Optional[tuple[str, str]]:
+        """Return (display_name, league) for an exact player ID, or None."""
+        row = self._row_by_id.get(player_id)
+        if row is None:
+            return None
+        return self.df.at[row, "display_name"], self.df.at[row, "league"]
+
+
+_directories: dict[bool, tuple[tuple, LivePlayerDirectory]] = {}
+_directories_lock = threading.Lock()
+
+
+def _latest_snapshots() -> dict[str, Optional[str]]:
+    base = Path(get_csv_data()) / "current_tourney"
+    latest = {}
+    for league in leagues:
+        snaps = list_snapshots(base / league)
+        latest[league] = snaps[-1].name if snaps else None
+    return latest
+
+
+def get_live_player_directory(include_shun: bool = False) -> LivePlayerDirectory:
+    """Return the directory for the current live tourneys.
+
+    Raises:
+        ValueError: If the directory has not been generated yet
+    """
+    path = directory_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        raise ValueError("Player directory not available yet; try again later")
+
+    moderation = get_moderation_snapshot()
+    latest = _latest_snapshots()
+    key = (mtime, moderation.version, tuple(latest.items()))
+    cached = _directories.get(include_shun)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    excluded_ids = moderation.sus | moderation.banned
+    if not include_shun:
+        excluded_ids = excluded_ids | moderation.shun
+    directory = LivePlayerDirectory.from_file_frame(read_columnar_archive(path), excluded_ids, latest)
+    logger.info(f"Loaded live player directory: {len(directory):,} players")
+
+    with _directories_lock:
+        _directories[include_shun] = (key, directory)
+    return directory
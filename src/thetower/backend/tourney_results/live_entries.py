@@ -0,0 +1,109 @@
+"""Per-league index of who is in the current live tourney.
+
+``get_live_results.execute`` writes ``live_entries/{league}.npy`` next to the
+league folders whenever a snapshot lands: one record per player id of the
+snapshot, sorted by id, with a flag telling whether one of the player's
+brackets is full (at least ``FULL_BRACKET_MIN_PLAYERS`` players, as counted by
+``get_full_brackets``).  ``check_live_entry`` and ``check_all_live_entry``
+answer from it with a binary search over the memory-mapped file instead of
+reading the snapshot.
+
+An index is only used while it is at least as new as its league's staging
+folder: once snapshots are cleaned up after the tourney, or a snapshot lands
+that the index was not written for, ``lookup`` reports the league as unknown
+and the callers read the snapshot as before.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..env_config import get_csv_data
+from .constants import leagues
+from .placement_index import FULL_BRACKET_MIN_PLAYERS
+
+logger = logging.getLogger(__name__)
+
+ENTRIES_DIR = "live_entries"
+
+_cache: dict[str, tuple[int, np.ndarray]] = {}  # league -> (index mtime, records)
+_lock = threading.Lock()
+
+
+def entries_path(league: str) -> Path:
+    return Path(get_csv_data()) / ENTRIES_DIR / f"{league}.npy"
+
+
+def build_entries(df: pd.DataFrame) -> np.ndarray:
+    """Records (player_id, full) of one snapshot, sorted by player id."""
+    player_ids = df["player_id"].astype(str)
+    in_full_bracket = player_ids.groupby(df["bracket"], observed=True).transform("nunique") >= FULL_BRACKET_MIN_PLAYERS
+    # A player listed in several brackets counts as in a full bracket if any of them is.
+    full = in_full_bracket.groupby(player_ids).any()
+    width = max(int(full.index.str.len().max()), 1) if len(full) else 1
+    records = np.empty(len(full), dtype=[("player_id", f"S{width}"), ("full", "?")])
+    records["player_id"] = full.index.to_numpy(dtype=str)
+    records["full"] = full.to_numpy()
+    records.sort(order="player_id")
+    return records
+
+
+def write_entries(league: str, df: pd.DataFrame) -> None:
+    """Write the index of ``league`` for the snapshot ``df`` (``player_id`` and ``bracket`` columns)."""
+    path = entries_path(league)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as outfile:
+            np.save(outfile, build_entries(df))
+        tmp_path.replace(path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    logger.info(f"Wrote live entry index {path}")
+
+
+def _load(league: str, staging_dir: Path) -> Optional[np.ndarray]:
+    """The records of ``league``'s index, or None if it is missing or older than the staging folder."""
+    path = entries_path(league)
+    try:
+        mtime = path.stat().st_mtime_ns
+        if staging_dir.stat().st_mtime_ns > mtime:
+            return None
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        cached = _cache.get(league)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, np.load(path, mmap_mode="r"))
+            except (OSError, ValueError):
+                logger.exception(f"Failed to load live entry index {path}")
+                return None
+            _cache[league] = cached
+    return cached[1]
+
+
+def lookup(player_id: str, full_only: bool, league_names: Iterable[str] = leagues) -> dict[str, Optional[bool]]:
+    """Return {league: whether ``player_id`` is in its latest snapshot} for ``league_names``.
+
+    With ``full_only`` only full brackets count.  A league maps to None when it
+    has no up-to-date index; moderation exclusions are not applied.
+    """
+    staging_base = Path(get_csv_data()) / "current_tourney"
+    key = str(player_id).encode()
+    found: dict[str, Optional[bool]] = {}
+    for league in league_names:
+        records = _load(league, staging_base / league)
+        if records is None:
+            found[league] = None
+            continue
+        ids = records["player_id"]
+        i = int(np.searchsorted(ids, key))
+        found[league] = i < len(ids) and ids[i] == key and (bool(records["full"][i]) or not full_only)
+    return found
@@ -0,0 +1,21 @@
+"""
+Management command to rebuild the name change log.
+
+Imports record new name changes as they come in; run this after deleting
+results or editing tourney names in bulk.
+
+Usage:
+    python manage.py rebuild_name_changes
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...name_changes import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the player name change log from tourney rows"
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Done: {count:,} name changes"))
@@ -0,0 +1,22 @@
+"""
+Management command to rebuild the denormalised player summaries.
+
+Imports, repositioning and player edits keep the summaries current; run this
+once to backfill them, and after deleting results or changing which results
+are public.
+
+Usage:
+    python manage.py rebuild_player_summaries
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...player_summary import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-player summaries from tourney rows"
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Done: {count:,} player summaries"))
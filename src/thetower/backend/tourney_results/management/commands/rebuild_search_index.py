@@ -0,0 +1,24 @@
+"""
+Management command to rebuild the player search index.
+
+Imports, repositioning and player edits keep the index current; run this after
+deleting results or editing tourney rows in bulk, or if the index looks off.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...models import PlayerSearchEntry, PlayerSearchLeague
+from ...search_index import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the player search index from tourney rows and player ids"
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: {PlayerSearchEntry.objects.count():,} search entries, {PlayerSearchLeague.objects.count():,} player leagues")
+        )
@@ -0,0 +1,57 @@
+"""
+Management command to backfill or rebuild the materialised placement thresholds.
+
+New results get their thresholds during import and migration 0042 backfills
+the global cutoffs; run this once to backfill the bracket thresholds of
+existing results (they need the leaderboard files), or with --all after
+changing how thresholds are computed.
+
+Usage:
+    python manage.py rebuild_thresholds [--all] [--league Legend] [--global-only]
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from ...models import PlacementThreshold, TourneyResult
+from ...thresholds import update_global_thresholds, update_thresholds
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild per-tourney placement thresholds"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild every result (default: only results without thresholds)")
+        parser.add_argument("--league", help="Only process this league")
+        parser.add_argument("--global-only", action="store_true", help="Only rebuild the global top-N cutoffs (no CSV reads)")
+
+    def handle(self, *args, **options):
+        results = TourneyResult.objects.order_by("-date")
+        if options["league"]:
+            results = results.filter(league=options["league"])
+        if not options["all"]:
+            kind = PlacementThreshold.GLOBAL if options["global_only"] else PlacementThreshold.BRACKET
+            results = results.exclude(Exists(PlacementThreshold.objects.filter(result=OuterRef("pk"), kind=kind)))
+
+        total = results.count()
+        self.stdout.write(f"Rebuilding thresholds for {total} results")
+
+        failed = 0
+        for i, result in enumerate(results.iterator(), start=1):
+            try:
+                if options["global_only"]:
+                    update_global_thresholds(result)
+                else:
+                    update_thresholds(result)
+            except Exception as e:
+                failed += 1
+                logger.exception(f"Failed to rebuild thresholds for {result}")
+                self.stdout.write(self.style.ERROR(f"{result}: {e}"))
+            if i % 50 == 0:
+                self.stdout.write(f"  {i}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total - failed} rebuilt, {failed} failed"))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same cutoffs as thresholds.GLOBAL_PLACES.
+GLOBAL_PLACES = (1, 10, 25, 50, 100, 200, 250, 400, 500, 600, 750, 800, 1000, 1500, 2000, 2500, 3000, 4000, 5000, 7500, 10000, 15000, 20000, 25000)
+
+# Same values as thresholds.global_place_waves(): the wave of the N-th ranked player.
+RANKED_WAVES_SQL = f"""
+SELECT result_id, n, wave FROM (
+    SELECT result_id, wave, ROW_NUMBER() OVER (PARTITION BY result_id ORDER BY wave DESC) AS n
+    FROM tourney_results_tourneyrow WHERE position > 0
+)
+WHERE n IN ({", ".join(str(place) for place in GLOBAL_PLACES)})
+"""
+
+
+def populate_global(apps, schema_editor):
+    """Fill the global cutoffs; the bracket ones need the leaderboard files (``rebuild_thresholds``)."""
+    TourneyResult = apps.get_model("tourney_results", "TourneyResult")
+    PlacementThreshold = apps.get_model("tourney_results", "PlacementThreshold")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(RANKED_WAVES_SQL)
+        waves = {(result_id, place): wave for result_id, place, wave in cursor.fetchall()}
+
+    PlacementThreshold.objects.bulk_create(
+        (
+            PlacementThreshold(result_id=result_id, kind="global", place=place, wave=waves.get((result_id, place)))
+            for result_id in TourneyResult.objects.values_list("id", flat=True).iterator()
+            for place in GLOBAL_PLACES
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tourney_results", "0041_add_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlacementThreshold",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("bracket", "Median over full brackets of the wave at a bracket place"),
+                            ("global", "Wave of the player at a global top-N place"),
+                        ],
+                        help_text="What the place refers to",
+                        max_length=8,
+                    ),
+                ),
+                ("place", models.IntegerField(help_text="Bracket place or global top-N cutoff")),
+                ("wave", models.IntegerField(blank=True, help_text="Wave at that place, empty if nobody reached it", null=True)),
+                (
+                    "result",
+                    models.ForeignKey(
+                        help_text="Tourney",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="thresholds",
+                        to="tourney_results.tourneyresult",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("result", "kind", "place"), name="uniq_threshold_result_kind_place")],
+            },
+        ),
+        migrations.RunPython(populate_global, reverse_code=migrations.RunPython.noop),
+    ]
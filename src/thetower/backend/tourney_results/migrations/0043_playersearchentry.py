@@ -0,0 +1,101 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:37
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# External-content FTS5 table over PlayerSearchEntry; the trigram tokenizer answers
+# case-insensitive LIKE '%...%' queries from the index instead of scanning.
+FTS_SQL = [
+    "CREATE VIRTUAL TABLE tourney_results_playersearchentry_fts USING fts5("
+    "player_id, name, content='tourney_results_playersearchentry', content_rowid='id', tokenize='trigram');",
+    "CREATE TRIGGER tourney_results_playersearchentry_ai AFTER INSERT ON tourney_results_playersearchentry BEGIN "
+    "INSERT INTO tourney_results_playersearchentry_fts (rowid, player_id, name) VALUES (new.id, new.player_id, new.name); END;",
+    "CREATE TRIGGER tourney_results_playersearchentry_ad AFTER DELETE ON tourney_results_playersearchentry BEGIN "
+    "INSERT INTO tourney_results_playersearchentry_fts (tourney_results_playersearchentry_fts, rowid, player_id, name) "
+    "VALUES ('delete', old.id, old.player_id, old.name); END;",
+    "CREATE TRIGGER tourney_results_playersearchentry_au AFTER UPDATE ON tourney_results_playersearchentry BEGIN "
+    "INSERT INTO tourney_results_playersearchentry_fts (tourney_results_playersearchentry_fts, rowid, player_id, name) "
+    "VALUES ('delete', old.id, old.player_id, old.name); "
+    "INSERT INTO tourney_results_playersearchentry_fts (rowid, player_id, name) VALUES (new.id, new.player_id, new.name); END;",
+]
+
+FTS_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS tourney_results_playersearchentry_au;",
+    "DROP TRIGGER IF EXISTS tourney_results_playersearchentry_ad;",
+    "DROP TRIGGER IF EXISTS tourney_results_playersearchentry_ai;",
+    "DROP TABLE IF EXISTS tourney_results_playersearchentry_fts;",
+]
+
+# Same contents as search_index.rebuild(); 25000 is how_many_results_public_site.
+POPULATE_SQL = [
+    "INSERT OR IGNORE INTO tourney_results_playersearchentry (player_id, name, kind) "
+    "SELECT DISTINCT player_id, nickname, 'nick' FROM tourney_results_tourneyrow WHERE position <= 25000 AND nickname != '';",
+    "INSERT OR IGNORE INTO tourney_results_playersearchentry (player_id, name, kind) "
+    "SELECT p.id, COALESCE(k.name, d.name), 'known' FROM sus_playerid p "
+    "LEFT JOIN sus_gameinstance g ON g.id = p.game_instance_id "
+    "LEFT JOIN sus_knownplayer k ON k.id = g.player_id "
+    "LEFT JOIN sus_knownplayer d ON d.id = p.player_id "
+    "WHERE p.\"primary\" AND COALESCE(k.name, d.name) != '';",
+    "INSERT OR IGNORE INTO tourney_results_playersearchleague (player_id, league) "
+    "SELECT DISTINCT r.player_id, t.league FROM tourney_results_tourneyrow r "
+    "JOIN tourney_results_tourneyresult t ON t.id = r.result_id WHERE r.position <= 25000;",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tourney_results", "0042_placementthreshold"),
+        ("sus", "0031_add_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerSearchEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("player_id", models.CharField(help_text="Player id from The Tower", max_length=32)),
+                ("name", models.CharField(help_text="Tourney name or known player name", max_length=100)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("nick", "Tourney name the id was listed under"), ("known", "Known player name of a primary id")],
+                        help_text="Where the name comes from",
+                        max_length=8,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "player search entries",
+                "indexes": [models.Index(models.F("kind"), django.db.models.functions.text.Upper("name"), name="idx_search_entry_kind_name")],
+                "constraints": [models.UniqueConstraint(fields=("player_id", "kind", "name"), name="uniq_search_entry_player_kind_name")],
+            },
+        ),
+        migrations.CreateModel(
+            name="PlayerSearchLeague",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("player_id", models.CharField(help_text="Player id from The Tower", max_length=32)),
+                (
+                    "league",
+                    models.CharField(
+                        choices=[
+                            ("Legend", "Legend"),
+                            ("Champion", "Champion"),
+                            ("Platinum", "Platinum"),
+                            ("Gold", "Gold"),
+                            ("Silver", "Silver"),
+                            ("Copper", "Copper"),
+                        ],
+                        help_text="League",
+                        max_length=16,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("player_id", "league"), name="uniq_search_league_player_league")],
+            },
+        ),
+        migrations.RunSQL(sql=FTS_SQL, reverse_sql=FTS_REVERSE_SQL),
+        migrations.RunSQL(sql=POPULATE_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:45
+
+import datetime
+import json
+
+from django.db import migrations, models
+
+# Same aggregation as player_summary.rebuild(); 25000 is how_many_results_public_site.
+AGGREGATE_SQL = """
+SELECT COALESCE(pp.id, r.player_id) AS player_key,
+       json_group_array(DISTINCT r.nickname),
+       json_group_array(DISTINCT t.league),
+       COUNT(DISTINCT r.result_id),
+       MAX(r.wave),
+       MIN(CASE WHEN r.position > 0 THEN r.position END),
+       MIN(t.date),
+       MAX(t.date || '|' || t.league || '|' || r.nickname)
+FROM tourney_results_tourneyrow r
+JOIN tourney_results_tourneyresult t ON t.id = r.result_id
+LEFT JOIN sus_playerid p ON p.id = r.player_id
+LEFT JOIN sus_gameinstance g ON g.id = p.game_instance_id
+LEFT JOIN sus_knownplayer k ON k.id = g.player_id AND k.approved
+LEFT JOIN (SELECT game_instance_id, MIN(id) AS id FROM sus_playerid WHERE "primary" GROUP BY game_instance_id) pp
+    ON pp.game_instance_id = g.id AND k.id IS NOT NULL
+WHERE t.public AND r.position <= 25000
+GROUP BY player_key
+"""
+
+LEAGUE_ORDER = {league: i for i, league in enumerate(["Legend", "Champion", "Platinum", "Gold", "Silver", "Copper"])}
+
+
+def populate(apps, schema_editor):
+    PlayerSummary = apps.get_model("tourney_results", "PlayerSummary")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(AGGREGATE_SQL)
+        rows = cursor.fetchall()
+
+    summaries = []
+    for key, nicknames, played_leagues, count, best_wave, best_position, first_seen, last in rows:
+        last_seen, last_league, last_nickname = last.split("|", 2)
+        summaries.append(
+            PlayerSummary(
+                player_id=key,
+                nicknames=sorted(set(json.loads(nicknames)), key=lambda name: (name.lower(), name)),
+                leagues=sorted(set(json.loads(played_leagues)), key=lambda league: (LEAGUE_ORDER.get(league, len(LEAGUE_ORDER)), league)),
+                tourney_count=count,
+                best_wave=best_wave,
+                best_position=best_position,
+                first_seen=datetime.date.fromisoformat(str(first_seen)),
+                last_seen=datetime.date.fromisoformat(last_seen),
+                last_nickname=last_nickname,
+                last_league=last_league,
+            )
+        )
+    PlayerSummary.objects.bulk_create(summaries, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tourney_results", "0043_playersearchentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerSummary",
+            fields=[
+                (
+                    "player_id",
+                    models.CharField(
+                        help_text="Primary player id (or the id itself if not linked to a known player)",
+                        max_length=32,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("nicknames", models.JSONField(default=list, help_text="Distinct tourney names used")),
+                ("leagues", models.JSONField(default=list, help_text="Leagues played in, highest first")),
+                ("tourney_count", models.IntegerField(default=0, help_text="Number of tourneys played")),
+                ("best_wave", models.IntegerField(default=0, help_text="Highest wave reached")),
+                ("best_position", models.IntegerField(blank=True, help_text="Best position reached, empty if never ranked", null=True)),
+                ("first_seen", models.DateField(help_text="Date of the first tourney played")),
+                ("last_seen", models.DateField(help_text="Date of the last tourney played")),
+                ("last_nickname", models.CharField(help_text="Tourney name in the last tourney played", max_length=32)),
+                (
+                    "last_league",
+                    models.CharField(
+                        choices=[
+                            ("Legend", "Legend"),
+                            ("Champion", "Champion"),
+                            ("Platinum", "Platinum"),
+                            ("Gold", "Gold"),
+                            ("Silver", "Silver"),
+                            ("Copper", "Copper"),
+                        ],
+                        help_text="League of the last tourney played",
+                        max_length=16,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "player summaries",
+            },
+        ),
+        migrations.RunPython(populate, reverse_code=migrations.RunPython.noop),
+    ]
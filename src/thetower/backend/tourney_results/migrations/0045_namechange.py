@@ -0,0 +1,51 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same statement as name_changes.rebuild().
+POPULATE_SQL = """
+INSERT INTO tourney_results_namechange (player_id, old_nickname, new_nickname, result_id)
+SELECT player_id, previous, nickname, result_id FROM (
+    SELECT r.player_id, r.nickname, r.result_id,
+           LAG(r.nickname) OVER (PARTITION BY r.player_id ORDER BY t.date, r.result_id) AS previous
+    FROM (
+        -- One row per id and tourney (an id can be listed twice); SQLite takes the nickname of its best position.
+        SELECT player_id, result_id, nickname, MIN(position) FROM tourney_results_tourneyrow GROUP BY player_id, result_id
+    ) r
+    JOIN tourney_results_tourneyresult t ON t.id = r.result_id
+)
+WHERE previous IS NOT NULL AND previous != nickname
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tourney_results", "0044_playersummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NameChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("player_id", models.CharField(db_index=True, help_text="Player id from The Tower", max_length=32)),
+                ("old_nickname", models.CharField(help_text="Tourney name in the previous tourney", max_length=32)),
+                ("new_nickname", models.CharField(help_text="Tourney name in this tourney", max_length=32)),
+                (
+                    "result",
+                    models.ForeignKey(
+                        help_text="First tourney under the new name",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_changes",
+                        to="tourney_results.tourneyresult",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("result", "player_id"), name="uniq_name_change_result_player")],
+            },
+        ),
+        migrations.RunSQL(sql=POPULATE_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.12 on 2026-10-16 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tourney_results", "0045_namechange"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tourneyrow",
+            index=models.Index(fields=["result", "position"], name="idx_row_result_position"),
+        ),
+        migrations.AddIndex(
+            model_name="tourneyrow",
+            index=models.Index(fields=["player_id", "result"], name="idx_row_player_result"),
+        ),
+        migrations.AddIndex(
+            model_name="tourneyrow",
+            index=models.Index(fields=["result", "wave"], name="idx_row_result_wave"),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from colorfield.fields import ColorField
 from django.core.cache import cache
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
 
@@ -204,6 +205,127 @@ class TourneyRow(models.Model):
 
     class Meta:
         ordering = ["-result__date", "position"]
+        indexes = [
+            # Leaderboard slices of a tourney: result plus a position range
+            models.Index(fields=["result", "position"], name="idx_row_result_position"),
+            # Player and comparison pages: all rows of a set of ids, joined to their results
+            models.Index(fields=["player_id", "result"], name="idx_row_player_result"),
+            # Waves of a tourney in order (global thresholds, static placement)
+            models.Index(fields=["result", "wave"], name="idx_row_result_wave"),
+        ]
+
+
+class PlacementThreshold(models.Model):
+    """Wave at a given place of a tourney, materialised by ``tourney_results.thresholds``."""
+
+    BRACKET = "bracket"
+    GLOBAL = "global"
+    KIND_CHOICES = [
+        (BRACKET, "Median over full brackets of the wave at a bracket place"),
+        (GLOBAL, "Wave of the player at a global top-N place"),
+    ]
+
+    result = models.ForeignKey(TourneyResult, null=False, blank=False, related_name="thresholds", on_delete=models.CASCADE, help_text="Tourney")
+    kind = models.CharField(max_length=8, null=False, blank=False, choices=KIND_CHOICES, help_text="What the place refers to")
+    place = models.IntegerField(null=False, blank=False, help_text="Bracket place or global top-N cutoff")
+    wave = models.IntegerField(null=True, blank=True, help_text="Wave at that place, empty if nobody reached it")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["result", "kind", "place"], name="uniq_threshold_result_kind_place"),
+        ]
+
+    def __str__(self):
+        return f"{self.result} {self.kind} #{self.place}: {self.wave}"
+
+
+class PlayerSearchEntry(models.Model):
+    """Distinct (player id, name) pair searched by the player search, maintained by ``tourney_results.search_index``.
+
+    Each entry is also indexed by the ``tourney_results_playersearchentry_fts`` FTS5
+    trigram table (created and kept in sync by triggers in migration 0043).
+    """
+
+    NICKNAME = "nick"
+    KNOWN = "known"
+    KIND_CHOICES = [
+        (NICKNAME, "Tourney name the id was listed under"),
+        (KNOWN, "Known player name of a primary id"),
+    ]
+
+    player_id = models.CharField(max_length=32, null=False, blank=False, help_text="Player id from The Tower")
+    name = models.CharField(max_length=100, null=False, blank=False, help_text="Tourney name or known player name")
+    kind = models.CharField(max_length=8, null=False, blank=False, choices=KIND_CHOICES, help_text="Where the name comes from")
+
+    class Meta:
+        verbose_name_plural = "player search entries"
+        constraints = [
+            models.UniqueConstraint(fields=["player_id", "kind", "name"], name="uniq_search_entry_player_kind_name"),
+        ]
+        indexes = [
+            models.Index("kind", Upper("name"), name="idx_search_entry_kind_name"),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} {self.kind}: {self.name}"
+
+
+class PlayerSearchLeague(models.Model):
+    """League a player id has a public result in, maintained by ``tourney_results.search_index``."""
+
+    player_id = models.CharField(max_length=32, null=False, blank=False, help_text="Player id from The Tower")
+    league = models.CharField(max_length=16, null=False, blank=False, choices=leagues_choices, help_text="League")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["player_id", "league"], name="uniq_search_league_player_league"),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} {self.league}"
+
+
+class PlayerSummary(models.Model):
+    """Headline facts of one player over their public results, maintained by ``tourney_results.player_summary``."""
+
+    player_id = models.CharField(max_length=32, primary_key=True, help_text="Primary player id (or the id itself if not linked to a known player)")
+    nicknames = models.JSONField(default=list, help_text="Distinct tourney names used")
+    leagues = models.JSONField(default=list, help_text="Leagues played in, highest first")
+    tourney_count = models.IntegerField(default=0, help_text="Number of tourneys played")
+    best_wave = models.IntegerField(default=0, help_text="Highest wave reached")
+    best_position = models.IntegerField(null=True, blank=True, help_text="Best position reached, empty if never ranked")
+    first_seen = models.DateField(help_text="Date of the first tourney played")
+    last_seen = models.DateField(help_text="Date of the last tourney played")
+    last_nickname = models.CharField(max_length=32, help_text="Tourney name in the last tourney played")
+    last_league = models.CharField(max_length=16, choices=leagues_choices, help_text="League of the last tourney played")
+
+    class Meta:
+        verbose_name_plural = "player summaries"
+
+    def __str__(self):
+        return f"{self.player_id} {self.last_nickname}"
+
+
+class NameChange(models.Model):
+    """A player id showing up under a different tourney name than in its previous tourney.
+
+    Maintained by ``tourney_results.name_changes``.
+    """
+
+    player_id = models.CharField(max_length=32, null=False, blank=False, db_index=True, help_text="Player id from The Tower")
+    old_nickname = models.CharField(max_length=32, null=False, blank=False, help_text="Tourney name in the previous tourney")
+    new_nickname = models.CharField(max_length=32, null=False, blank=False, help_text="Tourney name in this tourney")
+    result = models.ForeignKey(
+        TourneyResult, null=False, blank=False, related_name="name_changes", on_delete=models.CASCADE, help_text="First tourney under the new name"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["result", "player_id"], name="uniq_name_change_result_player"),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id}: {self.old_nickname} -> {self.new_nickname}"
 
 
 class Avatar(models.Model):
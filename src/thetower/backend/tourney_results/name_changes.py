@@ -0,0 +1,220 @@
+"""Log of player name changes, kept in ``NameChange``.
+
+A player id gets an event whenever it shows up in a tourney under a different
+tourney name than in its previous tourney (any league; tourneys are ordered by
+date, then by result id).  ``create_tourney_rows`` records the events of each
+imported result: the previous tourney of most ids is among the last few dates,
+so those are read in one go and only the remaining ids are looked up
+individually.  Importing an older result between two existing ones also fixes
+up the events of the following tourney.
+
+Deleting results is not tracked; ``python manage.py rebuild_name_changes``
+recreates the log (migration 0045 populates it initially).
+
+The namechangers page reads the log through ``namechangers`` and
+``recent_changes``, one page at a time.  Moderated players are excluded in SQL
+against the active ``ModerationRecord`` rows (the same ones
+``get_moderation_snapshot`` expands), so the query size does not grow with the
+moderation list.
+"""
+
+import logging
+from typing import Optional, Sequence
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import NameChange, TourneyResult, TourneyRow
+
+logger = logging.getLogger(__name__)
+
+_BATCH = 5000
+# How many of the latest tourney dates before a result are searched for its players' previous rows in bulk.
+_RECENT_DATES = 4
+
+# Same statement as migration 0045.
+_REBUILD_SQL = """
+INSERT INTO tourney_results_namechange (player_id, old_nickname, new_nickname, result_id)
+SELECT player_id, previous, nickname, result_id FROM (
+    SELECT r.player_id, r.nickname, r.result_id,
+           LAG(r.nickname) OVER (PARTITION BY r.player_id ORDER BY t.date, r.result_id) AS previous
+    FROM (
+        -- One row per id and tourney (an id can be listed twice); SQLite takes the nickname of its best position.
+        SELECT player_id, result_id, nickname, MIN(position) FROM tourney_results_tourneyrow GROUP BY player_id, result_id
+    ) r
+    JOIN tourney_results_tourneyresult t ON t.id = r.result_id
+)
+WHERE previous IS NOT NULL AND previous != nickname
+"""
+
+
+def _placeholders(items: Sequence) -> str:
+    return ", ".join(["%s"] * len(items))
+
+
+def _neighbours(result: TourneyResult, player_ids: list[str], later: bool) -> dict[str, tuple[str, int]]:
+    """Return {id: (nickname, result id)} of each id's closest row before (or after, if ``later``) ``result``."""
+    lookup, order = ("gt", "") if later else ("lt", "-")
+    results = TourneyResult.objects.filter(Q(**{f"date__{lookup}": result.date}) | Q(date=result.date, **{f"id__{lookup}": result.pk}))
+    dates = list(results.order_by(f"{order}date").values_list("date", flat=True).distinct()[:_RECENT_DATES])
+    if not dates:
+        return {}
+
+    # Any row in the nearest dates is closer than every row outside them.
+    cutoff = dates[-1]
+    window = results.filter(**{f"date__{'lte' if later else 'gte'}": cutoff})
+    rank = {result_id: (date, result_id) for result_id, date in window.values_list("id", "date")}
+    pick = min if later else max
+
+    found: dict[str, tuple[str, int]] = {}
+    for start in range(0, len(player_ids), _BATCH):
+        chunk = player_ids[start : start + _BATCH]
+        rows = TourneyRow.objects.filter(result_id__in=list(rank), player_id__in=chunk).values_list("player_id", "nickname", "result_id")
+        for player_id, nickname, result_id in rows:
+            current = found.get(player_id)
+            if current is None or pick(rank[result_id], rank[current[1]]) == rank[result_id]:
+                found[player_id] = (nickname, result_id)
+
+    # Ids not seen lately: look up their closest row beyond the window individually.
+    missing = [player_id for player_id in player_ids if player_id not in found]
+    bound = "t.date > %s" if later else "t.date < %s"
+    aggregate = "MIN" if later else "MAX"
+    for start in range(0, len(missing), _BATCH):
+        chunk = missing[start : start + _BATCH]
+        with connection.cursor() as cursor:
+            # SQLite takes the bare columns from the row holding the MIN/MAX.
+            cursor.execute(
+                f"SELECT r.player_id, r.nickname, r.result_id, {aggregate}(t.date || printf('|%%012d', r.result_id)) "
+                "FROM tourney_results_tourneyrow r JOIN tourney_results_tourneyresult t ON t.id = r.result_id "
+                f"WHERE r.player_id IN ({_placeholders(chunk)}) AND {bound} GROUP BY r.player_id",
+                [*chunk, cutoff.isoformat()],
+            )
+            for player_id, nickname, result_id, _ in cursor.fetchall():
+                found[player_id] = (nickname, result_id)
+    return found
+
+
+def record_result(result: TourneyResult) -> int:
+    """Record the name changes of a newly imported result; returns how many events were added."""
+    nicknames: dict[str, str] = {}
+    for player_id, nickname in result.rows.values_list("player_id", "nickname"):
+        nicknames.setdefault(player_id, nickname)
+    player_ids = list(nicknames)
+
+    events = [
+        NameChange(player_id=player_id, old_nickname=previous, new_nickname=nicknames[player_id], result=result)
+        for player_id, (previous, _) in _neighbours(result, player_ids, later=False).items()
+        if previous != nicknames[player_id]
+    ]
+
+    following = {}
+    if TourneyResult.objects.filter(date__gte=result.date).exclude(pk=result.pk).exists():
+        # An older tourney imported late sits between existing ones: the next tourney's events now compare against it.
+        following = _neighbours(result, player_ids, later=True)
+
+    with transaction.atomic():
+        by_result: dict[int, list[str]] = {}
+        for player_id, (_, result_id) in following.items():
+            by_result.setdefault(result_id, []).append(player_id)
+        for result_id, ids in by_result.items():
+            for start in range(0, len(ids), _BATCH):
+                NameChange.objects.filter(result_id=result_id, player_id__in=ids[start : start + _BATCH]).delete()
+        events += [
+            NameChange(player_id=player_id, old_nickname=nicknames[player_id], new_nickname=nickname, result_id=result_id)
+            for player_id, (nickname, result_id) in following.items()
+            if nickname != nicknames[player_id]
+        ]
+        NameChange.objects.bulk_create(events, ignore_conflicts=True)
+    return len(events)
+
+
+def rebuild() -> int:
+    """Recreate the whole log from ``TourneyRow``; returns the number of events."""
+    with transaction.atomic():
+        NameChange.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(_REBUILD_SQL)
+    count = NameChange.objects.count()
+    logger.info(f"Rebuilt name change log: {count:,} events")
+    return count
+
+
+def _filters(leagues: Sequence[str], excluded_types: Sequence[str]) -> tuple[str, list]:
+    """WHERE clause for ``leagues`` without players under active ``excluded_types`` moderation.
+
+    Expects ``e`` (the event) and ``p`` (its ``sus_playerid`` row, possibly
+    LEFT JOINed) in scope; a record flags either the tower id alone or every id
+    of its game instance.
+    """
+    where = f"t.league IN ({_placeholders(leagues)})"
+    if not excluded_types:
+        return where, list(leagues)
+    types = _placeholders(excluded_types)
+    where += f"""
+        AND NOT EXISTS (SELECT 1 FROM sus_moderationrecord m
+                        WHERE m.tower_id = e.player_id AND m.game_instance_id IS NULL
+                          AND m.moderation_type IN ({types}) AND m.resolved_at IS NULL)
+        AND NOT EXISTS (SELECT 1 FROM sus_moderationrecord m
+                        WHERE m.game_instance_id = p.game_instance_id
+                          AND m.moderation_type IN ({types}) AND m.resolved_at IS NULL)"""
+    return where, [*leagues, *excluded_types, *excluded_types]
+
+
+def _page(sql: str, params: list, offset: int, limit: int) -> tuple[int, list[tuple]]:
+    """Run ``sql`` (whose last column is ``COUNT(*) OVER ()``) for one page; returns (total rows, page rows)."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} LIMIT %s OFFSET %s", [*params, limit, offset])
+        rows = cursor.fetchall()
+    if not rows:
+        return (_page(sql, params, 0, 1)[0] if offset else 0), []
+    return rows[0][-1], [row[:-1] for row in rows]
+
+
+def namechangers(
+    leagues: Sequence[str], excluded_types: Sequence[str], offset: int, limit: int
+) -> tuple[int, list[tuple[str, Optional[str], int, str]]]:
+    """Known players by number of name changes in ``leagues``, most first.
+
+    Name changes of ids under active ``excluded_types`` moderation are not counted.
+
+    Returns (total players, [(real name, primary id, name changes, date of the last change)]).
+    """
+    where, params = _filters(leagues, excluded_types)
+    sql = f"""
+        SELECT real_name, primary_id, changes, last_change, COUNT(*) OVER () FROM (
+            SELECT k.name AS real_name, COUNT(*) AS changes, MAX(t.date) AS last_change,
+                   (SELECT MIN(pp.id) FROM sus_playerid pp JOIN sus_gameinstance gg ON gg.id = pp.game_instance_id
+                    WHERE gg.player_id = k.id AND pp."primary") AS primary_id
+            FROM tourney_results_namechange e
+            JOIN tourney_results_tourneyresult t ON t.id = e.result_id
+            JOIN sus_playerid p ON p.id = e.player_id
+            JOIN sus_gameinstance g ON g.id = p.game_instance_id
+            JOIN sus_knownplayer k ON k.id = g.player_id
+            WHERE {where}
+            GROUP BY k.id
+        )
+        WHERE primary_id IS NOT NULL
+        ORDER BY changes DESC, real_name
+    """
+    return _page(sql, params, offset, limit)
+
+
+def recent_changes(
+    leagues: Sequence[str], excluded_types: Sequence[str], offset: int, limit: int
+) -> tuple[int, list[tuple[str, str, str, Optional[str], str, str]]]:
+    """Name changes in ``leagues`` of ids not under active ``excluded_types`` moderation, newest first.
+
+    Returns (total events, [(date, league, player id, real name or None, old name, new name)]).
+    """
+    where, params = _filters(leagues, excluded_types)
+    sql = f"""
+        SELECT t.date, t.league, e.player_id, k.name, e.old_nickname, e.new_nickname, COUNT(*) OVER ()
+        FROM tourney_results_namechange e
+        JOIN tourney_results_tourneyresult t ON t.id = e.result_id
+        LEFT JOIN sus_playerid p ON p.id = e.player_id
+        LEFT JOIN sus_gameinstance g ON g.id = p.game_instance_id
+        LEFT JOIN sus_knownplayer k ON k.id = g.player_id
+        WHERE {where}
+        ORDER BY t.date DESC, e.result_id DESC, e.player_id
+    """
+    return _page(sql, params, offset, limit)
@@ -0,0 +1,215 @@
+"""On-disk layout of the per-tourney live placement cache.
+
+Each tourney of a league has, in ``{league}_live/``:
+
+- ``{date}_placement_cache.json`` — small manifest written once per generator
+  run: schema, include_shun, the snapshot the cache reflects, quantile data and
+  counters.  Readers probe for this file.
+- ``{date}_placement_brackets.log`` — append-only bracket first-seen log.  Every
+  processed snapshot appends one block: a ``<bracket>\\t<iso time>`` line per
+  bracket not seen before, then a ``@<snapshot path>\\t<iso time>`` marker.  A
+  block without its marker (interrupted write) is ignored, which also makes the
+  marker the generator's resume point.
+- ``{date}_placement_players.col`` — player index of the latest snapshot
+  (player_id, real_name, highest_wave, bracket).
+- ``{date}_placement_waves.col`` — ``BracketWaveIndex`` of the latest snapshot.
+
+The ``.col`` sections use the memory-mappable columnar layout of
+``archive_utils.write_columnar_archive``.
+
+Readers go through ``get_placement_cache``: one ``PlacementCacheReader`` per
+cache and process parses each section on first use and keeps it until that
+section's file changes, so the live pages share a single parse per snapshot.
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from .archive_utils import read_columnar_archive, write_columnar_archive
+from .placement_index import BracketWaveIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk structure changes; older caches are regenerated from scratch.
+# v2 introduced quantile_data, v3 the wave index, v4 the sectioned layout.
+SCHEMA_VERSION = 4
+
+MANIFEST_SUFFIX = "_placement_cache.json"
+SECTION_SUFFIXES = {
+    "brackets": "_placement_brackets.log",
+    "players": "_placement_players.col",
+    "waves": "_placement_waves.col",
+}
+
+
+def manifest_path(cache_dir: Path, tourney_date: str) -> Path:
+    return cache_dir / f"{tourney_date}{MANIFEST_SUFFIX}"
+
+
+def section_path(manifest: Path, section: str) -> Path:
+    """Return the path of ``section`` ("brackets", "players" or "waves") next to ``manifest``."""
+    return manifest.with_name(manifest.name[: -len(MANIFEST_SUFFIX)] + SECTION_SUFFIXES[section])
+
+
+def remove_sections(manifest: Path) -> None:
+    """Delete every section file of the cache (the manifest is left alone)."""
+    for section in SECTION_SUFFIXES:
+        try:
+            section_path(manifest, section).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def read_manifest(manifest: Path) -> Optional[dict]:
+    try:
+        return json.loads(manifest.read_text(encoding="utf8"))
+    except FileNotFoundError:
+        return None
+
+
+# ── bracket first-seen log ───────────────────────────────────────────────────
+
+
+def append_bracket_log(path: Path, snapshot: str, snap_time: str, new_brackets) -> None:
+    """Append one snapshot's newly seen brackets plus its marker in a single write."""
+    block = "".join(f"{bracket}\t{snap_time}\n" for bracket in new_brackets) + f"@{snapshot}\t{snap_time}\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf8") as f:
+        f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_bracket_log(path: Path) -> tuple[dict[str, str], Optional[str]]:
+    """Return ({bracket: first-seen iso time}, last fully logged snapshot path)."""
+    try:
+        text = path.read_text(encoding="utf8")
+    except FileNotFoundError:
+        return {}, None
+
+    times: dict[str, str] = {}
+    pending: list[tuple[str, str]] = []
+    last_snapshot = None
+    for line in text.splitlines():
+        name, _, snap_time = line.partition("\t")
+        if not snap_time:
+            continue  # torn line
+        if name.startswith("@"):
+            for bracket, first_seen in pending:
+                times.setdefault(bracket, first_seen)
+            pending = []
+            last_snapshot = name[1:]
+        else:
+            pending.append((name, snap_time))
+    return times, last_snapshot
+
+
+# ── columnar sections ────────────────────────────────────────────────────────
+
+
+def write_players(path: Path, players: pd.DataFrame) -> None:
+    write_columnar_archive(players[["player_id", "real_name", "highest_wave", "bracket"]].reset_index(drop=True), path)
+
+
+def read_players(path: Path) -> pd.DataFrame:
+    return read_columnar_archive(path)
+
+
+def write_wave_index(path: Path, index: BracketWaveIndex) -> None:
+    write_columnar_archive(index.to_frame(), path)
+
+
+def read_wave_index(path: Path) -> BracketWaveIndex:
+    return BracketWaveIndex.from_frame(read_columnar_archive(path))
+
+
+# ── reader ───────────────────────────────────────────────────────────────────
+
+
+class PlacementCacheReader:
+    """Lazily parsed sections of one tourney's placement cache.
+
+    Each accessor parses its section on first use and keeps the result until the
+    section file's mtime changes.  Accessors return None (or an empty value) when
+    the section does not exist.
+    """
+
+    def __init__(self, manifest: Path):
+        self.manifest_file = manifest
+        self.tourney_date = manifest.name[: -len(MANIFEST_SUFFIX)]
+        self._sections: dict[str, tuple[int, object]] = {}
+        self._lock = threading.Lock()
+
+    def _section(self, name: str, path: Path, load: Callable[[Path], object]):
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._sections.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # A concurrent write may land between stat and load; the next call then sees a new mtime and reloads.
+        value = load(path)
+        with self._lock:
+            self._sections[name] = (mtime, value)
+        return value
+
+    def manifest(self) -> Optional[dict]:
+        return self._section("manifest", self.manifest_file, read_manifest)
+
+    def snapshot_name(self) -> Optional[str]:
+        """File name of the snapshot the cache was generated from."""
+        snapshot = (self.manifest() or {}).get("snapshot_iso")
+        return Path(snapshot).name if snapshot else None
+
+    def is_current(self, latest_snapshot: Path) -> bool:
+        """True if the cache reflects ``latest_snapshot`` and has the current layout."""
+        manifest = self.manifest() or {}
+        return manifest.get("schema_version", 1) >= SCHEMA_VERSION and self.snapshot_name() == latest_snapshot.name
+
+    def quantile_data(self) -> dict:
+        return (self.manifest() or {}).get("quantile_data") or {}
+
+    def bracket_times(self) -> dict[str, datetime.datetime]:
+        """{bracket: first-seen time}, from the bracket log."""
+
+        def load(path: Path) -> dict[str, datetime.datetime]:
+            times, _ = read_bracket_log(path)
+            return {bracket: datetime.datetime.fromisoformat(ts) for bracket, ts in times.items()}
+
+        return self._section("brackets", section_path(self.manifest_file, "brackets"), load) or {}
+
+    def players(self) -> Optional[pd.DataFrame]:
+        return self._section("players", section_path(self.manifest_file, "players"), read_players)
+
+    def wave_index(self) -> Optional[BracketWaveIndex]:
+        return self._section("waves", section_path(self.manifest_file, "waves"), read_wave_index)
+
+
+_readers: dict[Path, PlacementCacheReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_placement_cache(cache_dir: Path, latest_snapshot_time: datetime.datetime) -> Optional[PlacementCacheReader]:
+    """Return the reader of the cache covering a snapshot taken at ``latest_snapshot_time``, or None.
+
+    Caches are keyed by tourney start date and snapshots can cross midnight, so
+    only that day and the day before are tried (a 2-day lookback window).
+    """
+    for delta in range(0, 2):
+        manifest = manifest_path(cache_dir, (latest_snapshot_time.date() - datetime.timedelta(days=delta)).isoformat())
+        if manifest.exists():
+            with _readers_lock:
+                # One reader per league folder: a new tourney's cache replaces the previous one.
+                reader = _readers.get(cache_dir)
+                if reader is None or reader.manifest_file != manifest:
+                    reader = _readers[cache_dir] = PlacementCacheReader(manifest)
+            return reader
+    return None
@@ -0,0 +1,98 @@
+"""Per-bracket sorted wave index for "where would this wave place" queries.
+
+One snapshot of a league is stored CSR-style: a single concatenated array of
+waves, sorted ascending inside each bracket, with ``offsets[i]:offsets[i + 1]``
+delimiting bracket ``i``.  Shifting every wave by ``i * stride`` makes the whole
+array globally sorted, so the above/equal counts of one wave in every bracket
+come out of a single ``np.searchsorted`` call.
+
+``generate_placement_cache`` persists the index of the latest snapshot into the
+placement cache; the live placement page loads it from there and only applies
+the current moderation exclusions before querying.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Brackets with fewer players than this are still filling up and are left out of placement analysis.
+FULL_BRACKET_MIN_PLAYERS = 28
+
+
+class BracketWaveIndex:
+    """Waves of one snapshot grouped by bracket, sorted ascending within each bracket."""
+
+    def __init__(self, brackets: np.ndarray, offsets: np.ndarray, waves: np.ndarray, player_ids: np.ndarray):
+        self.brackets = np.asarray(brackets, dtype=object)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.waves = np.asarray(waves, dtype=np.int64)
+        self.player_ids = np.asarray(player_ids, dtype=object)
+
+        self.counts = np.diff(self.offsets)
+        self._codes = np.repeat(np.arange(len(self.brackets), dtype=np.int64), self.counts)
+        self._max_wave = int(self.waves.max()) if len(self.waves) else 0
+        # Waves are shifted by one so a query clipped to -1 still stays inside its bracket's key range.
+        self._stride = self._max_wave + 3
+        self._keys = self._codes * self._stride + self.waves + 1
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "BracketWaveIndex":
+        """Build the index from a frame with ``bracket``, ``wave`` and ``player_id`` columns (one snapshot)."""
+        if df is None or df.empty:
+            return cls.empty()
+
+        waves = pd.to_numeric(df["wave"], errors="coerce")
+        df = df[waves.notna()]
+        waves = waves[waves.notna()].to_numpy(dtype=np.int64)
+
+        codes, brackets = pd.factorize(df["bracket"].to_numpy(dtype=object), sort=True)
+        order = np.lexsort((waves, codes))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(brackets)))])
+        return cls(brackets, offsets, waves[order], df["player_id"].to_numpy(dtype=object)[order])
+
+    @classmethod
+    def empty(cls) -> "BracketWaveIndex":
+        return cls(np.array([], dtype=object), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=object))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Rows in index order (by bracket, then wave); ``from_frame`` rebuilds the same index from it."""
+        return pd.DataFrame({"bracket": self.brackets[self._codes], "wave": self.waves, "player_id": self.player_ids})
+
+    def __len__(self) -> int:
+        return len(self.brackets)
+
+    def _subset(self, row_mask: np.ndarray) -> "BracketWaveIndex":
+        """Keep the rows in ``row_mask`` and drop brackets left empty; sort order is preserved."""
+        codes = self._codes[row_mask]
+        counts = np.bincount(codes, minlength=len(self.brackets))
+        keep = counts > 0
+        offsets = np.concatenate([[0], np.cumsum(counts[keep])])
+        return BracketWaveIndex(self.brackets[keep], offsets, self.waves[row_mask], self.player_ids[row_mask])
+
+    def without(self, excluded_ids: Iterable[str]) -> "BracketWaveIndex":
+        """Return the index without the rows of ``excluded_ids``."""
+        excluded = pd.Index(self.player_ids).isin(list(excluded_ids))
+        return self._subset(~excluded) if excluded.any() else self
+
+    def full_brackets(self, min_players: int = FULL_BRACKET_MIN_PLAYERS) -> "BracketWaveIndex":
+        """Return the index restricted to brackets with at least ``min_players`` distinct players."""
+        players = pd.Series(self.player_ids).groupby(self._codes).nunique().reindex(range(len(self.brackets)), fill_value=0).to_numpy()
+        return self._subset((players >= min_players)[self._codes])
+
+    def top_waves(self) -> np.ndarray:
+        """Highest wave per bracket."""
+        return self.waves[self.offsets[1:] - 1]
+
+    def median_waves(self) -> np.ndarray:
+        """Median wave per bracket (float, as ``Series.median`` returns it)."""
+        lo = self.offsets[:-1]
+        return (self.waves[lo + (self.counts - 1) // 2] + self.waves[lo + self.counts // 2]) / 2
+
+    def placements(self, wave: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (players strictly above, players tied) at ``wave`` for every bracket."""
+        query = np.arange(len(self.brackets), dtype=np.int64) * self._stride + min(max(int(wave), -1), self._max_wave + 1) + 1
+        # For integer keys, "right of q" equals "left of q + 1", so one call answers both sides.
+        bounds = np.searchsorted(self._keys, np.concatenate([query, query + 1]))
+        left, right = bounds[: len(query)], bounds[len(query) :]
+        return self.offsets[1:] - right, right - left
@@ -0,0 +1,285 @@
+"""Per-player headline facts, kept in ``PlayerSummary``.
+
+One summary per player over their public results (results marked public,
+position within ``how_many_results_public_site``, moderated rows included):
+nicknames used, leagues played, tourney count, best wave and position, and
+first/last tourney.  Rows are grouped by the primary id of their game instance
+when the owning known player is approved, otherwise by the id itself, so a
+player's old ids count towards their current one.
+
+The summaries are aggregated in SQL and maintained incrementally:
+
+- ``create_tourney_rows`` merges each newly imported result in;
+- ``reposition`` applies position changes in bulk SQL: better positions lower
+  ``best_position``, a best position that got worse is recomputed from positions
+  alone, and only players with rows entering or leaving the public range are
+  re-aggregated;
+- ``KnownPlayer``/``GameInstance``/``PlayerId`` saves and deletes re-aggregate
+  the affected players, as do ``TourneyRow`` saves and deletes and
+  ``TourneyResult`` saves changing its ``public`` flag, date or league (all
+  wired in ``TourneyResultsConfig.ready``; the tourney ones once the
+  transaction commits).
+
+Queryset ``update()``/``bulk_*`` calls bypass those signals;
+``python manage.py rebuild_player_summaries`` recreates the table.
+"""
+
+import datetime
+import json
+import logging
+from typing import Iterable, Optional, Sequence
+
+from django.db import connection, transaction
+
+from ..sus.models import PlayerId
+from .constants import how_many_results_public_site, leagues
+from .models import PlayerSummary, TourneyResult
+
+logger = logging.getLogger(__name__)
+
+_BATCH = 5000
+_FIELDS = ["nicknames", "leagues", "tourney_count", "best_wave", "best_position", "first_seen", "last_seen", "last_nickname", "last_league"]
+_LEAGUE_ORDER = {league: i for i, league in enumerate(leagues)}
+
+# Joins resolving ``{alias}.player_id`` to its player key, ``COALESCE(pp.id, {alias}.player_id)``.
+_KEY_JOINS = """
+LEFT JOIN sus_playerid p ON p.id = {alias}.player_id
+LEFT JOIN sus_gameinstance g ON g.id = p.game_instance_id
+LEFT JOIN sus_knownplayer k ON k.id = g.player_id AND k.approved
+LEFT JOIN (SELECT game_instance_id, MIN(id) AS id FROM sus_playerid WHERE "primary" GROUP BY game_instance_id) pp
+    ON pp.game_instance_id = g.id AND k.id IS NOT NULL
+"""
+
+# Groups public rows by player key; the caller appends the row filter.
+_AGGREGATE_SQL = f"""
+SELECT COALESCE(pp.id, r.player_id) AS player_key,
+       json_group_array(DISTINCT r.nickname),
+       json_group_array(DISTINCT t.league),
+       COUNT(DISTINCT r.result_id),
+       MAX(r.wave),
+       MIN(CASE WHEN r.position > 0 THEN r.position END),
+       MIN(t.date),
+       MAX(t.date || '|' || t.league || '|' || r.nickname)
+FROM tourney_results_tourneyrow r
+JOIN tourney_results_tourneyresult t ON t.id = r.result_id
+{_KEY_JOINS.format(alias="r")}
+WHERE t.public AND r.position <= {how_many_results_public_site} AND {{where}}
+GROUP BY player_key
+"""
+
+
+def _sorted_nicknames(nicknames: Iterable[str]) -> list[str]:
+    return sorted(set(nicknames), key=lambda name: (name.lower(), name))
+
+
+def _sorted_leagues(names: Iterable[str]) -> list[str]:
+    return sorted(set(names), key=lambda league: (_LEAGUE_ORDER.get(league, len(_LEAGUE_ORDER)), league))
+
+
+def _aggregate(where: str, params: Sequence) -> dict[str, PlayerSummary]:
+    """Return {player key: unsaved summary} over the public rows matching ``where``."""
+    with connection.cursor() as cursor:
+        cursor.execute(_AGGREGATE_SQL.format(where=where), list(params))
+        rows = cursor.fetchall()
+
+    summaries = {}
+    for key, nicknames, played_leagues, count, best_wave, best_position, first_seen, last in rows:
+        last_seen, last_league, last_nickname = last.split("|", 2)
+        summaries[key] = PlayerSummary(
+            player_id=key,
+            nicknames=_sorted_nicknames(json.loads(nicknames)),
+            leagues=_sorted_leagues(json.loads(played_leagues)),
+            tourney_count=count,
+            best_wave=best_wave,
+            best_position=best_position,
+            first_seen=datetime.date.fromisoformat(str(first_seen)),
+            last_seen=datetime.date.fromisoformat(last_seen),
+            last_nickname=last_nickname,
+            last_league=last_league,
+        )
+    return summaries
+
+
+def _merge(summary: PlayerSummary, new: PlayerSummary) -> None:
+    """Fold ``new`` (rows of other tourneys) into ``summary`` in place."""
+    summary.nicknames = _sorted_nicknames([*summary.nicknames, *new.nicknames])
+    summary.leagues = _sorted_leagues([*summary.leagues, *new.leagues])
+    summary.tourney_count += new.tourney_count
+    summary.best_wave = max(summary.best_wave, new.best_wave)
+    if new.best_position is not None and (summary.best_position is None or new.best_position < summary.best_position):
+        summary.best_position = new.best_position
+    summary.first_seen = min(summary.first_seen, new.first_seen)
+    if (new.last_seen, new.last_league, new.last_nickname) > (summary.last_seen, summary.last_league, summary.last_nickname):
+        summary.last_seen, summary.last_league, summary.last_nickname = new.last_seen, new.last_league, new.last_nickname
+
+
+def _save(summaries: Iterable[PlayerSummary]) -> None:
+    PlayerSummary.objects.bulk_create(list(summaries), update_conflicts=True, unique_fields=["player_id"], update_fields=_FIELDS)
+
+
+def _chunks(items: Iterable[str]) -> Iterable[list[str]]:
+    items = list(items)
+    for start in range(0, len(items), _BATCH):
+        yield items[start : start + _BATCH]
+
+
+def _keys_of(player_ids: Iterable[str]) -> dict[str, str]:
+    """Return {id: player key} (see the module docstring) for ``player_ids``."""
+    keys = {player_id: player_id for player_id in player_ids}
+    instance_of = {}
+    for chunk in _chunks(keys):
+        instance_of.update(PlayerId.objects.filter(id__in=chunk, game_instance__player__approved=True).values_list("id", "game_instance_id"))
+    primaries = {}
+    for chunk in _chunks(set(instance_of.values())):
+        for game_instance_id, primary_id in PlayerId.objects.filter(game_instance_id__in=chunk, primary=True).values_list("game_instance_id", "id"):
+            primaries[game_instance_id] = min(primary_id, primaries.get(game_instance_id, primary_id))
+    for player_id, game_instance_id in instance_of.items():
+        keys[player_id] = primaries.get(game_instance_id, player_id)
+    return keys
+
+
+def _ids_by_key(keys: Iterable[str]) -> dict[str, set[str]]:
+    """Return {player key: every id whose rows are grouped under it}."""
+    ids_by_key = {key: {key} for key in keys}
+    instances = {}
+    for chunk in _chunks(ids_by_key):
+        instances.update(
+            PlayerId.objects.filter(id__in=chunk, primary=True, game_instance__player__approved=True).values_list("game_instance_id", "id")
+        )
+    for chunk in _chunks(instances):
+        for game_instance_id, player_id in PlayerId.objects.filter(game_instance_id__in=chunk).values_list("game_instance_id", "id"):
+            ids_by_key[instances[game_instance_id]].add(player_id)
+    return ids_by_key
+
+
+def refresh_keys(keys: Iterable[str]) -> None:
+    """Re-aggregate the summaries of ``keys`` from scratch."""
+    ids_by_key = _ids_by_key(keys)
+    keys = list(ids_by_key)
+    with transaction.atomic():
+        for chunk in _chunks(keys):
+            PlayerSummary.objects.filter(player_id__in=chunk).delete()
+            # A key's ids always go into the same query, so each summary is aggregated in one piece.
+            ids = [player_id for key in chunk for player_id in ids_by_key[key]]
+            _save(_aggregate(f"r.player_id IN ({', '.join(['%s'] * len(ids))})", ids).values())
+
+
+def refresh_ids(player_ids: Iterable[str]) -> None:
+    """Re-aggregate the players owning ``player_ids`` after an identity change.
+
+    Summaries keyed by any of ``player_ids`` are dropped first, so pass every id
+    of the affected game instances: one of them may have stopped being a primary id.
+    """
+    player_ids = list(set(player_ids))
+    if not player_ids:
+        return
+    with transaction.atomic():
+        for chunk in _chunks(player_ids):
+            PlayerSummary.objects.filter(player_id__in=chunk).delete()
+        refresh_keys(set(_keys_of(player_ids).values()))
+
+
+def add_result(tourney_result: TourneyResult) -> None:
+    """Merge a newly imported result into the summaries of its players."""
+    new = _aggregate("r.result_id = %s", [tourney_result.pk])
+    if not new:
+        return
+    with transaction.atomic():
+        existing = PlayerSummary.objects.in_bulk(list(new))
+        for key, summary in new.items():
+            if key in existing:
+                _merge(existing[key], summary)
+                new[key] = existing[key]
+        _save(new.values())
+
+
+def update_positions(tourney_result: TourneyResult, player_ids: Sequence[str], old_positions: Sequence[int], new_positions: Sequence[int]) -> None:
+    """Apply the position changes of one result's rows (as made by ``reposition``, after it wrote them).
+
+    Works on all changed rows at once in connection-local temp tables: better
+    positions lower ``best_position`` directly, and only players whose best
+    position was one that got worse have it recomputed, from their rows' positions
+    alone.  Players with a row entering or leaving the public range are fully
+    re-aggregated, since their counts and waves change too.
+    """
+    limit = how_many_results_public_site
+    if not tourney_result.public:
+        return
+    # Rows outside the public range before and after do not count towards any summary.
+    changes = [(str(player_id), int(old), int(new)) for player_id, old, new in zip(player_ids, old_positions, new_positions) if old <= limit or new <= limit]
+    if not changes:
+        return
+
+    table = PlayerSummary._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS summary_position_changes (player_id TEXT NOT NULL, old INTEGER NOT NULL, new INTEGER NOT NULL)")
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS summary_key_changes (player_key TEXT NOT NULL, old INTEGER NOT NULL, new INTEGER NOT NULL)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS temp.summary_key_changes_key ON summary_key_changes (player_key)")
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS summary_stale_ids (player_key TEXT NOT NULL, player_id TEXT NOT NULL)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS temp.summary_stale_ids_key ON summary_stale_ids (player_key, player_id)")
+        for temp in ("summary_position_changes", "summary_key_changes", "summary_stale_ids"):
+            cursor.execute(f"DELETE FROM {temp}")
+
+        cursor.executemany("INSERT INTO summary_position_changes (player_id, old, new) VALUES (%s, %s, %s)", changes)
+        cursor.execute(
+            "INSERT INTO summary_key_changes (player_key, old, new) "
+            f"SELECT COALESCE(pp.id, c.player_id), c.old, c.new FROM summary_position_changes c {_KEY_JOINS.format(alias='c')}"
+        )
+
+        cursor.execute("SELECT DISTINCT player_key FROM summary_key_changes WHERE (old <= %s) != (new <= %s)", [limit, limit])
+        moved = {player_key for (player_key,) in cursor.fetchall()}
+
+        # A ranked row caps the best position at its new one.
+        best_new = (
+            f"(SELECT MIN(c.new) FROM summary_key_changes c WHERE c.player_key = {table}.player_id AND c.new > 0 AND c.new <= {limit})"
+        )
+        cursor.execute(
+            f"UPDATE {table} SET best_position = {best_new} "
+            f"WHERE player_id IN (SELECT player_key FROM summary_key_changes WHERE new > 0 AND new <= {limit}) "
+            f"AND (best_position IS NULL OR best_position > {best_new})"
+        )
+
+        # A best position that got worse may now be held by another row: recompute those from the rows' positions,
+        # over every id grouped under the key (see _ids_by_key).
+        cursor.execute(
+            "INSERT INTO summary_stale_ids (player_key, player_id) "
+            f"SELECT DISTINCT s.player_id, s.player_id FROM summary_key_changes c JOIN {table} s ON s.player_id = c.player_key "
+            "WHERE c.old > 0 AND c.old = s.best_position AND NOT (c.new > 0 AND c.new <= c.old)"
+        )
+        cursor.execute(
+            "INSERT INTO summary_stale_ids (player_key, player_id) "
+            "SELECT s.player_key, other.id FROM (SELECT DISTINCT player_key FROM summary_stale_ids) s "
+            'JOIN sus_playerid p ON p.id = s.player_key AND p."primary" '
+            "JOIN sus_gameinstance g ON g.id = p.game_instance_id "
+            "JOIN sus_knownplayer k ON k.id = g.player_id AND k.approved "
+            "JOIN sus_playerid other ON other.game_instance_id = g.id AND other.id != s.player_key"
+        )
+        cursor.execute(
+            f"UPDATE {table} SET best_position = ("
+            "SELECT MIN(r.position) FROM tourney_results_tourneyrow r JOIN tourney_results_tourneyresult t ON t.id = r.result_id "
+            f"WHERE t.public AND r.position > 0 AND r.position <= {limit} "
+            f"AND r.player_id IN (SELECT player_id FROM summary_stale_ids WHERE player_key = {table}.player_id)"
+            ") WHERE player_id IN (SELECT player_key FROM summary_stale_ids)"
+        )
+        for temp in ("summary_position_changes", "summary_key_changes", "summary_stale_ids"):
+            cursor.execute(f"DELETE FROM {temp}")
+
+        if moved:
+            refresh_keys(moved)
+
+
+def rebuild() -> int:
+    """Recreate every summary; returns how many were written."""
+    with transaction.atomic():
+        PlayerSummary.objects.all().delete()
+        summaries = _aggregate("1 = 1", [])
+        _save(summaries.values())
+    logger.info(f"Rebuilt {len(summaries):,} player summaries")
+    return len(summaries)
+
+
+def get_summaries(player_ids: Iterable[str]) -> dict[str, Optional[PlayerSummary]]:
+    """Return {id: summary of the player owning it, or None} for ``player_ids``."""
+    key_of = _keys_of(player_ids)
+    summaries = PlayerSummary.objects.in_bulk(list(set(key_of.values())))
+    return {player_id: summaries.get(key) for player_id, key in key_of.items()}
@@ -0,0 +1,190 @@
+"""Patch and role resolution over sorted interval arrays.
+
+All patches and all roles are loaded with two queries and turned into sorted
+boundary arrays, so "which patch was active on this date" and "which role does
+this wave earn" are answered in O(log n) for a single value and with one
+``np.searchsorted`` for whole arrays.  The resolvers are cached in-process and
+rebuilt only when a ``PatchNew`` or ``Role`` row changes (see
+``TourneyResultsConfig.ready``).
+"""
+
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..sus import data_versions
+from .models import PatchNew, Role
+
+logger = logging.getLogger(__name__)
+
+
+class _FirstMatchIntervals:
+    """Half-open ``[lo, hi)`` intervals answered like a linear scan returning the first match.
+
+    All bounds split the axis into elementary segments; each segment is assigned
+    the first interval (in input order) covering it, so overlapping intervals
+    resolve exactly like scanning the original list.
+    """
+
+    def __init__(self, los: np.ndarray, his: np.ndarray):
+        self.bounds = np.unique(np.concatenate([los, his])).astype(np.int64)
+        self.segment = np.full(len(self.bounds), -1, dtype=np.int64)
+        # Walk backwards so earlier intervals overwrite later ones.
+        for i in range(len(los) - 1, -1, -1):
+            self.segment[(self.bounds >= los[i]) & (self.bounds < his[i])] = i
+        self._bounds_list = self.bounds.tolist()
+
+    def lookup(self, values: np.ndarray) -> np.ndarray:
+        """Return the index of the first interval containing each value, -1 if none."""
+        pos = np.searchsorted(self.bounds, values, side="right") - 1
+        out = np.full(len(pos), -1, dtype=np.int64)
+        inside = pos >= 0
+        out[inside] = self.segment[pos[inside]]
+        return out
+
+    def lookup_one(self, value: int) -> int:
+        pos = bisect.bisect_right(self._bounds_list, value) - 1
+        return int(self.segment[pos]) if pos >= 0 else -1
+
+
+def _days(dates) -> np.ndarray:
+    """Dates (``date``, ``datetime``, ``Timestamp`` or datetime64) as int64 day numbers."""
+    return np.asarray(list(dates), dtype="datetime64[D]").astype(np.int64)
+
+
+class PatchResolver:
+    """Date -> active patch, equivalent to scanning patches by start date for the first one covering the date."""
+
+    def __init__(self, patches: list[PatchNew]):
+        self.patches = patches
+        starts = _days(patch.start_date for patch in patches)
+        ends = _days(patch.end_date for patch in patches) + 1  # end_date is inclusive
+        self._intervals = _FirstMatchIntervals(starts, ends)
+        self._lookup = np.array([*patches, None], dtype=object)
+
+    def patch_for_date(self, date) -> Optional[PatchNew]:
+        return self._lookup[self._intervals.lookup_one(int(np.datetime64(date, "D").astype(np.int64)))]
+
+    def patches_for_dates(self, dates) -> np.ndarray:
+        """Return an object array with the patch for each date, None where no patch covers it."""
+        return self._lookup[self._intervals.lookup(_days(dates))]
+
+
+class RoleResolver:
+    """(wave, patch, league) -> role, with the per-league fallback of patches that have no roles of their own."""
+
+    def __init__(self, patches: list[PatchNew], roles: list[Role]):
+        self._patches = patches
+        self._roles_by_key: dict[tuple[int, str], list[Role]] = defaultdict(list)
+        for role in roles:
+            self._roles_by_key[(role.patch_id, role.league)].append(role)
+        self._patch_to_roles: dict[str, dict] = {}
+        self._intervals: dict[tuple[int, str], tuple[list, _FirstMatchIntervals]] = {}
+        self._lock = threading.Lock()
+
+    def patch_to_roles(self, league: str) -> dict:
+        """Return {patch: roles} for ``league``.
+
+        A patch without roles borrows the roles of the patch preceding the first
+        role-less patch.
+        """
+        mapping = self._patch_to_roles.get(league)
+        if mapping is not None:
+            return mapping
+
+        mapping = defaultdict(list)
+        last_patch_with_roles = None
+        for i, patch in enumerate(self._patches):
+            roles = tuple(self._roles_by_key.get((patch.id, league), ()))
+
+            if not roles:
+                if not last_patch_with_roles:
+                    last_patch_with_roles = i - 1
+
+                roles = mapping[self._patches[last_patch_with_roles]]
+
+            if not roles:
+                logger.warning(f"No roles for patch {patch} in {league}")
+
+            mapping[patch] = roles
+
+        with self._lock:
+            return self._patch_to_roles.setdefault(league, mapping)
+
+    def _roles_and_intervals(self, patch: PatchNew, league: str) -> Optional[tuple[list, _FirstMatchIntervals]]:
+        key = (patch.id, league)
+        cached = self._intervals.get(key)
+        if cached is None:
+            roles = list(self.patch_to_roles(league).get(patch, ()))
+            if not roles:
+                return None
+            los = np.array([role.wave_bottom for role in roles], dtype=np.int64)
+            his = np.array([role.wave_top for role in roles], dtype=np.int64)
+            cached = self._intervals.setdefault(key, (roles, _FirstMatchIntervals(los, his)))
+        return cached
+
+    def role_for_wave(self, wave: int, patch: Optional[PatchNew], league: str) -> Optional[Role]:
+        if not patch:
+            return None
+        cached = self._roles_and_intervals(patch, league)
+        if cached is None:
+            return None
+        roles, intervals = cached
+        idx = intervals.lookup_one(wave)
+        return roles[idx] if idx >= 0 else None
+
+    def roles_for_waves(self, waves: np.ndarray, patches: np.ndarray, leagues: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (roles, role colours) per row as object arrays, None where no role applies."""
+        wave_roles = np.full(len(waves), None, dtype=object)
+        wave_role_colors = np.full(len(waves), None, dtype=object)
+
+        patch_by_id = {patch.id: patch for patch in patches if patch}
+        patch_ids = np.array([patch.id if patch else -1 for patch in patches], dtype=np.int64)
+        groups = pd.DataFrame({"patch": patch_ids, "league": leagues}).groupby(["patch", "league"], sort=False).indices
+        for (patch_id, league), idx in groups.items():
+            patch = patch_by_id.get(patch_id)
+            cached = self._roles_and_intervals(patch, league) if patch else None
+            if cached is None:
+                continue
+
+            roles, intervals = cached
+            role_idx = intervals.lookup(waves[idx])
+            # Index -1 (no role) picks the trailing None.
+            wave_roles[idx] = np.array([*roles, None], dtype=object)[role_idx]
+            wave_role_colors[idx] = np.array([*(role.color for role in roles), None], dtype=object)[role_idx]
+
+        return wave_roles, wave_role_colors
+
+
+_resolvers: Optional[tuple[tuple, PatchResolver, RoleResolver]] = None
+
+
+def _get_resolvers() -> tuple[PatchResolver, RoleResolver]:
+    global _resolvers
+
+    version = data_versions.current(data_versions.PATCHES)
+    cached = _resolvers
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+
+    patches = list(PatchNew.objects.all().order_by("start_date"))
+    roles = list(Role.objects.all().order_by("id"))
+    patch_resolver = PatchResolver(patches)
+    role_resolver = RoleResolver(patches, roles)
+    _resolvers = (version, patch_resolver, role_resolver)
+    return patch_resolver, role_resolver
+
+
+def get_patch_resolver() -> PatchResolver:
+    """Return the cached ``PatchResolver``, rebuilt when patches or roles changed."""
+    return _get_resolvers()[0]
+
+
+def get_role_resolver() -> RoleResolver:
+    """Return the cached ``RoleResolver``, rebuilt when patches or roles changed."""
+    return _get_resolvers()[1]
@@ -0,0 +1,202 @@
+"""Search index behind the player search page.
+
+``PlayerSearchEntry`` holds every distinct (player id, name) pair the search can
+match: the tourney names an id was listed under in a public result (position
+within ``how_many_results_public_site``, moderated rows included) and the known
+player name of each primary id.  ``PlayerSearchLeague`` holds the leagues each id
+has such a result in.  An FTS5 trigram table over the entries (kept in sync by
+triggers, see migration 0043) answers substring queries; prefix queries use the
+``(kind, upper(name))`` index and ranges over ``player_id``.
+
+The tables are maintained incrementally:
+
+- ``create_tourney_rows`` adds the rows of each imported result;
+- ``reposition`` adds rows that moved into the public range;
+- ``KnownPlayer``/``GameInstance``/``PlayerId`` saves and deletes refresh the
+  known names of the affected ids (wired in ``TourneyResultsConfig.ready``).
+
+Entries are never removed when a result is deleted or a row drops out of the
+public range; ``python manage.py rebuild_search_index`` recreates the tables.
+"""
+
+import logging
+from typing import Iterable, Sequence
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from ..sus.models import PlayerId
+from .constants import how_many_results_public_site
+from .models import PlayerSearchEntry, PlayerSearchLeague, TourneyRow
+
+logger = logging.getLogger(__name__)
+
+_ENTRIES = PlayerSearchEntry._meta.db_table
+_FTS = f"{_ENTRIES}_fts"
+
+
+def _next_prefix(s: str) -> str:
+    """Return the string that sorts immediately after all strings starting with s."""
+    return s[:-1] + chr(ord(s[-1]) + 1)
+
+
+# --- maintenance -------------------------------------------------------------
+
+
+def add_rows(league: str, player_ids: Sequence[str], nicknames: Sequence[str], positions: Sequence[int]) -> None:
+    """Index the public rows (position within the public range) of one result."""
+    pairs = {
+        (str(player_id), str(nickname))
+        for player_id, nickname, position in zip(player_ids, nicknames, positions)
+        if position <= how_many_results_public_site
+    }
+    with transaction.atomic():
+        PlayerSearchEntry.objects.bulk_create(
+            [PlayerSearchEntry(player_id=player_id, name=nickname, kind=PlayerSearchEntry.NICKNAME) for player_id, nickname in pairs if nickname],
+            ignore_conflicts=True,
+            batch_size=5000,
+        )
+        PlayerSearchLeague.objects.bulk_create(
+            [PlayerSearchLeague(player_id=player_id, league=league) for player_id in {player_id for player_id, _ in pairs}],
+            ignore_conflicts=True,
+            batch_size=5000,
+        )
+
+
+def _known_names(player_ids: Iterable[str]) -> list[tuple[str, str]]:
+    """(id, known player name) for the primary ids among ``player_ids``."""
+    rows = PlayerId.objects.filter(id__in=list(player_ids), primary=True).values_list("id", "game_instance__player__name", "player__name")
+    return [(player_id, name or legacy_name) for player_id, name, legacy_name in rows if name or legacy_name]
+
+
+def refresh_known_names(player_ids: Iterable[str]) -> None:
+    """Re-read the known names of ``player_ids``; ids that are gone or not primary lose theirs."""
+    player_ids = list(set(player_ids))
+    if not player_ids:
+        return
+    with transaction.atomic():
+        PlayerSearchEntry.objects.filter(player_id__in=player_ids, kind=PlayerSearchEntry.KNOWN).delete()
+        PlayerSearchEntry.objects.bulk_create(
+            [PlayerSearchEntry(player_id=player_id, name=name, kind=PlayerSearchEntry.KNOWN) for player_id, name in _known_names(player_ids)],
+            ignore_conflicts=True,
+        )
+
+
+def ids_of_known_player(known_player_id: int) -> list[str]:
+    return list(PlayerId.objects.filter(Q(game_instance__player_id=known_player_id) | Q(player_id=known_player_id)).values_list("id", flat=True))
+
+
+def ids_of_game_instance(game_instance_id: int) -> list[str]:
+    return list(PlayerId.objects.filter(game_instance_id=game_instance_id).values_list("id", flat=True))
+
+
+def rebuild() -> None:
+    """Recreate the index from ``TourneyRow`` and the player tables."""
+    public = Q(position__lte=how_many_results_public_site)
+    with transaction.atomic():
+        PlayerSearchEntry.objects.all().delete()
+        PlayerSearchLeague.objects.all().delete()
+        with connection.cursor() as cursor:
+            # Start the FTS table from scratch as well, in case it ever drifted from its content table.
+            cursor.execute(f"INSERT INTO {_FTS} ({_FTS}) VALUES ('delete-all')")
+
+        nicknames = TourneyRow.objects.filter(public).exclude(nickname="").values_list("player_id", "nickname").order_by().distinct()
+        PlayerSearchEntry.objects.bulk_create(
+            (PlayerSearchEntry(player_id=player_id, name=nickname, kind=PlayerSearchEntry.NICKNAME) for player_id, nickname in nicknames.iterator()),
+            batch_size=5000,
+        )
+        primary_ids = PlayerId.objects.filter(primary=True).values_list("id", flat=True)
+        PlayerSearchEntry.objects.bulk_create(
+            [PlayerSearchEntry(player_id=player_id, name=name, kind=PlayerSearchEntry.KNOWN) for player_id, name in _known_names(primary_ids)],
+            batch_size=5000,
+        )
+        leagues = TourneyRow.objects.filter(public).values_list("player_id", "result__league").order_by().distinct()
+        PlayerSearchLeague.objects.bulk_create(
+            (PlayerSearchLeague(player_id=player_id, league=league) for player_id, league in leagues.iterator()),
+            batch_size=5000,
+        )
+    logger.info(f"Rebuilt player search index: {PlayerSearchEntry.objects.count():,} entries")
+
+
+# --- queries -----------------------------------------------------------------
+
+
+def _fetch(sql: str, params: list) -> list[tuple[str, str]]:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def ids_with_prefix(prefix: str, limit: int) -> list[tuple[str, str]]:
+    """(id, one of its tourney names) for ids starting with ``prefix`` (uppercase), by id."""
+    return _fetch(
+        f"SELECT player_id, MIN(name) FROM {_ENTRIES} WHERE player_id >= %s AND player_id < %s AND kind = %s "
+        "GROUP BY player_id ORDER BY player_id LIMIT %s",
+        [prefix, _next_prefix(prefix), PlayerSearchEntry.NICKNAME, limit],
+    )
+
+
+def _like(fragment: str) -> str:
+    """LIKE pattern for names containing ``fragment`` literally (to be used with ``ESCAPE '\\'``)."""
+    escaped = fragment.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _matching(column: str, fragments: Sequence[str]) -> str:
+    """Conditions on the entries whose ``column`` contains every fragment; see ``_matching_params``.
+
+    The FTS query runs once as ``id IN (...)`` instead of once per entry of a join.  The trigram
+    index is not used for a LIKE with ESCAPE, so it gets the raw fragments, where ``%`` and ``_``
+    match too much, and the escaped patterns then recheck its candidates.
+    """
+    candidates = " AND ".join(f"{column} LIKE %s" for _ in fragments)
+    exact = "".join(f" AND {column} LIKE %s ESCAPE '\\'" for _ in fragments)
+    return f"id IN (SELECT rowid FROM {_FTS} WHERE {candidates}){exact}"
+
+
+def _matching_params(fragments: Sequence[str]) -> list[str]:
+    """Parameters for ``_matching``: the raw patterns, then the escaped ones."""
+    return [*(f"%{fragment}%" for fragment in fragments), *(_like(fragment) for fragment in fragments)]
+
+
+def ids_containing(term: str, limit: int) -> list[tuple[str, str]]:
+    """(id, one of its tourney names) for ids containing ``term`` anywhere, by id."""
+    return _fetch(
+        f"SELECT player_id, MIN(name) FROM {_ENTRIES} WHERE {_matching('player_id', [term])} AND kind = %s "
+        "GROUP BY player_id ORDER BY player_id LIMIT %s",
+        [*_matching_params([term]), PlayerSearchEntry.NICKNAME, limit],
+    )
+
+
+def _excluding(column: str, exclude: Sequence[str]) -> str:
+    return f" AND {column} NOT IN ({', '.join(['%s'] * len(exclude))})" if exclude else ""
+
+
+def names_with_prefix(kind: str, prefix: str, others: Sequence[str], limit: int, exclude: Sequence[str] = ()) -> list[tuple[str, str]]:
+    """(id, name) for ids with a name starting with ``prefix`` and containing every one of ``others``.
+
+    Matching is case-insensitive; one name per id, alphabetically first ids first.
+    """
+    conditions = "".join(" AND UPPER(name) LIKE %s ESCAPE '\\'" for _ in others) + _excluding("player_id", exclude)
+    return _fetch(
+        f"SELECT player_id, MIN(name) AS first_name FROM {_ENTRIES} WHERE kind = %s AND UPPER(name) >= %s AND UPPER(name) < %s{conditions} "
+        "GROUP BY player_id ORDER BY UPPER(first_name), player_id LIMIT %s",
+        [kind, prefix.upper(), _next_prefix(prefix.upper()), *(_like(other.upper()) for other in others), *exclude, limit],
+    )
+
+
+def names_containing(kind: str, fragments: Sequence[str], limit: int, exclude: Sequence[str] = ()) -> list[tuple[str, str]]:
+    """(id, name) for ids with a name containing every one of ``fragments``, like ``names_with_prefix``."""
+    return _fetch(
+        f"SELECT player_id, MIN(name) AS first_name FROM {_ENTRIES} WHERE {_matching('name', fragments)} AND kind = %s"
+        f"{_excluding('player_id', exclude)} GROUP BY player_id ORDER BY UPPER(first_name), player_id LIMIT %s",
+        [*_matching_params(fragments), kind, *exclude, limit],
+    )
+
+
+def leagues_of(player_ids: Iterable[str]) -> dict[str, str]:
+    """Return {id: comma-separated leagues it has public results in}."""
+    leagues: dict[str, set[str]] = {}
+    for player_id, league in PlayerSearchLeague.objects.filter(player_id__in=list(player_ids)).values_list("player_id", "league"):
+        leagues.setdefault(player_id, set()).add(league)
+    return {player_id: ", ".join(sorted(names)) for player_id, names in leagues.items()}
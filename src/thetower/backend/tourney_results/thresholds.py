@@ -0,0 +1,93 @@
+"""Materialised per-tourney wave thresholds.
+
+Every ``TourneyResult`` gets two kinds of ``PlacementThreshold`` rows:
+
+- ``bracket``: for each place 1-30, the median wave at that place over the
+  tourney's full brackets.  The regression analysis page reads these.
+- ``global``: for each top-N cutoff shown on the counts page, the wave of the
+  N-th ranked player (``position > 0``, so moderation exclusions apply).
+
+The import pipeline fills both kinds for new results.  ``reposition``
+refreshes the global cutoffs whenever positions change.  Migration 0042
+backfills the global cutoffs of existing results; the
+``rebuild_thresholds`` management command backfills the bracket ones (or
+rebuilds either kind).
+"""
+
+import logging
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from ..env_config import get_csv_data
+from .bracket_stats import waves_at_ranks
+from .data import date_to_patch
+from .league_rules import get_league_rules
+from .models import PlacementThreshold, TourneyResult
+
+BRACKET_PLACES = tuple(range(1, 31))
+# Must cover every cutoff offered by the counts page.
+GLOBAL_PLACES = (1, 10, 25, 50, 100, 200, 250, 400, 500, 600, 750, 800, 1000, 1500, 2000, 2500, 3000, 4000, 5000, 7500, 10000, 15000, 20000, 25000)
+
+
+def _read_leaderboard(result: TourneyResult) -> Optional[pd.DataFrame]:
+    """Final leaderboard (bracket and wave) of a result: the league CSV if present, else the uploaded file."""
+    candidates = [Path(get_csv_data()) / result.league / f"{result.date.isoformat()}.csv.gz"]
+    if result.result_file:
+        candidates.append(Path(result.result_file.path))
+    for path in candidates:
+        if path.exists():
+            return pd.read_csv(path, usecols=lambda c: c in ("bracket", "wave"))
+    return None
+
+
+def bracket_place_waves(df: pd.DataFrame, min_bracket_size: int, places: Iterable[int] = BRACKET_PLACES) -> dict[int, Optional[int]]:
+    """Return {place: median wave at that place over brackets with at least ``min_bracket_size`` players}.
+
+    Brackets shorter than a place do not count towards it; a place no bracket reaches maps to None.
+    """
+    places = list(places)
+    if df is None or df.empty or "bracket" not in df.columns:
+        return dict.fromkeys(places)
+    sizes = df.groupby("bracket")["wave"].transform("size")
+    at_ranks = waves_at_ranks(df[sizes >= min_bracket_size], places)
+    return {place: int(np.median(waves.to_numpy())) if len(waves) else None for place, waves in at_ranks.items()}
+
+
+def global_place_waves(result: TourneyResult, places: Iterable[int] = GLOBAL_PLACES) -> dict[int, Optional[int]]:
+    """Return {N: wave of the N-th ranked player} from the result's rows; None if fewer players ranked."""
+    places = list(places)
+    waves = list(result.rows.filter(position__gt=0).order_by("-wave").values_list("wave", flat=True)[: max(places)])
+    return {place: waves[place - 1] if place <= len(waves) else None for place in places}
+
+
+def _replace(result: TourneyResult, kind: str, waves: dict[int, Optional[int]]) -> None:
+    with transaction.atomic():
+        PlacementThreshold.objects.filter(result=result, kind=kind).delete()
+        PlacementThreshold.objects.bulk_create(
+            [PlacementThreshold(result=result, kind=kind, place=place, wave=wave) for place, wave in waves.items()]
+        )
+
+
+def update_bracket_thresholds(result: TourneyResult) -> bool:
+    """Recompute the bracket-place thresholds of ``result``; False if its leaderboard file is missing."""
+    df = _read_leaderboard(result)
+    if df is None:
+        logging.warning(f"No leaderboard file for {result}; bracket thresholds not updated")
+        return False
+    rules = get_league_rules(result.league, date_to_patch(result.date))
+    _replace(result, PlacementThreshold.BRACKET, bracket_place_waves(df, rules.min_full_bracket_size))
+    return True
+
+
+def update_global_thresholds(result: TourneyResult) -> None:
+    """Recompute the global top-N thresholds of ``result`` from its current positions."""
+    _replace(result, PlacementThreshold.GLOBAL, global_place_waves(result))
+
+
+def update_thresholds(result: TourneyResult) -> None:
+    update_bracket_thresholds(result)
+    update_global_thresholds(result)
@@ -0,0 +1,28 @@
+"""Database routing for processes that define the ``readonly`` alias (see settings)."""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ONLY_DB_ALIAS = "readonly"
+
+
+class ReadOnlyRouter:
+    """Send reads to the read-only connection and everything else to ``default``.
+
+    Both aliases open the same SQLite file, so relations between their objects
+    are fine.  Reads made while ``default`` is inside a transaction stay on it so
+    they see that transaction's own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_ONLY_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
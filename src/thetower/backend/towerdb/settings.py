@@ -45,6 +45,27 @@ DATABASES = {
     }
 }
 
+# Applied to every SQLite connection when it is opened (see TourneyResultsConfig.ready).
+# journal_mode is stored in the database file; the others only last for the connection.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 1024**3,  # bytes; pages are shared through the OS page cache between processes
+    "cache_size": -32 * 1024,  # negative means KiB: 32 MiB per connection
+    "temp_store": "MEMORY",
+}
+
+# The Streamlit sites (TOWERDB_READONLY=1, set by web/pages.py) read through a
+# second connection to the same file that refuses writes (PRAGMA query_only).
+# Writes, and reads inside a transaction, still use "default".
+if os.environ.get("TOWERDB_READONLY"):
+    DATABASES["readonly"] = {
+        **DATABASES["default"],
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["thetower.backend.towerdb.routers.ReadOnlyRouter"]
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
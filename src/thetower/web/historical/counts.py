@@ -2,7 +2,7 @@ import pandas as pd
 import streamlit as st
 
 from thetower.backend.tourney_results.data import date_to_patch
-from thetower.backend.tourney_results.models import TourneyResult, TourneyRow
+from thetower.backend.tourney_results.models import PlacementThreshold, TourneyResult
 from thetower.web.util import get_league_selection, get_options
 
 
@@ -22,13 +22,12 @@ def compute_counts():
     cutoff_ranges = {
         # "Top 200": {
         #     "counts": [1, 10, 25, 50, 100, 200],
-        #     "limit": 300
         # },
-        "Top 1000": {"counts": [1, 10, 25, 50, 100, 200, 400, 600, 800, 1000], "limit": 1100},
-        "Top 2500": {"counts": [1, 100, 250, 500, 750, 1000, 1500, 2000, 2500], "limit": 2600},
-        "Top 5000": {"counts": [1, 100, 500, 1000, 2000, 2500, 3000, 4000, 5000], "limit": 5100},
-        "Top 10000": {"counts": [1, 100, 500, 1000, 2000, 5000, 7500, 10000], "limit": 10100},
-        "Top 25000": {"counts": [1, 100, 500, 1000, 5000, 10000, 15000, 20000, 25000], "limit": 25100},
+        "Top 1000": {"counts": [1, 10, 25, 50, 100, 200, 400, 600, 800, 1000]},
+        "Top 2500": {"counts": [1, 100, 250, 500, 750, 1000, 1500, 2000, 2500]},
+        "Top 5000": {"counts": [1, 100, 500, 1000, 2000, 2500, 3000, 4000, 5000]},
+        "Top 10000": {"counts": [1, 100, 500, 1000, 2000, 5000, 7500, 10000]},
+        "Top 25000": {"counts": [1, 100, 500, 1000, 5000, 10000, 15000, 20000, 25000]},
     }
 
     # Create columns for controls
@@ -45,7 +44,6 @@ def compute_counts():
         bc_display = bc_col.selectbox("Battle Conditions", ["Hide", "Short", "Full"], help="How to display battle conditions")
 
     counts_for = cutoff_ranges[selected_range]["counts"]
-    limit = cutoff_ranges[selected_range]["limit"]
 
     champ_results = TourneyResult.objects.filter(league=league, public=True).order_by("-date")
 
@@ -60,14 +58,20 @@ def compute_counts():
 
     champ_results = champ_results[(which_page - 1) * per_page : which_page * per_page]
 
-    rows = TourneyRow.objects.filter(result__in=champ_results, position__lt=limit, position__gt=0).order_by("-wave").values("result_id", "wave")
+    # Materialised at import (and refreshed on reposition), see tourney_results.thresholds.
+    thresholds = PlacementThreshold.objects.filter(result__in=champ_results, kind=PlacementThreshold.GLOBAL, place__in=counts_for).values_list(
+        "result_id", "place", "wave"
+    )
+    waves_by_result = {}
+    for result_id, place, wave in thresholds:
+        waves_by_result.setdefault(result_id, {})[place] = wave
 
     row_height = (per_page + 1) * 35 + 2
 
     results = []
 
     for tourney in champ_results:
-        waves = [row["wave"] for row in rows if row["result_id"] == tourney.id]
+        waves = waves_by_result.get(tourney.id, {})
         result = {"date": tourney.date}
 
         # Handle BC display based on selection
@@ -78,7 +82,7 @@ def compute_counts():
             else:  # "Full"
                 result["bcs"] = "/".join([bc.name for bc in bcs])
 
-        result |= {f"Top {count_for}": waves[count_for - 1] if count_for <= len(waves) else 0 for count_for in counts_for}
+        result |= {f"Top {count_for}": waves.get(count_for) or 0 for count_for in counts_for}
         results.append(result)
 
     to_be_displayed = pd.DataFrame(results).sort_values("date", ascending=False).reset_index(drop=True)
@@ -7,73 +7,45 @@ latest tournament's actual vs predicted values.
 """
 
 import datetime
-from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from thetower.backend.env_config import get_csv_data
 from thetower.backend.tourney_results.constants import leagues
 from thetower.backend.tourney_results.league_rules import get_league_rules
 from thetower.backend.tourney_results.models import PatchNew as Patch
+from thetower.backend.tourney_results.models import PlacementThreshold
+from thetower.backend.tourney_results.thresholds import BRACKET_PLACES
 
 
 def _fetch_patch_data(league: str, patch: Patch, key_places: list[int]) -> list[dict] | None:
     """Fetch per-tournament bracket-level wave thresholds at key places.
 
-    Reads the historical league CSVs (one file per completed tournament, named
-    YYYY-MM-DD.csv.gz) which carry the full final leaderboard including the
-    'bracket' column.  For each tournament in the selected patch finds the
-    median wave at each key place across all full brackets.
+    Reads the materialised ``PlacementThreshold`` rows (filled at import time
+    from each tournament's final leaderboard, see ``tourney_results.thresholds``):
+    for each tournament in the selected patch, the median wave at each key place
+    across all full brackets.  Tournaments missing any key place are skipped.
 
     Returns a list of dicts with keys: date, tournament_index, <place>: wave, ...
     Returns None if fewer than 2 data points are available.
     """
-    hist_path = Path(get_csv_data()) / league
-    if not hist_path.exists():
-        return None
-
-    files = sorted([f for f in hist_path.glob("*.csv.gz") if f.stat().st_size > 0])
-    if not files:
-        return None
-
-    rules = get_league_rules(league, patch)
-    # Tolerate brackets that are missing a few players (e.g. late-join or early-leave)
-    min_bracket_size = max(rules.bracket_size - 5, rules.bracket_size // 2)
-
-    data_points: list[dict] = []
-    for f in files:
-        try:
-            tourney_date = datetime.date.fromisoformat(f.stem.replace(".csv", ""))
-        except ValueError:
-            continue
-        if tourney_date < patch.start_date or tourney_date > patch.end_date:
-            continue
-
-        df = pd.read_csv(f)
-        if df.empty or "bracket" not in df.columns:
-            continue
-
-        # For each full bracket find the wave at each key place (0-indexed)
-        place_waves: dict[int, list[int]] = {p: [] for p in key_places}
-        for _bracket, bdf in df.groupby("bracket"):
-            bdf_sorted = bdf.sort_values("wave", ascending=False).reset_index(drop=True)
-            if len(bdf_sorted) < min_bracket_size:
-                continue
-            for place in key_places:
-                idx = place - 1
-                if idx < len(bdf_sorted):
-                    place_waves[place].append(int(bdf_sorted.iloc[idx]["wave"]))
-
-        if not all(place_waves[p] for p in key_places):
-            continue
-
-        point: dict = {"date": tourney_date}
-        for place in key_places:
-            point[place] = int(np.median(place_waves[place]))
-        data_points.append(point)
+    thresholds = PlacementThreshold.objects.filter(
+        kind=PlacementThreshold.BRACKET,
+        place__in=key_places,
+        result__league=league,
+        result__date__gte=patch.start_date,
+        result__date__lte=patch.end_date,
+    ).values_list("result__date", "place", "wave")
+
+    waves_by_date: dict[datetime.date, dict[int, int | None]] = {}
+    for tourney_date, place, wave in thresholds:
+        waves_by_date.setdefault(tourney_date, {})[place] = wave
+
+    data_points: list[dict] = [
+        {"date": tourney_date, **waves} for tourney_date, waves in waves_by_date.items() if all(waves.get(place) is not None for place in key_places)
+    ]
 
     if len(data_points) < 2:
         return None
@@ -138,7 +110,7 @@ def compute_regression_analysis():
             return f"#{place} ({tier.gems}💎 {tier.stones}🪨)"
 
     elif mode == "Custom":
-        all_places = list(range(1, 31))
+        all_places = list(BRACKET_PLACES)
         key_places = sorted(st.multiselect("Places to chart", all_places, default=_CUSTOM_PLACES, key="custom_places"))
         if not key_places:
             st.warning("Select at least one place.")
@@ -1,22 +1,19 @@
 import datetime
-import json
 import logging
 from functools import wraps
 from pathlib import Path
 from time import perf_counter
+from typing import Optional
 
 import pandas as pd
 import streamlit as st
 
 from thetower.backend.env_config import get_csv_data
-from thetower.backend.tourney_results.archive_utils import (
-    build_tourney_archive,
-    group_snapshots_by_tourney,
-    list_snapshots,
-    read_archive,
-    reconstruct_all_snapshots,
-)
-from thetower.backend.tourney_results.data import get_banned_ids, get_player_id_lookup, get_shun_ids, get_sus_ids
+from thetower.backend.tourney_results.archive_utils import list_snapshots
+from thetower.backend.tourney_results.bracket_stats import promotion_cutoff_waves, relegation_cutoff_waves
+from thetower.backend.tourney_results.data import get_moderation_snapshot, get_player_id_lookup
+from thetower.backend.tourney_results.placement_cache import PlacementCacheReader, get_placement_cache
+from thetower.backend.tourney_results.placement_index import FULL_BRACKET_MIN_PLAYERS, BracketWaveIndex
 from thetower.backend.tourney_results.shun_config import include_shun_enabled_for
 from thetower.backend.tourney_results.tourney_utils import (
     get_full_brackets,
@@ -24,6 +21,7 @@ from thetower.backend.tourney_results.tourney_utils import (
     get_time,
     get_tourney_state,
 )
+from thetower.web.live.timeline_store import LiveTimelineStore, timeline_store
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +54,22 @@ def cache_data_if_enabled(**cache_args):
     return decorator
 
 
-@cache_data_if_enabled(ttl=CACHE_TTL_SECONDS)
+def _live_filters(shun: bool) -> tuple[frozenset, dict]:
+    """Return (excluded player ids, id -> real name lookup) used to filter live data."""
+    moderation = get_moderation_snapshot()
+    excluded_ids = moderation.sus | moderation.banned
+    if not shun:
+        excluded_ids = excluded_ids | moderation.shun
+    return excluded_ids, get_player_id_lookup()
+
+
 def get_live_data(league: str, shun: bool = False) -> pd.DataFrame:
     """
-    Get and cache live tournament data.
+    Get live tournament data.
+
+    The timeline is kept in the process-level ``timeline_store``, which only
+    appends the rows of newly imported snapshots instead of rebuilding the
+    whole tourney.
 
     Args:
         league: League identifier
@@ -69,19 +79,9 @@ def get_live_data(league: str, shun: bool = False) -> pd.DataFrame:
         DataFrame containing live tournament data
     """
     t0 = perf_counter()
-    archive, expected_timestamps = _load_archive_df(league)
-    df = reconstruct_all_snapshots(archive, extra_timestamps=expected_timestamps)
-
-    excluded_ids = get_sus_ids() | get_banned_ids()
-    if not shun:
-        excluded_ids = excluded_ids | get_shun_ids()
-    df = df[~df["player_id"].isin(excluded_ids)]
-
-    lookup = get_player_id_lookup()
-    df["real_name"] = [lookup.get(pid, name) for pid, name in zip(df["player_id"], df["name"])]
-    df["real_name"] = df["real_name"].astype(str)
-
-    df = df.sort_values(["datetime", "wave"], ascending=False).reset_index(drop=True)
+    excluded_ids, lookup = _live_filters(shun)
+    store = LiveTimelineStore() if is_caching_disabled() else timeline_store
+    df = store.live_view(league, _get_snapshot_path(league), _get_archive_path(league), shun, excluded_ids, lookup).copy()
     logger.info(f"get_live_data({league}) took {perf_counter() - t0:.3f}s — {len(df):,} rows")
     return df
 
@@ -185,6 +185,29 @@ def process_display_names(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
+def _current_placement_cache(league: str, include_shun: bool) -> tuple[Optional[PlacementCacheReader], Optional[Path]]:
+    """Return (placement cache reader, latest snapshot) for the league's current tourney.
+
+    Snapshots live in current_tourney/{league}/ and placement caches in
+    {league}_live/.  The reader is None when there is no cache for the latest
+    snapshot's tourney or it was generated with a different include_shun setting.
+    """
+    snapshots = list_snapshots(_get_snapshot_path(league))
+    if not snapshots:
+        logging.info(f"No live snapshots for {league}")
+        return None, None
+    last_file = snapshots[-1]
+
+    cache = get_placement_cache(_get_archive_path(league), get_time(last_file))
+    if cache is None:
+        logging.info(f"No placement cache for {league} (latest snapshot {last_file.name})")
+        return None, last_file
+    if (cache.manifest() or {}).get("include_shun") != include_shun:
+        logging.info(f"Placement cache include_shun mismatch for {league}; rejecting cache")
+        return None, last_file
+    return cache, last_file
+
+
 @cache_data_if_enabled(ttl=CACHE_TTL_SECONDS)
 def get_placement_analysis_data(league: str):
     """
@@ -198,115 +221,59 @@ def get_placement_analysis_data(league: str):
         - DataFrame
         - Latest time
         - Bracket creation times dict
+        - Tourney start date
+        - BracketWaveIndex of the fullish brackets, for ``analyze_wave_placement``
     """
     # Respect filesystem/JSON flag: include shunned players when configured
     # for live_placement_cache (shared by live_placement_analysis and live_quantile_analysis)
     include_shun = include_shun_enabled_for("live_placement_cache")
 
-    # Try to use per-tourney cache: snapshots live in current_tourney/{league}/
-    # and placement cache files live in {league}_live/ (permanent location).
     try:
-        csv_data = get_csv_data()
-        logging.info(f"get_placement_analysis_data: CSV_DATA={csv_data!s}")
-        staging_path = Path(csv_data) / "current_tourney" / league
-        cache_dir = Path(csv_data) / f"{league}_live"
-        logging.info(f"get_placement_analysis_data: staging_path={staging_path}")
-
-        all_files = sorted([p for p in staging_path.glob("*.csv.gz") if p.stat().st_size > 0], key=get_time)
-        logging.info(f"get_placement_analysis_data: found {len(all_files)} non-empty CSV snapshots in {staging_path}")
-
-        if all_files:
-            last_file = all_files[-1]
-            logging.info(f"get_placement_analysis_data: last_file={last_file}")
-            last_time = get_time(last_file)
-            tourney_date = last_time.date().isoformat()
-            logging.info(f"get_placement_analysis_data: last_time={last_time}, initial tourney_date={tourney_date}")
-
-            # Placement cache files are written using the tourney start date.
-            # Snapshots can cross midnight; try only today and yesterday as
-            # candidates so we limit the lookback window to 2 days total.
-            candidate_dates = [last_time.date() - datetime.timedelta(days=delta) for delta in range(0, 2)]
-            cache_file = None
-            found_date = None
-            for cand in candidate_dates:
-                cand_name = cand.isoformat()
-                cand_file = cache_dir / f"{cand_name}_placement_cache.json"
-                logging.info(f"get_placement_analysis_data: checking candidate cache {cand_file}")
-                if cand_file.exists():
-                    cache_file = cand_file
-                    found_date = cand_name
-                    logging.info(f"get_placement_analysis_data: selected cache_file={cache_file} for tourney start {found_date}")
-                    break
-
-            if cache_file:
-                logging.info(f"get_placement_analysis_data: cache_file exists: {cache_file}")
-                try:
-                    payload_text = cache_file.read_text(encoding="utf8")
-                    logging.info(f"get_placement_analysis_data: cache_file size={len(payload_text)} bytes")
-                    payload = json.loads(payload_text)
-
-                    payload_include_shun = payload.get("include_shun")
-                    logging.info(f"get_placement_analysis_data: payload include_shun={payload_include_shun}, desired include_shun={include_shun}")
-
-                    # only accept cache if include_shun matches what we're using
-                    if payload_include_shun == include_shun:
-                        # Ensure the cache was generated against the latest snapshot.
-                        # If the cache refers to a different snapshot than the
-                        # latest available CSV, refuse to use it and surface a
-                        # friendly message so the UI doesn't mix stale cache
-                        # metadata with newer CSVs.
-                        payload_snapshot = payload.get("snapshot_iso")
-                        if payload_snapshot:
-                            try:
-                                payload_snapshot_name = Path(payload_snapshot).name
-                            except Exception:
-                                payload_snapshot_name = str(payload_snapshot)
-                        else:
-                            payload_snapshot_name = None
-
-                        last_snapshot_name = last_file.name
-                        logging.info(
-                            f"get_placement_analysis_data: payload snapshot name={payload_snapshot_name}, latest snapshot name={last_snapshot_name}"
-                        )
-
-                        if payload_snapshot_name != last_snapshot_name:
-                            logging.warning("get_placement_analysis_data: cache snapshot does not match latest CSV; refusing to use stale cache")
-                            # Surface an actionable message to the UI via ValueError
-                            raise ValueError("Live Placement Analysis is lagging behind live data.  Please wait while we catch up.")
-                        # Parse bracket_creation_times (stored as ISO strings) back to datetimes
-                        raw_times = payload.get("bracket_creation_times", {}) or {}
-                        bracket_creation_times = {
-                            br: (datetime.datetime.fromisoformat(ts) if isinstance(ts, str) else ts) for br, ts in raw_times.items()
-                        }
-                        logging.info(f"get_placement_analysis_data: parsed {len(bracket_creation_times)} bracket_creation_times from cache")
-
-                        # Load only latest snapshot to build the live DataFrame for analysis
-                        df_latest = get_latest_live_df(league, include_shun)
-                        logging.info(f"get_placement_analysis_data: df_latest.shape={getattr(df_latest, 'shape', None)}")
-
-                        # compute fullish brackets from latest snapshot
-                        bracket_counts = dict(df_latest.groupby("bracket").player_id.unique().map(lambda player_ids: len(player_ids)))
-                        fullish_brackets = [bracket for bracket, count in bracket_counts.items() if count >= 28]
-                        logging.info(f"get_placement_analysis_data: found {len(fullish_brackets)} fullish_brackets (>=28 players)")
-
-                        df = df_latest[df_latest.bracket.isin(fullish_brackets)].copy()
-                        df["real_name"] = df["real_name"].astype("str")
-                        latest_time = df["datetime"].max()
-                        logging.info(f"get_placement_analysis_data: filtered df.shape={getattr(df, 'shape', None)}, latest_time={latest_time}")
-
-                        logging.info(f"Using placement cache for {league} {tourney_date}")
-                        # Return the tourney start date (the cache is keyed by start date)
-                        tourney_start_date = found_date or tourney_date
-                        return df, latest_time, bracket_creation_times, tourney_start_date
-                    else:
-                        logging.info("get_placement_analysis_data: cache include_shun mismatch; rejecting cache")
-                except Exception:
-                    logging.exception(f"Failed to read/parse placement cache {cache_file}; will fall back to raising ValueError")
+        cache, last_file = _current_placement_cache(league, include_shun)
+        if cache is not None:
+            # Ensure the cache was generated against the latest snapshot. If it
+            # refers to an older one, refuse to use it and surface a friendly
+            # message so the UI doesn't mix stale cache metadata with newer CSVs.
+            if not cache.is_current(last_file):
+                logging.warning(
+                    f"get_placement_analysis_data: cache snapshot {cache.snapshot_name()} does not match latest CSV {last_file.name}; refusing to use stale cache"
+                )
+                raise ValueError("Live Placement Analysis is lagging behind live data.  Please wait while we catch up.")
+
+            bracket_creation_times = cache.bracket_times()
+            logging.info(f"get_placement_analysis_data: {len(bracket_creation_times)} bracket_creation_times from cache")
+
+            # Load only latest snapshot to build the live DataFrame for analysis
+            df_latest = get_latest_live_df(league, include_shun)
+            logging.info(f"get_placement_analysis_data: df_latest.shape={getattr(df_latest, 'shape', None)}")
+
+            # compute fullish brackets from latest snapshot
+            bracket_counts = dict(df_latest.groupby("bracket").player_id.unique().map(lambda player_ids: len(player_ids)))
+            fullish_brackets = [bracket for bracket, count in bracket_counts.items() if count >= FULL_BRACKET_MIN_PLAYERS]
+            logging.info(f"get_placement_analysis_data: found {len(fullish_brackets)} fullish_brackets (>={FULL_BRACKET_MIN_PLAYERS} players)")
+
+            df = df_latest[df_latest.bracket.isin(fullish_brackets)].copy()
+            df["real_name"] = df["real_name"].astype("str")
+            latest_time = df["datetime"].max()
+            logging.info(f"get_placement_analysis_data: filtered df.shape={getattr(df, 'shape', None)}, latest_time={latest_time}")
+
+            # The cached wave index covers every player of the snapshot; apply the
+            # current exclusions and the fullish cut so it matches ``df``.
+            wave_index = cache.wave_index()
+            if wave_index is not None:
+                excluded_ids, _ = _live_filters(include_shun)
+                wave_index = wave_index.without(excluded_ids).full_brackets()
             else:
-                logging.info(f"get_placement_analysis_data: cache_file does not exist: {cache_file}")
-
+                logging.info("get_placement_analysis_data: cache has no wave_index; building it from the latest snapshot")
+                wave_index = BracketWaveIndex.from_frame(df)
+
+            logging.info(f"Using placement cache for {league} {cache.tourney_date}")
+            # Return the tourney start date (the cache is keyed by start date)
+            return df, latest_time, bracket_creation_times, cache.tourney_date, wave_index
+    except ValueError:
+        raise
     except Exception:
-        logging.exception("Failed to check placement cache path or list snapshots; will fall back to raising ValueError")
+        logging.exception(f"Failed to read placement cache for {league}; will fall back to raising ValueError")
 
     # If we reach here, no placement cache was available or it was invalid.
     # Per product decision: do not fall back to on-the-fly aggregation. Let the
@@ -315,7 +282,7 @@ def get_placement_analysis_data(league: str):
     raise ValueError("Placement cache not available yet; try again later")
 
 
-def analyze_wave_placement(df, wave_to_analyze, latest_time):
+def analyze_wave_placement(df, wave_to_analyze, latest_time, wave_index: Optional[BracketWaveIndex] = None):
     """
     Analyze placement of a specific wave across all brackets.
 
@@ -323,35 +290,39 @@ def analyze_wave_placement(df, wave_to_analyze, latest_time):
         df: DataFrame containing tournament data
         wave_to_analyze: Wave number to analyze
         latest_time: Latest time point in the data
+        wave_index: Precomputed index of ``df`` at ``latest_time`` (from the placement cache);
+            built from ``df`` when not given
 
     Returns:
         List of dictionaries containing placement analysis results
     """
-    results = []
-    for bracket in sorted(df["bracket"].unique()):
-        bracket_df = df[df["bracket"] == bracket]
-        last_bracket_df = bracket_df[bracket_df["datetime"] == latest_time].sort_values("wave", ascending=False)
-
-        # Tie rule: tied players all receive the LAST (worst) position in the tied group.
-        # above_count = players strictly better; equal_count = players tied at the same wave.
-        # The analyzed wave is treated as a new entrant joining any existing tie, so
-        # rank = above_count + equal_count + 1 (last slot in the combined tied group).
-        above_count = last_bracket_df[last_bracket_df["wave"] > wave_to_analyze].shape[0]
-        equal_count = last_bracket_df[last_bracket_df["wave"] == wave_to_analyze].shape[0]
-        total = last_bracket_df.shape[0]
-        rank = above_count + equal_count + 1
-
-        results.append(
-            {
-                "Bracket": bracket,
-                "Would Place": f"{rank}/{total}",
-                "Top Wave": last_bracket_df["wave"].max(),
-                "Median Wave": int(last_bracket_df["wave"].median()),
-                "Players Above": above_count,
-            }
+    if wave_index is None:
+        wave_index = BracketWaveIndex.from_frame(df[df["datetime"] == latest_time])
+
+    # Tie rule: tied players all receive the LAST (worst) position in the tied group.
+    # above_count = players strictly better; equal_count = players tied at the same wave.
+    # The analyzed wave is treated as a new entrant joining any existing tie, so
+    # rank = above_count + equal_count + 1 (last slot in the combined tied group).
+    above_counts, equal_counts = wave_index.placements(wave_to_analyze)
+    ranks = above_counts + equal_counts + 1
+
+    return [
+        {
+            "Bracket": bracket,
+            "Would Place": f"{rank}/{total}",
+            "Top Wave": top,
+            "Median Wave": int(median),
+            "Players Above": above,
+        }
+        for bracket, rank, total, top, median, above in zip(
+            wave_index.brackets,
+            ranks.tolist(),
+            wave_index.counts.tolist(),
+            wave_index.top_waves().tolist(),
+            wave_index.median_waves().tolist(),
+            above_counts.tolist(),
         )
-
-    return results
+    ]
 
 
 def process_bracket_selection(df, selected_real_name, selected_player_id, selected_bracket, bracket_order):
@@ -428,43 +399,11 @@ def get_bracket_stats(df):
         (hardest/easiest promotion and relegation by 5th/25th place wave).
     """
 
-    def _promotion_cutoff_wave(group, n):
-        """Wave of the last player to actually promote under the last-in-tie rank rule.
-
-        Tied players all share the worst rank in their group. This returns the minimum
-        wave whose entire tied group still fits within the top n slots. Returns None if
-        nobody in the bracket promotes (e.g. > n players all tied at the top wave).
-        """
-        sorted_counts = group.value_counts().sort_index(ascending=False)
-        cumulative = 0
-        result = None
-        for wave, cnt in sorted_counts.items():
-            if cumulative + cnt <= n:
-                cumulative += cnt
-                result = wave
-            else:
-                break
-        return result
-
-    def _relegation_cutoff_wave(group, n):
-        """Wave of the highest-ranked player who demotes under the last-in-tie rank rule.
-
-        Returns the first wave (going highest to lowest) where the cumulative player
-        count reaches n — those players' last-in-tie rank >= n, so they demote.
-        Returns None if fewer than n players in the bracket.
-        """
-        sorted_counts = group.value_counts().sort_index(ascending=False)
-        cumulative = 0
-        for wave, cnt in sorted_counts.items():
-            cumulative += cnt
-            if cumulative >= n:
-                return wave
-        return None
-
     group_by_bracket = df.groupby("bracket").wave
 
-    fourth_place = group_by_bracket.apply(lambda x: _promotion_cutoff_wave(x, 4)).dropna()
-    twenty_fifth_place = group_by_bracket.apply(lambda x: _relegation_cutoff_wave(x, 25)).dropna()
+    # Cutoffs under the last-in-tie rank rule, from one sort of the distinct waves per bracket.
+    fourth_place = promotion_cutoff_waves(df, 4)
+    twenty_fifth_place = relegation_cutoff_waves(df, 25)
 
     stats = {
         "total_brackets": df.groupby("bracket").ngroups,
@@ -512,109 +451,44 @@ def get_quantile_analysis_data(league: str):
     # Respect filesystem/JSON flag: shared setting for all placement cache pages
     include_shun = include_shun_enabled_for("live_placement_cache")
 
-    # Try to use per-tourney cache: snapshots live in current_tourney/{league}/
-    # and placement cache files live in {league}_live/ (permanent location).
     try:
-        csv_data = get_csv_data()
-        logging.info(f"get_quantile_analysis_data: CSV_DATA={csv_data!s}")
-        staging_path = Path(csv_data) / "current_tourney" / league
-        cache_dir = Path(csv_data) / f"{league}_live"
-        logging.info(f"get_quantile_analysis_data: staging_path={staging_path}")
-
-        all_files = sorted([p for p in staging_path.glob("*.csv.gz") if p.stat().st_size > 0], key=get_time)
-        logging.info(f"get_quantile_analysis_data: found {len(all_files)} non-empty CSV snapshots in {staging_path}")
-
-        if all_files:
-            last_file = all_files[-1]
-            logging.info(f"get_quantile_analysis_data: last_file={last_file}")
-            last_time = get_time(last_file)
-            tourney_date = last_time.date().isoformat()
-            logging.info(f"get_quantile_analysis_data: last_time={last_time}, initial tourney_date={tourney_date}")
-
-            # Try current date and yesterday for cache file
-            candidate_dates = [last_time.date() - datetime.timedelta(days=delta) for delta in range(0, 2)]
-            cache_file = None
-            found_date = None
-            for cand in candidate_dates:
-                cand_name = cand.isoformat()
-                cand_file = cache_dir / f"{cand_name}_placement_cache.json"
-                logging.info(f"get_quantile_analysis_data: checking candidate cache {cand_file}")
-                if cand_file.exists():
-                    cache_file = cand_file
-                    found_date = cand_name
-                    logging.info(f"get_quantile_analysis_data: selected cache_file={cache_file} for tourney start {found_date}")
-                    break
-
-            if cache_file:
-                logging.info(f"get_quantile_analysis_data: cache_file exists: {cache_file}")
-                try:
-                    payload_text = cache_file.read_text(encoding="utf8")
-                    logging.info(f"get_quantile_analysis_data: cache_file size={len(payload_text)} bytes")
-                    payload = json.loads(payload_text)
-
-                    payload_include_shun = payload.get("include_shun")
-                    logging.info(f"get_quantile_analysis_data: payload include_shun={payload_include_shun}, desired include_shun={include_shun}")
-
-                    # Only accept cache if include_shun matches
-                    if payload_include_shun == include_shun:
-                        # Check if cache has quantile data
-                        quantile_data = payload.get("quantile_data")
-                        if not quantile_data or not quantile_data.get("data"):
-                            logging.warning("get_quantile_analysis_data: cache exists but has no quantile_data")
-                            raise ValueError("Quantile analysis cache is being generated. Please wait a moment and refresh.")
-
-                        # Verify cache snapshot matches latest
-                        payload_snapshot = payload.get("snapshot_iso")
-                        if payload_snapshot:
-                            try:
-                                payload_snapshot_name = Path(payload_snapshot).name
-                            except Exception:
-                                payload_snapshot_name = str(payload_snapshot)
-                        else:
-                            payload_snapshot_name = None
-
-                        last_snapshot_name = last_file.name
-                        logging.info(
-                            f"get_quantile_analysis_data: payload snapshot name={payload_snapshot_name}, latest snapshot name={last_snapshot_name}"
-                        )
-
-                        if payload_snapshot_name != last_snapshot_name:
-                            logging.warning("get_quantile_analysis_data: cache snapshot does not match latest CSV")
-                            raise ValueError("Quantile analysis is catching up with live data. Please wait a moment and refresh.")
-
-                        # Convert quantile data to DataFrame
-                        data = quantile_data.get("data", {})
-
-                        results = []
-                        for rank_str, rank_quantiles in data.items():
-                            rank = int(rank_str)
-                            for q_str, wave_value in rank_quantiles.items():
-                                q = float(q_str)
-                                if wave_value is not None:
-                                    results.append({"rank": rank, "quantile": q, "waves": wave_value})
-
-                        if not results:
-                            logging.warning("get_quantile_analysis_data: quantile_data exists but no valid results")
-                            raise ValueError("Quantile analysis cache is empty. Please wait for data generation.")
-
-                        quantile_df = pd.DataFrame(results)
-
-                        # Get latest timestamp from a quick CSV read
-                        df_latest = get_latest_live_df(league, include_shun)
-                        latest_time = df_latest["datetime"].max()
-
-                        tourney_start_date = found_date or tourney_date
-                        logging.info(f"Using quantile cache for {league} {tourney_start_date}")
-                        return quantile_df, tourney_start_date, latest_time
-                    else:
-                        logging.info("get_quantile_analysis_data: cache include_shun mismatch; rejecting cache")
-                except Exception:
-                    logging.exception(f"Failed to read/parse quantile cache {cache_file}")
-            else:
-                logging.info("get_quantile_analysis_data: cache_file does not exist")
-
+        cache, last_file = _current_placement_cache(league, include_shun)
+        if cache is not None:
+            # Check if cache has quantile data
+            quantile_data = cache.quantile_data()
+            if not quantile_data.get("data"):
+                logging.warning("get_quantile_analysis_data: cache exists but has no quantile_data")
+                raise ValueError("Quantile analysis cache is being generated. Please wait a moment and refresh.")
+
+            # Verify cache snapshot matches latest
+            if not cache.is_current(last_file):
+                logging.warning(f"get_quantile_analysis_data: cache snapshot {cache.snapshot_name()} does not match latest CSV {last_file.name}")
+                raise ValueError("Quantile analysis is catching up with live data. Please wait a moment and refresh.")
+
+            # Convert quantile data to DataFrame
+            results = []
+            for rank_str, rank_quantiles in quantile_data["data"].items():
+                rank = int(rank_str)
+                for q_str, wave_value in rank_quantiles.items():
+                    q = float(q_str)
+                    if wave_value is not None:
+                        results.append({"rank": rank, "quantile": q, "waves": wave_value})
+
+            if not results:
+                logging.warning("get_quantile_analysis_data: quantile_data exists but no valid results")
+                raise ValueError("Quantile analysis cache is empty. Please wait for data generation.")
+
+            quantile_df = pd.DataFrame(results)
+
+            # The cache matches the latest snapshot, whose time is in its file name.
+            latest_time = pd.Timestamp(get_time(last_file))
+
+            logging.info(f"Using quantile cache for {league} {cache.tourney_date}")
+            return quantile_df, cache.tourney_date, latest_time
+    except ValueError:
+        raise
     except Exception:
-        logging.exception("Failed to check quantile cache path or list snapshots")
+        logging.exception(f"Failed to read quantile cache for {league}")
 
     # No cache available - show friendly message
     raise ValueError("Quantile analysis cache not available yet. Please wait for cache generation and try again later.")
@@ -673,8 +547,9 @@ def update_bracket_index(new_index, max_index, league):
 
 
 def clear_cache():
-    """Clear all cached data in Streamlit"""
+    """Clear all cached data in Streamlit and every cached live timeline"""
     st.cache_data.clear()
+    timeline_store.drop()
 
 
 @cache_data_if_enabled(ttl=CACHE_TTL_SECONDS)
@@ -750,39 +625,3 @@ def _get_snapshot_path(league: str) -> Path:
 def _get_archive_path(league: str) -> Path:
     """Permanent archive directory: where ``*_archive.csv.gz`` files are stored."""
     return Path(get_csv_data()) / f"{league}_live"
-
-
-def _load_archive_df(league: str) -> tuple[pd.DataFrame, list]:
-    """Return (archive_df, expected_timestamps) for the current/most-recent tourney.
-
-    Strategy:
-    1. Determine the current tourney group from staging snapshots.
-    2. Look for ``{date}_archive.csv.gz`` in the permanent archive directory.
-    3. If found and newer than the last snapshot, read it directly.
-    4. Otherwise, build in memory on the fly.
-    """
-    from thetower.backend.tourney_results.archive_utils import _archive_name_for_group, _parse_snapshot_time  # noqa: PLC0415
-
-    snap_path = _get_snapshot_path(league)
-    archive_dir = _get_archive_path(league)
-
-    snaps = list_snapshots(snap_path)
-    if not snaps:
-        raise ValueError("No current data, wait until the tourney day")
-
-    groups = group_snapshots_by_tourney(snaps)
-    current_group = groups[-1] if groups else snaps
-    expected_timestamps = [_parse_snapshot_time(p) for p in current_group]
-
-    arch_file = archive_dir / _archive_name_for_group(current_group)
-    if arch_file.exists() and arch_file.stat().st_size > 0:
-        if arch_file.stat().st_mtime >= current_group[-1].stat().st_mtime:
-            logger.info(f"Reading pre-built archive {arch_file.name}")
-            return read_archive(arch_file), expected_timestamps
-        logger.info(f"Archive {arch_file.name} is stale; rebuilding from {len(current_group)} snapshots")
-
-    logger.info(f"No archive file found for {league}; building in memory from {len(current_group)} snapshots")
-    archive = build_tourney_archive(current_group)
-    if archive.empty:
-        raise ValueError("No current data, wait until the tourney day")
-    return archive, expected_timestamps
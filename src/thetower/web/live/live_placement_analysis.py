@@ -8,6 +8,8 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from thetower.backend.tourney_results.league_rules import get_league_rules
+from thetower.backend.tourney_results.live_directory import get_live_player_directory
+from thetower.backend.tourney_results.shun_config import include_shun_enabled_for
 from thetower.web.live.data_ops import (
     analyze_wave_placement,
     format_time_ago,
@@ -19,6 +21,27 @@ from thetower.web.live.ui_components import render_data_status, setup_common_ui
 from thetower.web.util import add_player_id
 
 
+def _live_player_directory():
+    """Cross-league directory of players in the current live tourneys (built by generate_placement_cache)."""
+    return get_live_player_directory(include_shun_enabled_for("live_placement_cache"))
+
+
+def _search_directory(method: str, query: str) -> list[tuple[str, str, str]]:
+    try:
+        return getattr(_live_player_directory(), method)(query)
+    except ValueError:
+        logging.warning("Live player directory not available; search returns no matches")
+        return []
+
+
+def _find_in_directory(player_id: str):
+    try:
+        return _live_player_directory().find(player_id)
+    except ValueError:
+        logging.warning("Live player directory not available; player lookup returns no match")
+        return None
+
+
 @require_tournament_data
 def live_placement_analysis():
     st.markdown("# Live Placement Analysis")
@@ -32,7 +55,7 @@ def live_placement_analysis():
     refresh_timestamp = render_data_status(league, "live_placement_cache")
 
     # Get placement analysis data (plus tourney start date)
-    df, latest_time, bracket_creation_times, tourney_start_date = get_placement_analysis_data(league)
+    df, latest_time, bracket_creation_times, tourney_start_date, wave_index = get_placement_analysis_data(league)
 
     # Process display names to handle duplicates
     df = process_display_names(df)
@@ -134,29 +157,13 @@ def live_placement_analysis():
         # Normalize to uppercase to align with stored player IDs
         pid_search = player_id_input.strip().upper()
 
-        # Search across all leagues for partial player ID matches
-        from thetower.backend.tourney_results.constants import leagues as ALL_LEAGUES
-
-        all_matches = []  # Store (player_name, player_id, league) tuples
-
-        for lg in ALL_LEAGUES:
-            try:
-                df_tmp, _, _, _ = get_placement_analysis_data(lg)
-                df_tmp = process_display_names(df_tmp)
-                # Partial match on player_id
-                match_df = df_tmp[df_tmp["player_id"].str.contains(pid_search, na=False, regex=False)]
-                # Add unique players from this league
-                for _, row in match_df.drop_duplicates(subset=["player_id"]).iterrows():
-                    all_matches.append((row["real_name"], row["player_id"], lg))
-            except Exception:
-                continue
+        # Search across all leagues for partial player ID matches (sorted by player ID)
+        all_matches = _search_directory("search_ids", pid_search)  # (player_name, player_id, league) tuples
 
         if not all_matches:
             st.error(f"No player IDs found matching '{pid_search}' in any active tournament.")
             return
         elif len(all_matches) > 1:
-            # Show multiple matches sorted by player ID
-            all_matches.sort(key=lambda x: x[1])
             st.warning("Multiple player IDs match. Please select one:")
             for player_name, player_id, player_league in all_matches:
                 name_col, id_col, league_col, button_col = st.columns([3, 1, 1, 1])
@@ -172,7 +179,7 @@ def live_placement_analysis():
             target_league = all_matches[0][2]
             if target_league != league:
                 # Reload data for the correct league
-                df, latest_time, bracket_creation_times, tourney_start_date = get_placement_analysis_data(target_league)
+                df, latest_time, bracket_creation_times, tourney_start_date, wave_index = get_placement_analysis_data(target_league)
                 df = process_display_names(df)
                 league = target_league
             # Set selected_player to continue with analysis
@@ -185,28 +192,18 @@ def live_placement_analysis():
 
     # Check if a player ID was selected from multiple matches
     if selected_id_from_session:
-        # Search across all leagues to find which league this player is in
-        from thetower.backend.tourney_results.constants import leagues as ALL_LEAGUES
-
+        # Find which league this player is in
         found_player = None
         found_league = None
 
-        for lg in ALL_LEAGUES:
-            try:
-                df_tmp, _, _, _ = get_placement_analysis_data(lg)
-                df_tmp = process_display_names(df_tmp)
-                match_df = df_tmp[df_tmp["player_id"] == selected_id_from_session]
-                if not match_df.empty:
-                    found_player = match_df.iloc[0]["display_name"]
-                    found_league = lg
-                    break
-            except Exception:
-                continue
+        found = _find_in_directory(selected_id_from_session)
+        if found:
+            found_player, found_league = found
 
         if found_player and found_league:
             if found_league != league:
                 # Reload data for the correct league
-                df, latest_time, bracket_creation_times, tourney_start_date = get_placement_analysis_data(found_league)
+                df, latest_time, bracket_creation_times, tourney_start_date, wave_index = get_placement_analysis_data(found_league)
                 df = process_display_names(df)
                 league = found_league
             selected_player = found_player
@@ -230,23 +227,7 @@ def live_placement_analysis():
         name_lower = selected_player.strip().lower()
 
         # Search across all leagues
-        from thetower.backend.tourney_results.constants import leagues as ALL_LEAGUES
-
-        all_matches = []  # Store (player_name, player_id, league) tuples
-
-        for lg in ALL_LEAGUES:
-            try:
-                df_tmp, _, _, _ = get_placement_analysis_data(lg)
-                df_tmp = process_display_names(df_tmp)
-                match_df = df_tmp[
-                    (df_tmp["real_name"].str.lower().str.contains(name_lower, na=False, regex=False))
-                    | (df_tmp["display_name"].str.lower().str.contains(name_lower, na=False, regex=False))
-                ]
-                # Add unique players from this league
-                for _, row in match_df.drop_duplicates(subset=["real_name"]).iterrows():
-                    all_matches.append((row["real_name"], row["player_id"], lg))
-            except Exception:
-                continue
+        all_matches = _search_directory("search_names", name_lower)  # (player_name, player_id, league) tuples
 
         if not all_matches:
             st.error("Player not found by name in any active league's tournament data.")
@@ -269,7 +250,7 @@ def live_placement_analysis():
             target_league = all_matches[0][2]
             if target_league != league:
                 # Reload data for the correct league
-                df, latest_time, bracket_creation_times, tourney_start_date = get_placement_analysis_data(target_league)
+                df, latest_time, bracket_creation_times, tourney_start_date, wave_index = get_placement_analysis_data(target_league)
                 df = process_display_names(df)
                 league = target_league
             # Get display name
@@ -285,7 +266,7 @@ def live_placement_analysis():
     st.write(f"Analyzing placement for {selected_player}'s highest wave: {wave_to_analyze}")
 
     # Analyze placements
-    results = analyze_wave_placement(df, wave_to_analyze, latest_time)
+    results = analyze_wave_placement(df, wave_to_analyze, latest_time, wave_index)
 
     # analyze_wave_placement treats wave_to_analyze as a hypothetical NEW entrant (+1 to rank).
     # For the player's own bracket they are already present, so the formula overcounts by 1.
@@ -0,0 +1,273 @@
+"""Process-level incremental cache of reconstructed live tourney timelines.
+
+``get_live_data`` used to rebuild the whole timeline (archive read, full
+reconstruction, sus/ban/shun filtering) every time its Streamlit cache expired
+or was cleared.  During a tourney only one snapshot is added every 30 minutes,
+so this store keeps one timeline per league and, when new snapshot files
+appear, diffs just those files against the last-known wave of every player and
+appends one block of rows per snapshot.  A refresh therefore costs
+O(players in one snapshot) instead of O(whole tourney).
+
+A full rebuild only happens when the league's snapshot set no longer extends
+the cached one (a new tourney started, files were moved or replaced), or after
+an explicit ``drop``.  A new snapshot that cannot be read yet is left out of
+the cached listing, so the next access tries it again.
+
+The store is per process, so it does not rely on the fetch/import services to
+signal it.  Every access compares a cheap disk stamp — the staging directory's
+mtime (snapshots are renamed into it atomically and moved out when a tourney
+completes) plus the current tourney archive's mtime — with the one the cached
+timeline was checked against, and only re-lists snapshots when it moved.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from thetower.backend.tourney_results.archive_utils import (
+    _archive_name_for_group,
+    _parse_snapshot_time,
+    archive_exists,
+    archive_mtime,
+    build_tourney_archive,
+    group_snapshots_by_tourney,
+    list_snapshots,
+    read_archive,
+    reconstruct_all_snapshots,
+    snapshot_delta_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+_STATIC_COLS = ["name", "avatar", "relic", "bracket", "tourney_number"]
+
+
+@dataclass
+class _Timeline:
+    """Reconstructed timeline of one league's current tourney."""
+
+    generation: int
+    listing: tuple[str, ...]  # names of every staged snapshot the timeline was built from
+    group: list[Path]  # snapshots belonging to the current tourney
+    chunks: list[pd.DataFrame]  # chunk 0 is the full build, one chunk per appended snapshot after that
+    state: pd.DataFrame  # latest wave + static columns per player, indexed by player_id
+    last_wave: dict[str, int]
+    disk_stamp: tuple = ()  # _disk_stamp() the timeline was last checked against
+
+
+@dataclass
+class _View:
+    """A filtered/enriched (``real_name``) timeline as returned by ``get_live_data``."""
+
+    generation: int
+    chunks_used: int
+    excluded_ids: frozenset
+    lookup: dict
+    df: pd.DataFrame = field(repr=False)
+
+
+class LiveTimelineStore:
+    """Per-league incremental timelines plus their filtered views."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._league_locks: dict[str, threading.Lock] = {}
+        self._timelines: dict[str, _Timeline] = {}
+        self._views: dict[tuple[str, bool], _View] = {}
+        self._generation = 0
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    def live_view(self, league: str, snap_path: Path, archive_dir: Path, shun: bool, excluded_ids, lookup: dict) -> pd.DataFrame:
+        """Return the league's timeline without ``excluded_ids``, with ``real_name`` and newest rows first.
+
+        Only snapshot blocks added since the previous call are filtered and
+        enriched, unless the exclusion set or the name lookup changed.  ``lookup``
+        is kept by reference and must not be mutated afterwards (the shared
+        ``get_player_id_lookup`` table never is).  The returned frame is shared —
+        callers must copy before mutating it.
+        """
+        with self._league_lock(league):
+            timeline = self._refresh(league, snap_path, archive_dir)
+            excluded_ids = frozenset(excluded_ids)
+            key = (league, shun)
+            view = self._views.get(key)
+
+            same_filters = view is not None and view.excluded_ids == excluded_ids and (view.lookup is lookup or view.lookup == lookup)
+            if same_filters and view.generation == timeline.generation:
+                new_chunks = timeline.chunks[view.chunks_used :]
+                if new_chunks:
+                    # Appended chunks are strictly newer, so they go on top, newest first.
+                    parts = [_enrich(chunk, excluded_ids, lookup) for chunk in reversed(new_chunks)]
+                    view.df = pd.concat([*parts, view.df], ignore_index=True)
+                    view.chunks_used = len(timeline.chunks)
+                return view.df
+
+            full = pd.concat(timeline.chunks, ignore_index=True) if len(timeline.chunks) > 1 else timeline.chunks[0]
+            df = _enrich(full, excluded_ids, lookup)
+            self._views[key] = _View(timeline.generation, len(timeline.chunks), excluded_ids, lookup, df)
+            return df
+
+    def drop(self, league: Optional[str] = None) -> None:
+        """Forget ``league`` (or every league) so the next access rebuilds it from scratch."""
+        with self._lock:
+            for name in [name for name in self._timelines if league is None or name == league]:
+                del self._timelines[name]
+            for key in [key for key in self._views if league is None or key[0] == league]:
+                del self._views[key]
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _league_lock(self, league: str) -> threading.Lock:
+        with self._lock:
+            return self._league_locks.setdefault(league, threading.Lock())
+
+    def _refresh(self, league: str, snap_path: Path, archive_dir: Path) -> _Timeline:
+        """Return an up-to-date timeline for ``league``, extending the cached one where possible."""
+        timeline = self._timelines.get(league)
+        # Taken before listing, so a snapshot landing mid-refresh only costs one extra re-check.
+        stamp = _disk_stamp(snap_path, archive_dir, timeline.group if timeline is not None else None)
+        if timeline is not None and timeline.disk_stamp == stamp:
+            return timeline
+
+        snaps = list_snapshots(snap_path)
+        if not snaps:
+            raise ValueError("No current data, wait until the tourney day")
+        listing = tuple(p.name for p in snaps)
+
+        if timeline is not None and listing[: len(timeline.listing)] == timeline.listing:
+            new_snaps = snaps[len(timeline.listing) :]
+            # New files extend the cached tourney only if they group with its last snapshot.
+            if not new_snaps or len(group_snapshots_by_tourney([timeline.group[-1], *new_snaps])) == 1:
+                appended = 0
+                for snap in new_snaps:
+                    if not self._append_snapshot(timeline, snap):
+                        break
+                    appended += 1
+                timeline.listing += listing[len(timeline.listing) :][:appended]
+                if appended == len(new_snaps):
+                    # Otherwise keep the old stamp, so the next access retries the unread snapshot.
+                    timeline.disk_stamp = stamp
+                if appended:
+                    logger.info(f"Extended {league} timeline with {appended} snapshot(s)")
+                return timeline
+
+        timeline = self._build(league, snaps, archive_dir)
+        timeline.disk_stamp = _disk_stamp(snap_path, archive_dir, timeline.group)
+        self._timelines[league] = timeline
+        return timeline
+
+    def _build(self, league: str, snaps: list[Path], archive_dir: Path) -> _Timeline:
+        """Fully reconstruct the current tourney's timeline for ``league``."""
+        archive, group = load_current_archive(league, snaps, archive_dir)
+        expected_timestamps = [_parse_snapshot_time(p) for p in group]
+        df = reconstruct_all_snapshots(archive, extra_timestamps=expected_timestamps)
+        if df.empty:
+            raise ValueError("No current data, wait until the tourney day")
+
+        # Every player present so far appears in the last time slice with their latest values.
+        latest = df[df["datetime"] == df["datetime"].iloc[-1]]
+        state = latest.set_index("player_id")[["wave", *_STATIC_COLS]]
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return _Timeline(
+            generation=generation,
+            listing=tuple(p.name for p in snaps),
+            group=group,
+            chunks=[df],
+            state=state,
+            last_wave=dict(zip(state.index, state["wave"].tolist())),
+        )
+
+    def _append_snapshot(self, timeline: _Timeline, snap: Path) -> bool:
+        """Fold one new snapshot into ``timeline`` and append its block of rows.
+
+        Returns False, leaving ``timeline`` untouched, if the snapshot could not be read.
+        """
+        snap_time = _parse_snapshot_time(snap)
+        try:
+            snap_df = pd.read_csv(snap)
+        except Exception as exc:
+            logger.warning(f"Failed to read {snap}: {exc}; will retry on the next refresh")
+            return False
+
+        rows = snapshot_delta_rows(snap_df, snap_time, timeline.last_wave) if not snap_df.empty else []
+        state = timeline.state
+        if rows:
+            delta = pd.DataFrame(rows).drop(columns=["snapshot_time"]).set_index("player_id")[state.columns]
+            state = pd.concat([state[~state.index.isin(delta.index)], delta])
+            timeline.last_wave.update({row["player_id"]: row["wave"] for row in rows})
+            timeline.state = state
+
+        # Same row order as reconstruct_all_snapshots within one time: wave desc, then player_id.
+        player_ids = state.index.to_numpy(dtype=object)
+        waves = state["wave"].to_numpy(dtype=np.int64)
+        order = np.lexsort((player_ids.astype(str), -waves))
+        chunk = pd.DataFrame(
+            {
+                "datetime": np.full(len(order), pd.Timestamp(snap_time).to_datetime64(), dtype="datetime64[ns]"),
+                "player_id": player_ids[order],
+                "wave": waves[order],
+            }
+        )
+        for col in _STATIC_COLS:
+            chunk[col] = state[col].to_numpy()[order]
+        timeline.chunks.append(chunk)
+        timeline.group.append(snap)
+        return True
+
+
+def _disk_stamp(snap_path: Path, archive_dir: Path, group: Optional[list[Path]]) -> tuple:
+    """Return what has to change on disk before a cached timeline needs re-checking."""
+    try:
+        snap_mtime = snap_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        snap_mtime = 0
+    arch_mtime = archive_mtime(archive_dir / _archive_name_for_group(group)) if group else 0.0
+    return snap_mtime, arch_mtime
+
+
+def load_current_archive(league: str, snaps: list[Path], archive_dir: Path) -> tuple[pd.DataFrame, list[Path]]:
+    """Return (archive_df, snapshot_group) for the current/most-recent tourney.
+
+    Strategy:
+    1. Determine the current tourney group from staging snapshots.
+    2. Look for the ``{date}_archive.csv.gz`` archive (base file and/or append
+       segments) in the permanent archive directory.
+    3. If found and newer than the last snapshot, read it directly (``read_archive``
+       prefers the memory-mapped ``{date}_archive.col`` companion).
+    4. Otherwise, build in memory on the fly.
+    """
+    groups = group_snapshots_by_tourney(snaps)
+    current_group = list(groups[-1] if groups else snaps)
+
+    arch_file = archive_dir / _archive_name_for_group(current_group)
+    if archive_exists(arch_file):
+        if archive_mtime(arch_file) >= current_group[-1].stat().st_mtime:
+            logger.info(f"Reading pre-built archive {arch_file.name}")
+            return read_archive(arch_file), current_group
+        logger.info(f"Archive {arch_file.name} is stale; rebuilding from {len(current_group)} snapshots")
+
+    logger.info(f"No archive file found for {league}; building in memory from {len(current_group)} snapshots")
+    archive = build_tourney_archive(current_group)
+    if archive.empty:
+        raise ValueError("No current data, wait until the tourney day")
+    return archive, current_group
+
+
+def _enrich(df: pd.DataFrame, excluded_ids: frozenset, lookup: dict) -> pd.DataFrame:
+    """Drop excluded players, add ``real_name`` and order rows newest/highest first."""
+    df = df[~df["player_id"].isin(excluded_ids)].copy()
+    df["real_name"] = [lookup.get(pid, name) for pid, name in zip(df["player_id"], df["name"])]
+    df["real_name"] = df["real_name"].astype(str)
+    return df.sort_values(["datetime", "wave"], ascending=False).reset_index(drop=True)
+
+
+timeline_store = LiveTimelineStore()
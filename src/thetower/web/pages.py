@@ -15,6 +15,8 @@ from thetower.web.util import makeitrain
 
 # Django setup
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thetower.backend.towerdb.settings")
+# Page reads go through the read-only database connection (see towerdb/settings.py).
+os.environ.setdefault("TOWERDB_READONLY", "1")
 django.setup()
 
 # Local imports